@@ -0,0 +1,362 @@
+"""
+Measure per-call cost of code running on every update and write the
+results as JSON, so runs of different commits can be compared.
+
+Each case is timed in rounds long enough to be measured reliably, the
+best round is reported as "per_call_us" and the median as
+"median_us". Scheduler cases use the aiosqlite job store in a temporary
+directory.
+
+Usage:
+    python -m benchmarks.hot_path --output before.json
+    python -m benchmarks.hot_path --compare before.json --threshold 1.2
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from datetime import datetime, timezone
+from typing import Callable
+
+import uvloop
+from loguru import logger
+
+ROUNDS = 5
+ROUND_TIME = 0.2
+
+CHAT_MEMBER_UPDATE = {
+    "update_id": 123456789,
+    "chat_member": {
+        "chat": {
+            "id": -1001234567890,
+            "title": "Test group",
+            "type": "supergroup",
+        },
+        "from": {
+            "id": 987654321,
+            "is_bot": False,
+            "first_name": "John",
+            "last_name": "Doe",
+            "username": "john_doe",
+            "language_code": "en",
+        },
+        "date": 1700000000,
+        "old_chat_member": {
+            "status": "left",
+            "user": {
+                "id": 987654321,
+                "is_bot": False,
+                "first_name": "John",
+            },
+        },
+        "new_chat_member": {
+            "status": "member",
+            "user": {
+                "id": 987654321,
+                "is_bot": False,
+                "first_name": "John",
+                "last_name": "Doe",
+                "username": "john_doe",
+                "language_code": "en",
+            },
+        },
+    },
+}
+
+
+async def noop_job(**kwargs):
+    """Job placeholder, never executed during the benchmark."""
+
+
+def get_commit() -> str | None:
+    """Get the current git commit, if any."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(name: str, func: Callable[[], object]) -> dict:
+    """Time a callable in rounds of ROUND_TIME seconds."""
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * ROUND_TIME / max(elapsed, 1e-9)))
+    per_call = [
+        elapsed / number
+        for elapsed in timer.repeat(repeat=ROUNDS, number=number)
+    ]
+    return {
+        "name": name,
+        "calls": number,
+        "per_call_us": round(min(per_call) * 1e6, 3),
+        "median_us": round(statistics.median(per_call) * 1e6, 3),
+    }
+
+
+def measure_sequence(name: str, func: Callable[[int], object], calls: int):
+    """Time a callable called once for each index, like unique job ids."""
+    per_call = []
+    indexes = itertools.count()
+    for _ in range(ROUNDS):
+        batch = [next(indexes) for _ in range(calls)]
+        started = time.perf_counter()
+        for index in batch:
+            func(index)
+        per_call.append((time.perf_counter() - started) / calls)
+    return {
+        "name": name,
+        "calls": calls,
+        "per_call_us": round(min(per_call) * 1e6, 3),
+        "median_us": round(statistics.median(per_call) * 1e6, 3),
+    }
+
+
+def get_callback_cases() -> list[dict]:
+    """Callback data packing of the confirm button."""
+    from sastb.modules.bot.utils.raid_mode import get_raid_sweep_job_id
+    from sastb.modules.bot.utils.verify_user_callback import (
+        VerifyUserCallback,
+    )
+
+    packed = VerifyUserCallback(user_id=987654321).pack()
+    return [
+        measure(
+            "callback_pack",
+            lambda: VerifyUserCallback(user_id=987654321).pack(),
+        ),
+        measure(
+            "callback_unpack",
+            lambda: VerifyUserCallback.unpack(packed),
+        ),
+        measure(
+            "raid_sweep_job_id",
+            lambda: get_raid_sweep_job_id(123456789, -1001234567890, 42),
+        ),
+    ]
+
+
+def get_settings_cases() -> list[dict]:
+    """Settings access and welcome message rendering."""
+    from aiogram.types import User
+
+    from sastb.config import ApplicationSettings
+
+    os.environ.setdefault("sastb_telegram__token", "123:ABC")
+    os.environ.setdefault(
+        "sastb_telegram__webhook_base_url", "https://example.com",
+    )
+    os.environ.setdefault("sastb_administrators", "123456789")
+    settings = ApplicationSettings()  # type: ignore
+    snapshot = settings.snapshot()
+    user = User(id=987654321, is_bot=False, first_name="John")
+
+    return [
+        measure(
+            "settings_construct",
+            lambda: ApplicationSettings(),  # type: ignore
+        ),
+        measure(
+            "settings_snapshot_access",
+            lambda: snapshot.default_settings.remove_user_after,
+        ),
+        measure("mention_html", user.mention_html),
+        measure(
+            "template_format",
+            lambda: settings.text_templates.welcome_message_text.format(
+                user=user.mention_html(),
+            ),
+        ),
+        measure(
+            "template_render",
+            lambda: snapshot.text_templates.welcome_message_text(
+                user=user.mention_html(),
+            ),
+        ),
+    ]
+
+
+def get_logging_cases() -> list[dict]:
+    """Serialization of one log record for the JSON log files."""
+    from sastb.utils.cli.log_sink import JsonRecordSerializer
+
+    records = []
+    handler_id = logger.add(lambda message: records.append(message.record))
+    with logger.contextualize(chat_id=-1001234567890):
+        logger.info("New member: 987654321")
+    logger.remove(handler_id)
+    record = records[0]
+    serializer = JsonRecordSerializer()
+
+    return [
+        measure("json_record_serializer", lambda: serializer(record)),
+    ]
+
+
+def get_update_cases() -> list[dict]:
+    """Validation of a typical chat_member update."""
+    from aiogram.types import Update
+
+    return [
+        measure(
+            "update_validate_chat_member",
+            lambda: Update.model_validate(CHAT_MEMBER_UPDATE),
+        ),
+    ]
+
+
+async def get_scheduler_cases(db_dir: str) -> list[dict]:
+    """Scheduling and cancelling jobs and verifications."""
+    from apscheduler.triggers.date import DateTrigger
+
+    from sastb.config.models.scheduler import (
+        SchedulerConfig,
+        SchedulerJobStores,
+    )
+    from sastb.modules.scheduler import SchedulerApp
+    from sastb.utils.singleton import Singleton
+
+    Singleton._instances.pop(SchedulerApp, None)
+    scheduler = SchedulerApp(
+        config=SchedulerConfig(
+            jobstores=SchedulerJobStores(
+                file_name=f"{db_dir}/scheduler.db",
+            ),
+        ),
+    )
+    await scheduler.start()
+    trigger = DateTrigger(
+        run_date=datetime(2100, 1, 1, tzinfo=timezone.utc),
+    )
+    calls = 2000
+    deadline = time.time() + 3600
+
+    def schedule(index: int):
+        scheduler.schedule_job(
+            job_id=f"benchmark_{index}",
+            func=noop_job,
+            kwargs={"chat_id": -100, "user_id": index},
+            trigger=trigger,
+        )
+
+    results = [
+        measure_sequence("schedule_job", schedule, calls),
+        measure_sequence(
+            "cancel_job",
+            lambda index: scheduler.cancel_job(f"benchmark_{index}"),
+            calls,
+        ),
+        measure_sequence(
+            "verification_add",
+            lambda index: scheduler.verifications.add(
+                chat_id=-100,
+                user_id=index,
+                message_id=index,
+                deadline=deadline,
+            ),
+            calls,
+        ),
+        measure_sequence(
+            "verification_cancel",
+            lambda index: scheduler.verifications.cancel(
+                chat_id=-100, user_id=index,
+            ),
+            calls,
+        ),
+    ]
+    await scheduler.stop()
+    Singleton._instances.pop(SchedulerApp, None)
+    return results
+
+
+async def run() -> list[dict]:
+    """Run all cases."""
+    results = [
+        *get_callback_cases(),
+        *get_settings_cases(),
+        *get_logging_cases(),
+        *get_update_cases(),
+    ]
+    with tempfile.TemporaryDirectory() as db_dir:
+        results.extend(await get_scheduler_cases(db_dir))
+    return results
+
+
+def compare(results: list[dict], baseline_file: str, threshold: float):
+    """Print the change against a previous run, fail on regressions."""
+    with open(baseline_file) as file:
+        baseline = {
+            result["name"]: result for result in json.load(file)["results"]
+        }
+
+    regressions = []
+    for result in results:
+        previous = baseline.get(result["name"])
+        if previous is None:
+            continue
+        ratio = result["per_call_us"] / max(previous["per_call_us"], 1e-9)
+        print(
+            f"{result['name']:<32} {previous['per_call_us']:>10.3f} us "
+            f"-> {result['per_call_us']:>10.3f} us  x{ratio:.2f}",
+            file=sys.stderr,
+        )
+        if ratio > threshold:
+            regressions.append(result["name"])
+
+    if regressions:
+        print(f"Regressions: {', '.join(regressions)}", file=sys.stderr)
+        sys.exit(1)
+
+
+def main(output: str | None, baseline: str | None, threshold: float):
+    """Run the benchmark."""
+    with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+        results = runner.run(run())
+
+    report = json.dumps(
+        {
+            "commit": get_commit(),
+            "python": platform.python_version(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "results": results,
+        },
+        indent=2,
+    )
+    if output:
+        with open(output, "w") as file:
+            file.write(report + "\n")
+    else:
+        print(report)
+
+    if baseline:
+        compare(results, baseline, threshold)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", help="File for the JSON results")
+    parser.add_argument("--compare", help="JSON results of a previous run")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="Slowdown ratio reported as regression",
+    )
+    args = parser.parse_args()
+
+    # Silence per-job INFO lines so they do not dominate the measurement
+    logger.remove()
+    main(args.output, args.compare, args.threshold)
@@ -0,0 +1,105 @@
+"""
+Measure how long job store operations stall the event loop.
+
+Simulates a join wave: every "join" schedules a kick job and most of them
+are cancelled shortly after, like confirm button clicks do. A probe task
+ticks every millisecond and records how late it wakes up.
+
+Usage:
+    python -m benchmarks.jobstore_loop_stall --joins 2000
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import uvloop
+from apscheduler.triggers.interval import IntervalTrigger
+
+from sastb.config.models.scheduler import SchedulerConfig, SchedulerJobStores
+from sastb.modules.scheduler import SchedulerApp
+from sastb.utils.singleton import Singleton
+
+
+PROBE_INTERVAL = 0.001
+
+
+async def noop_job(**kwargs):
+    """Job placeholder, never executed during the benchmark."""
+
+
+async def probe(stalls: list[float], stop: asyncio.Event):
+    """Record event loop wake-up delays."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        stalls.append(time.perf_counter() - started - PROBE_INTERVAL)
+
+
+async def run_backend(backend: str, joins: int, db_dir: Path) -> dict:
+    """Run the join wave against one job store backend."""
+    Singleton._instances.pop(SchedulerApp, None)
+    scheduler = SchedulerApp(
+        config=SchedulerConfig(
+            jobstores=SchedulerJobStores(
+                backend=backend,
+                file_name=str(db_dir / f"{backend}.db"),
+            ),
+        ),
+    )
+    await scheduler.start()
+
+    stalls: list[float] = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(stalls, stop))
+
+    started = time.perf_counter()
+    for index in range(joins):
+        job_id = f"kick_-100_{index}"
+        scheduler.schedule_job(
+            job_id=job_id,
+            func=noop_job,
+            kwargs={"chat_id": -100, "user_id": index, "message_id": index},
+            trigger=IntervalTrigger(minutes=5),
+        )
+        # 9 of 10 users confirm
+        if index % 10:
+            scheduler.cancel_job(job_id)
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe_task
+    await scheduler.stop()
+
+    stalls.sort()
+    return {
+        "backend": backend,
+        "joins": joins,
+        "elapsed_s": round(elapsed, 3),
+        "stall_total_ms": round(sum(stalls) * 1000, 1),
+        "stall_p99_ms": round(stalls[int(len(stalls) * 0.99)] * 1000, 3),
+        "stall_max_ms": round(stalls[-1] * 1000, 3),
+    }
+
+
+async def main(joins: int):
+    """Run the benchmark for all backends."""
+    with tempfile.TemporaryDirectory() as db_dir:
+        for backend in ("sqlalchemy", "aiosqlite"):
+            print(await run_backend(backend, joins, Path(db_dir)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--joins", type=int, default=2000)
+    args = parser.parse_args()
+
+    # Silence per-job INFO lines so they do not dominate the measurement
+    from loguru import logger
+    logger.remove()
+
+    with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+        runner.run(main(args.joins))
@@ -0,0 +1,130 @@
+"""
+Measure logging calls per second with file sinks.
+
+"before" attaches RotatingFileHandler with the JSON formatter setup_logging
+used before to loguru; "after" uses QueuedFileSink. Both write an INFO
+file and an ERROR file, the console sink is not attached. "calls_per_second"
+is what the calling thread (the event loop) sees, "total_seconds"
+includes waiting for all records to be written.
+
+Usage:
+    python -m benchmarks.log_throughput --records 100000
+"""
+
+import argparse
+import tempfile
+import time
+from logging import Formatter, handlers as logging_handlers
+
+import orjson
+from loguru import logger
+
+from sastb.utils.cli.log_sink import QueuedFileSink
+
+
+class JsonFormatter(Formatter):
+    """JSON formatter of log files before QueuedFileSink, the baseline."""
+
+    fmt_dict = {
+        "timestamp": "asctime",
+        "level": "levelname",
+        "logger": "name",
+        "message": "msg",
+    }
+
+    def __init__(
+        self,
+        time_format: str = "%Y-%m-%dT%H:%M:%S",
+        msec_format: str = "%s.%03dZ",
+    ):
+        self.default_time_format = time_format
+        self.default_msec_format = msec_format
+
+    def formatMessage(self, record) -> dict:
+        if "asctime" in self.fmt_dict.values():
+            record.asctime = self.formatTime(record, self.default_time_format)
+
+        return {
+            fmt_key: record.__dict__[fmt_val]
+            for fmt_key, fmt_val in self.fmt_dict.items()
+        }
+
+    def format(self, record) -> str:
+        """Format the LogRecord into a JSON string."""
+        return orjson.dumps({
+            **self.formatMessage(record),
+            "extra": record.__dict__.get("extra", {}),
+            "exception": str(record.exc_info),
+            "@version_log": 1,
+        }, default=str).decode()
+
+
+def add_before_sinks(directory: str):
+    """Attach blocking rotating file handlers."""
+    for name, level in (("app", "INFO"), ("errors", "ERROR")):
+        handler = logging_handlers.RotatingFileHandler(
+            f"{directory}/{name}.jsonl",
+            maxBytes=10_000_000,
+            backupCount=5,
+        )
+        handler.setFormatter(JsonFormatter())
+        logger.add(handler, format="{message}", level=level)
+
+
+def add_after_sinks(directory: str, overflow: str):
+    """Attach queued file sinks."""
+    for name, level in (("app", "INFO"), ("errors", "ERROR")):
+        logger.add(
+            QueuedFileSink(
+                f"{directory}/{name}.jsonl",
+                max_bytes=10_000_000,
+                backup_count=5,
+                overflow=overflow,
+            ),
+            format="{message}",
+            level=level,
+        )
+
+
+def measure(name: str, records: int, add_sinks) -> dict:
+    """Run one benchmark round."""
+    with tempfile.TemporaryDirectory() as directory:
+        logger.remove()
+        sinks = add_sinks(directory)
+        started = time.perf_counter()
+        with logger.contextualize(module="bot", chat_id=-100123):
+            for index in range(records):
+                logger.info(f"New member {index} in chat -100123")
+        calls_elapsed = time.perf_counter() - started
+        # Removing sinks waits for queued records to be written
+        logger.remove()
+        total_elapsed = time.perf_counter() - started
+
+    return {
+        "variant": name,
+        "records": records,
+        "calls_per_second": round(records / calls_elapsed),
+        "per_call_us": round(calls_elapsed / records * 1e6, 2),
+        "total_seconds": round(total_elapsed, 3),
+        "sinks": sinks,
+    }
+
+
+def main(records: int):
+    """Run the benchmark."""
+    variants = (
+        ("before", add_before_sinks),
+        ("after_drop", lambda d: add_after_sinks(d, "drop")),
+        ("after_block", lambda d: add_after_sinks(d, "block")),
+    )
+    for name, add_sinks in variants:
+        result = measure(name, records, add_sinks)
+        result.pop("sinks")
+        print(result)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=100000)
+    args = parser.parse_args()
+    main(args.records)
@@ -0,0 +1,157 @@
+"""
+Compare memory of N single-bot processes with one N-bot process.
+
+Every process starts the scheduler and the bot app like ``start`` does,
+then feeds ``--updates`` member join updates to each of its bots, which
+send welcome messages to a fake Bot API server. The peak RSS of the
+separate processes is summed, like N containers of one bot each would
+use, and compared with one process hosting all N bots.
+
+Usage:
+    python -m benchmarks.multi_bot_rss --bots 1 2 4 8 --updates 200
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+import uvloop
+from loguru import logger
+
+from sastb.utils.fake_bot_api import FakeBotApi
+
+
+def make_update(update_id: int) -> dict:
+    """Build a raw member join update of a chat of its own."""
+    user = {"id": 1000 + update_id, "is_bot": False, "first_name": "User"}
+    return {
+        "update_id": update_id,
+        "chat_member": {
+            "chat": {"id": -1000 - update_id, "type": "supergroup"},
+            "from": user,
+            "date": int(time.time()),
+            "old_chat_member": {"status": "left", "user": user},
+            "new_chat_member": {"status": "member", "user": user},
+        },
+    }
+
+
+async def feed_updates(updates: int):
+    """Start the apps, feed join updates to every bot and stop."""
+    from aiogram.types import Update
+    from aiogram.utils.token import extract_bot_id
+
+    from sastb.config import ApplicationSettings
+    from sastb.modules.bot import BotApp
+    from sastb.modules.scheduler import SchedulerApp
+
+    settings = ApplicationSettings().snapshot()  # type: ignore
+    scheduler = SchedulerApp(
+        config=settings.scheduler,
+        bot_ids=[
+            extract_bot_id(token) for token in settings.telegram.tokens
+        ],
+    )
+    await scheduler.start()
+    bot_app = BotApp(settings=settings)
+    bot_app._include_routers()
+
+    for context in bot_app.contexts.values():
+        for update_id in range(updates):
+            await bot_app.dispatcher.feed_update(
+                context.bot,
+                Update.model_validate(make_update(update_id)),
+            )
+
+    await scheduler.stop()
+    await bot_app.dispatcher.emit_shutdown(bot=bot_app.bot)
+    await bot_app.bot.session.close()
+
+
+def run_process(
+    tokens: list[str],
+    api_url: str,
+    db_dir: str,
+    updates: int,
+    results: multiprocessing.Queue,
+):
+    """Run the bots of the tokens and report the peak RSS in KiB."""
+    os.environ.update({
+        "sastb_telegram__token": tokens[0],
+        "sastb_telegram__additional_tokens": json.dumps(tokens[1:]),
+        "sastb_telegram__api_base_url": api_url,
+        "sastb_telegram__rate_limits__enabled": "false",
+        "sastb_administrators": "1",
+        "sastb_scheduler__jobstores__file_name": os.path.join(
+            db_dir, f"{tokens[0].split(':')[0]}.db",
+        ),
+    })
+    logger.remove()
+
+    with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+        runner.run(feed_updates(updates))
+    results.put(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+async def measure(
+    token_groups: list[list[str]],
+    api_url: str,
+    updates: int,
+) -> int:
+    """Run one process per token group and sum their peak RSS in KiB."""
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    with tempfile.TemporaryDirectory() as db_dir:
+        processes = [
+            context.Process(
+                target=run_process,
+                args=(tokens, api_url, db_dir, updates, results),
+            )
+            for tokens in token_groups
+        ]
+        for process in processes:
+            process.start()
+        loop = asyncio.get_running_loop()
+        for process in processes:
+            await loop.run_in_executor(None, process.join)
+
+    return sum(results.get() for _ in processes)
+
+
+async def main(bot_counts: list[int], updates: int):
+    """Run the comparison for every number of bots."""
+    api = FakeBotApi()
+    api_url = await api.start()
+    try:
+        for bot_count in bot_counts:
+            tokens = [f"{1000 + index}:TOKEN" for index in range(bot_count)]
+            separate = await measure(
+                [[token] for token in tokens], api_url, updates,
+            )
+            shared = await measure([tokens], api_url, updates)
+            print({
+                "bots": bot_count,
+                "updates_per_bot": updates,
+                "separate_rss_mib": round(separate / 1024, 1),
+                "shared_rss_mib": round(shared / 1024, 1),
+                "saved_pct": round((1 - shared / separate) * 100, 1),
+            })
+    finally:
+        await api.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bots", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--updates", type=int, default=200)
+    args = parser.parse_args()
+
+    logger.remove()
+
+    with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+        runner.run(main(args.bots, args.updates))
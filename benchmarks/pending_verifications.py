@@ -0,0 +1,88 @@
+"""
+Compare memory and add/cancel cost of pending verifications kept as
+APScheduler jobs and in the deadline heap.
+
+Usage:
+    python -m benchmarks.pending_verifications --users 100000
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+import uvloop
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+
+from sastb.modules.scheduler.pending_verifications import PendingVerifications
+
+
+async def noop_job(**kwargs):
+    """Job placeholder, never executed during the benchmark."""
+
+
+def measure(name: str, users: int, add, cancel) -> dict:
+    """Add all users, then cancel 9 of 10 of them."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    for user_id in range(users):
+        add(user_id)
+    add_elapsed = time.perf_counter() - started
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for user_id in range(users):
+        if user_id % 10:
+            cancel(user_id)
+    cancel_elapsed = time.perf_counter() - started
+
+    return {
+        "engine": name,
+        "users": users,
+        "add_us": round(add_elapsed / users * 1e6, 2),
+        "cancel_us": round(cancel_elapsed / (users * 0.9) * 1e6, 2),
+        "memory_mb": round(memory / 2**20, 1),
+    }
+
+
+async def main(users: int):
+    """Run the benchmark for both engines."""
+    scheduler = AsyncIOScheduler(jobstores={"default": MemoryJobStore()})
+    scheduler.start(paused=True)
+    trigger = IntervalTrigger(minutes=5)
+    print(measure(
+        "apscheduler",
+        users,
+        lambda user_id: scheduler.add_job(
+            noop_job,
+            trigger=trigger,
+            id=f"kick_-100_{user_id}",
+            kwargs={"chat_id": -100, "user_id": user_id, "message_id": 1},
+        ),
+        lambda user_id: scheduler.remove_job(f"kick_-100_{user_id}"),
+    ))
+    scheduler.shutdown(wait=False)
+
+    verifications = PendingVerifications(":memory:", noop_job)
+    deadline = time.time() + 300
+    print(measure(
+        "deadline_heap",
+        users,
+        lambda user_id: verifications.add(-100, user_id, 1, deadline),
+        lambda user_id: verifications.cancel(-100, user_id),
+    ))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100_000)
+    args = parser.parse_args()
+
+    from loguru import logger
+    logger.remove()
+
+    with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+        runner.run(main(args.users))
@@ -0,0 +1,49 @@
+"""
+Measure per-update overhead of settings access and template rendering.
+
+"before" re-instantiates ApplicationSettings and formats the template
+string, like handlers did; "after" reads the startup snapshot and calls
+the compiled template.
+
+Usage:
+    python -m benchmarks.settings_access --updates 2000
+"""
+
+import argparse
+import os
+import timeit
+
+from sastb.config import ApplicationSettings
+
+
+def main(updates: int):
+    """Run the benchmark."""
+    os.environ.setdefault("sastb_telegram__token", "123:ABC")
+    os.environ.setdefault(
+        "sastb_telegram__webhook_base_url", "https://example.com",
+    )
+    os.environ.setdefault("sastb_administrators", "123456789")
+    snapshot = ApplicationSettings().snapshot()  # type: ignore
+    user = '<a href="tg://user?id=1">User</a>'
+
+    def before():
+        settings = ApplicationSettings()  # type: ignore
+        return settings.text_templates.welcome_message_text.format(user=user)
+
+    def after():
+        return snapshot.text_templates.welcome_message_text(user=user)
+
+    for name, func in (("before", before), ("after", after)):
+        elapsed = timeit.timeit(func, number=updates)
+        print({
+            "variant": name,
+            "updates": updates,
+            "per_update_us": round(elapsed / updates * 1e6, 3),
+        })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--updates", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.updates)
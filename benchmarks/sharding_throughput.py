@@ -0,0 +1,198 @@
+"""
+Measure update throughput of sharded worker processes.
+
+The front routes raw chat_member updates by chat ID and writes them to
+worker sockets, like the ``start --workers N`` front process does. Every
+worker parses updates and runs a handler doing ``--handler-us``
+microseconds of CPU work, standing in for handlers and logging. The
+throughput should grow with the number of workers up to the number of
+CPU cores.
+
+Usage:
+    python -m benchmarks.sharding_throughput --updates 20000 --workers 1 2 4
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
+from collections import Counter
+
+import orjson
+import uvloop
+from aiogram import Bot, Dispatcher, Router
+from aiogram.client.session.base import BaseSession
+from aiogram.types import ChatMemberUpdated
+from loguru import logger
+
+from sastb.config.models.telegram import TelegramUpdatePool
+from sastb.modules.bot.utils.update_shards import (
+    ShardServer,
+    get_update_shard,
+    write_frame,
+)
+from sastb.modules.bot.utils.update_worker_pool import UpdateWorkerPool
+
+
+CHATS = 1000
+
+
+class NoopSession(BaseSession):
+    """Session answering every Bot API call with True."""
+
+    async def make_request(self, bot, method, timeout=None):
+        return True
+
+    async def stream_content(self, *args, **kwargs):
+        yield b""
+
+    async def close(self):
+        pass
+
+
+def make_update(update_id: int) -> bytes:
+    """Build a raw chat_member update of one of CHATS chats."""
+    user = {"id": 1000 + update_id, "is_bot": False, "first_name": "User"}
+    return orjson.dumps({
+        "update_id": update_id,
+        "chat_member": {
+            "chat": {"id": -100 - update_id % CHATS, "type": "supergroup"},
+            "from": user,
+            "date": 0,
+            "old_chat_member": {"status": "left", "user": user},
+            "new_chat_member": {"status": "member", "user": user},
+        },
+    })
+
+
+async def run_worker(
+    path: str,
+    expected: int,
+    handler_us: int,
+    finished: multiprocessing.Queue,
+):
+    """Process ``expected`` updates received on the socket."""
+    router = Router()
+    done = asyncio.Event()
+    processed = 0
+
+    @router.chat_member()
+    async def handler(event: ChatMemberUpdated):
+        nonlocal processed
+        deadline = time.perf_counter() + handler_us / 1e6
+        while time.perf_counter() < deadline:
+            pass
+        event.new_chat_member.user.mention_html()
+        processed += 1
+        if processed == expected:
+            done.set()
+
+    dispatcher = Dispatcher()
+    dispatcher.include_router(router)
+    bot = Bot("123:ABC", session=NoopSession())
+    pool = UpdateWorkerPool(
+        dispatcher=dispatcher,
+        bot=bot,
+        config=TelegramUpdatePool(workers=32, stats_interval=3600),
+    )
+    server = ShardServer(pool=pool, path=path)
+    await pool.start()
+    await server.start()
+    await done.wait()
+    finished.put(time.time())
+    await server.close()
+    await pool.close()
+
+
+def worker_main(
+    path: str,
+    expected: int,
+    handler_us: int,
+    finished: multiprocessing.Queue,
+):
+    """Worker process entry point."""
+    logger.remove()
+    with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+        runner.run(run_worker(path, expected, handler_us, finished))
+
+
+async def run_front(paths: list[str], payloads: list[bytes]):
+    """Route all updates to the workers."""
+    writers = []
+    for path in paths:
+        while True:
+            try:
+                _, writer = await asyncio.open_unix_connection(path)
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                await asyncio.sleep(0.05)
+        writers.append(writer)
+
+    started = time.time()
+    for payload in payloads:
+        update = orjson.loads(payload)
+        writer = writers[get_update_shard(update, len(writers))]
+        write_frame(writer, payload)
+        await writer.drain()
+    for writer in writers:
+        writer.close()
+        await writer.wait_closed()
+    return started
+
+
+def measure(workers: int, updates: int, handler_us: int) -> dict:
+    """Run one benchmark round."""
+    payloads = [make_update(update_id) for update_id in range(updates)]
+    expected = Counter(
+        get_update_shard(orjson.loads(payload), workers)
+        for payload in payloads
+    )
+
+    with tempfile.TemporaryDirectory() as sockets_dir:
+        paths = [f"{sockets_dir}/{shard}.sock" for shard in range(workers)]
+        context = multiprocessing.get_context("spawn")
+        finished = context.Queue()
+        processes = [
+            context.Process(
+                target=worker_main,
+                args=(path, expected[shard], handler_us, finished),
+            )
+            for shard, path in enumerate(paths)
+        ]
+        for process in processes:
+            process.start()
+
+        started = asyncio.run(run_front(paths, payloads))
+        finished_at = max(finished.get() for _ in processes)
+        for process in processes:
+            process.join()
+        elapsed = finished_at - started
+
+    return {
+        "workers": workers,
+        "updates": updates,
+        "seconds": round(elapsed, 3),
+        "updates_per_second": round(updates / elapsed),
+    }
+
+
+def main(updates: int, workers: list[int], handler_us: int):
+    """Run the benchmark."""
+    print({"cpu_count": os.cpu_count()})
+    baseline = None
+    for count in workers:
+        result = measure(count, updates, handler_us)
+        baseline = baseline or result["updates_per_second"]
+        result["speedup"] = round(result["updates_per_second"] / baseline, 2)
+        print(result)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--updates", type=int, default=20000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--handler-us", type=int, default=200)
+    args = parser.parse_args()
+    main(args.updates, args.workers, args.handler_us)
@@ -1,3 +1,4 @@
-__all__ = ("ApplicationSettings",)
+__all__ = ("ApplicationSettings", "SettingsSnapshot")
 
 from .config import ApplicationSettings
+from .snapshot import SettingsSnapshot
@@ -5,10 +5,14 @@ from typing import Annotated
 from pydantic import field_validator, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict, NoDecode
 
+from .models.chat_settings import ChatSettingsConfig
 from .models.default_settings import DefaultSettings
+from .models.logging import LoggingConfig
+from .models.metrics import MetricsConfig
 from .models.scheduler import SchedulerConfig
 from .models.telegram import TelegramConfig
 from .models.templates import TemplatesSettings
+from .snapshot import SettingsSnapshot
 
 
 class Settings(BaseSettings):
@@ -33,13 +37,28 @@ class Settings(BaseSettings):
     telegram: TelegramConfig
     scheduler: SchedulerConfig = SchedulerConfig()
     default_settings: DefaultSettings = DefaultSettings()
+    chat_settings: ChatSettingsConfig = ChatSettingsConfig()
+    metrics: MetricsConfig = MetricsConfig()
+    logging: LoggingConfig = LoggingConfig()
     text_templates: TemplatesSettings = TemplatesSettings()
 
     @field_validator('administrators', mode='before')
     @classmethod
-    def decode_administrators(cls, v: str) -> list[int]:
+    def decode_administrators(cls, v: str | list[int]) -> list[int]:
+        if not isinstance(v, str):
+            return v
         return [int(x) for x in v.split(',') if x]
 
+    def snapshot(self) -> SettingsSnapshot:
+        """
+        Create an immutable snapshot of the current settings.
+
+        Returns:
+            SettingsSnapshot: The settings snapshot.
+
+        """
+        return SettingsSnapshot.from_settings(self)
+
 
 
 class ApplicationSettings(Settings):
@@ -0,0 +1,27 @@
+__all__ = ("ChatSettingsConfig",)
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ChatSettingsConfig(BaseModel):
+    """Per-chat settings overrides."""
+
+    model_config = ConfigDict(frozen=True)
+
+    enabled: bool = Field(
+        default=False,
+        description=(
+            "Whether chat administrators can override settings of their "
+            "chat with bot commands, the bot receives all messages of "
+            "chats where it is an administrator then"
+        ),
+    )
+    file_name: str = Field(
+        default="db/chat_settings.db",
+        description="File name for the SQLite database of overrides",
+    )
+    cache_size: int = Field(
+        default=10_000,
+        ge=1,
+        description="Number of chats whose settings are kept in memory",
+    )
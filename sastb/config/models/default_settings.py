@@ -1,25 +1,95 @@
 __all__ = ("DefaultSettings",)
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+# Longest delay in minutes, a week
+MAX_DELAY = 7 * 24 * 60
+
+
+class RaidModeSettings(BaseModel):
+    """Settings for burst joins handling."""
+
+    model_config = ConfigDict(frozen=True)
+
+    enabled: bool = Field(
+        default=True,
+        description="Whether to switch chats to raid mode on burst joins",
+    )
+    join_threshold: int = Field(
+        default=10,
+        ge=2,
+        description="Number of joins within join_window that starts raid mode",
+    )
+    join_window: float = Field(
+        default=60,
+        gt=0,
+        description="Time in seconds to count joins in",
+    )
+    cooldown: float = Field(
+        default=300,
+        ge=0,
+        description="Time in seconds to stay in raid mode after last burst",
+    )
+    batch_window: float = Field(
+        default=30,
+        gt=0,
+        description=(
+            "Time in seconds to collect joined users into one shared "
+            "verification message"
+        ),
+    )
+    edit_interval: float = Field(
+        default=3,
+        gt=0,
+        description="Time in seconds between edits of the shared message",
+    )
+    max_mentions: int = Field(
+        default=20,
+        ge=1,
+        description="Number of users mentioned in the shared message",
+    )
 
 
 class DefaultSettings(BaseModel):
     """Default settings for the bot."""
 
-    remove_user_after: int = Field(
+    model_config = ConfigDict(frozen=True)
+
+    remove_user_after: float = Field(
         default=5,
+        gt=0,
+        le=MAX_DELAY,
+        allow_inf_nan=False,
         description="Time in minutes to remove user after confirmation",
     )
     additional_delay_for_permissions: int = Field(
         default=2,
+        ge=0,
+        le=MAX_DELAY,
         description=(
             "Time in minutes to delay for permissions that adds to "
             "remove_user_after time"
         ),
     )
+    delete_join_messages: bool = Field(
+        default=False,
+        description=(
+            "Whether to delete join service messages, the bot receives "
+            "all messages of chats where it is an administrator then"
+        ),
+    )
+    verify_join_requests: bool = Field(
+        default=False,
+        description=(
+            "Whether to verify join requests with a challenge in private "
+            "messages and approve or decline them, users approved this way "
+            "are not verified again in the group"
+        ),
+    )
+    raid_mode: RaidModeSettings = RaidModeSettings()
 
     @property
-    def restore_permissions_time(self) -> int:
+    def restore_permissions_time(self) -> float:
         """
         Calculate the time in minutes to restore permissions.
         """
@@ -0,0 +1,104 @@
+__all__ = ("LoggingConfig",)
+
+from typing import Annotated, Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class LoggingConfig(BaseModel):
+    """Log files settings."""
+
+    model_config = ConfigDict(frozen=True)
+
+    directory: str = Field(
+        default="logs",
+        description="Directory for log files",
+    )
+    max_bytes: int = Field(
+        default=100_000_000,
+        gt=0,
+        description="Log file size in bytes after which it is rotated",
+    )
+    backup_count: int = Field(
+        default=50,
+        ge=0,
+        description="Number of rotated log files to keep",
+    )
+    queue_size: int = Field(
+        default=10_000,
+        gt=0,
+        description="Number of log records waiting to be written",
+    )
+    batch_size: int = Field(
+        default=1000,
+        gt=0,
+        description="Maximum number of log records written at once",
+    )
+    flush_interval: float = Field(
+        default=0.1,
+        gt=0,
+        description="Time in seconds the writer waits for new records",
+    )
+    overflow: Literal["drop", "block"] = Field(
+        default="drop",
+        description=(
+            "What to do with records below ERROR when the queue is full: "
+            "'drop' them or 'block' until there is space"
+        ),
+    )
+    compression: Literal["gzip", "none"] = Field(
+        default="gzip",
+        description=(
+            "Compression of rotated log files, done in a background thread"
+        ),
+    )
+    compression_level: int = Field(
+        default=6,
+        ge=1,
+        le=9,
+        description="Gzip compression level of rotated log files",
+    )
+    retention_bytes: Optional[int] = Field(
+        default=1_000_000_000,
+        gt=0,
+        description=(
+            "Total size in bytes of rotated files of each log file, "
+            "the oldest files above it are removed"
+        ),
+    )
+    retention_days: Optional[float] = Field(
+        default=30,
+        gt=0,
+        description="Age in days after which rotated files are removed",
+    )
+    sample_rates: dict[str, Annotated[float, Field(ge=0, le=1)]] = Field(
+        default={
+            "sastb.modules.bot.routes.confirm_btn": 0.01,
+            "sastb.modules.bot.routes.member_join": 0.01,
+            "sastb.modules.bot.routes.member_left": 0.01,
+            "sastb.modules.scheduler.routes": 0.01,
+            "sastb.modules.scheduler.app:cancel_job": 0.01,
+            "sastb.modules.scheduler.app:get_job": 0.01,
+            "sastb.modules.scheduler.app:schedule_job": 0.01,
+        },
+        description=(
+            "Share of logged records below WARNING by 'module:function', "
+            "module or package, the most specific match wins, "
+            "other records are all logged"
+        ),
+    )
+    dedup_level: Literal["WARNING", "ERROR"] = Field(
+        default="WARNING",
+        description=(
+            "Level from which repeated records of the same source line are "
+            "logged once per summary interval with a repeat count"
+        ),
+    )
+    summary_interval: float = Field(
+        default=60,
+        gt=0,
+        description=(
+            "Time in seconds between per-chat event summaries and "
+            "repeated records reports"
+        ),
+    )
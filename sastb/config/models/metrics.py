@@ -0,0 +1,18 @@
+__all__ = ("MetricsConfig",)
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class MetricsConfig(BaseModel):
+    """Prometheus metrics settings."""
+
+    model_config = ConfigDict(frozen=True)
+
+    enabled: bool = Field(
+        default=True,
+        description="Whether to expose metrics on the webhook server",
+    )
+    path: str = Field(
+        default="/metrics",
+        description="Path of the metrics endpoint",
+    )
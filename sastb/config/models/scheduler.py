@@ -1,15 +1,35 @@
 __all__ = ("SchedulerConfig",)
 
-from pydantic import BaseModel, Field
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class SchedulerJobStores(BaseModel):
     """Scheduler job stores settings."""
 
+    model_config = ConfigDict(frozen=True)
+
+    backend: Literal["aiosqlite", "sqlalchemy"] = Field(
+        default="aiosqlite",
+        description=(
+            "Job store backend: 'aiosqlite' keeps jobs in memory and "
+            "persists them in background, 'sqlalchemy' uses blocking "
+            "SQLAlchemyJobStore."
+        ),
+    )
     file_name: str = Field(
         default="db/scheduler.db",
         description="File name for the SQLite database.",
     )
+    flush_interval: float = Field(
+        default=0.5,
+        ge=0,
+        description=(
+            "Time in seconds to collect job changes before writing, "
+            "changes within it are lost on a crash"
+        ),
+    )
 
     @property
     def sqlite_url(self) -> str:
@@ -25,7 +45,74 @@ class SchedulerJobStores(BaseModel):
         )
 
 
+class SchedulerVerifications(BaseModel):
+    """Pending verifications settings."""
+
+    model_config = ConfigDict(frozen=True)
+
+    flush_interval: float = Field(
+        default=1.0,
+        ge=0,
+        description=(
+            "Time in seconds to collect verification changes before "
+            "writing, verifications cancelled within it never reach disk"
+        ),
+    )
+    catch_up_rate: float = Field(
+        default=5,
+        gt=0,
+        description=(
+            "Verifications overdue on startup processed per second, "
+            "oldest deadline first"
+        ),
+    )
+    catch_up_concurrency: int = Field(
+        default=5,
+        ge=1,
+        description=(
+            "Verifications overdue on startup processed at once"
+        ),
+    )
+
+
+class SchedulerMonitoring(BaseModel):
+    """Scheduler lag monitoring settings."""
+
+    model_config = ConfigDict(frozen=True)
+
+    summary_interval: float = Field(
+        default=60,
+        gt=0,
+        description="Time in seconds between scheduler summary log lines",
+    )
+    lag_alert_threshold: float = Field(
+        default=30,
+        gt=0,
+        description=(
+            "Time in seconds a job may start after its scheduled time "
+            "before an alert is logged"
+        ),
+    )
+    runtime_alert_threshold: float = Field(
+        default=10,
+        gt=0,
+        description="Job runtime in seconds after which an alert is logged",
+    )
+
+
 class SchedulerConfig(BaseModel):
     """Scheduler settings for application."""
 
+    model_config = ConfigDict(frozen=True)
+
     jobstores: SchedulerJobStores = SchedulerJobStores()
+    verifications: SchedulerVerifications = SchedulerVerifications()
+    monitoring: SchedulerMonitoring = SchedulerMonitoring()
+    misfire_grace_time: int | None = Field(
+        default=3600,
+        ge=1,
+        description=(
+            "Time in seconds a late raid sweep job is still run, None to "
+            "run late sweeps regardless of delay"
+        ),
+    )
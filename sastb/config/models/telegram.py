@@ -1,11 +1,15 @@
 __all__ = ("TelegramConfig",)
 
-from pydantic import BaseModel, Field
+from typing import Optional
+
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field
 
 
 class BotInfo(BaseModel):
     """Bot information."""
 
+    model_config = ConfigDict(frozen=True)
+
     description: str = Field(
         default=(
             "The source code of this bot is available at "
@@ -27,10 +31,151 @@ class BotInfo(BaseModel):
     )
 
 
+class TelegramRateLimits(BaseModel):
+    """Outbound Bot API rate limits."""
+
+    model_config = ConfigDict(frozen=True)
+
+    enabled: bool = Field(
+        default=True,
+        description="Whether to rate limit outbound Bot API calls",
+    )
+    global_rate: float = Field(
+        default=30,
+        gt=0,
+        description="Number of calls allowed per global period",
+    )
+    global_period: float = Field(
+        default=1,
+        gt=0,
+        description="Global period in seconds",
+    )
+    chat_rate: float = Field(
+        default=20,
+        gt=0,
+        description="Number of messages allowed per chat period in a chat",
+    )
+    chat_period: float = Field(
+        default=60,
+        gt=0,
+        description="Chat period in seconds",
+    )
+    max_retries: int = Field(
+        default=3,
+        ge=0,
+        description="Number of retries of calls failed with flood control",
+    )
+
+
+class TelegramUpdatePool(BaseModel):
+    """Worker pool for incoming updates."""
+
+    model_config = ConfigDict(frozen=True)
+
+    enabled: bool = Field(
+        default=True,
+        description=(
+            "Whether to respond to webhook requests right after queuing the "
+            "update to the worker pool, polling always uses the pool"
+        ),
+    )
+    workers: int = Field(
+        default=32,
+        ge=1,
+        description="Number of updates of different chats processed at once",
+    )
+    max_queue_size: int = Field(
+        default=10_000,
+        ge=1,
+        description="Number of queued updates after which new are rejected",
+    )
+    close_timeout: float = Field(
+        default=10,
+        ge=0,
+        description="Time in seconds to process queued updates on shutdown",
+    )
+    stats_interval: float = Field(
+        default=60,
+        gt=0,
+        description="Time in seconds between worker pool stats log lines",
+    )
+
+
+class TelegramPolling(BaseModel):
+    """Long polling settings."""
+
+    model_config = ConfigDict(frozen=True)
+
+    limit: int = Field(
+        default=100,
+        ge=1,
+        le=100,
+        description="Number of updates fetched by one getUpdates call",
+    )
+    timeout: int = Field(
+        default=30,
+        ge=0,
+        description="Time in seconds getUpdates waits for new updates",
+    )
+    retry_delay: float = Field(
+        default=5,
+        ge=0,
+        description="Time in seconds to wait after failed getUpdates call",
+    )
+
+
+class TelegramMemberCache(BaseModel):
+    """Chat member states cache settings."""
+
+    model_config = ConfigDict(frozen=True)
+
+    enabled: bool = Field(
+        default=True,
+        description=(
+            "Take chat member states from chat_member updates instead of "
+            "getChatMember calls when kicking users"
+        ),
+    )
+    max_size: int = Field(
+        default=100_000,
+        ge=1,
+        description="Number of cached chat members",
+    )
+    ttl: float = Field(
+        default=3600,
+        gt=0,
+        description="Time in seconds a cached chat member state is trusted",
+    )
+
+
+class TelegramMessageDeletion(BaseModel):
+    """Batched message deletion settings."""
+
+    model_config = ConfigDict(frozen=True)
+
+    flush_interval: float = Field(
+        default=2,
+        gt=0,
+        description=(
+            "Time in seconds to collect messages of a chat before deleting "
+            "them with one call"
+        ),
+    )
+
+
 class TelegramConfig(BaseModel):
     """Telegram bot settings."""
 
+    model_config = ConfigDict(frozen=True)
+
     token: str = Field(..., description="Telegram bot token")
+    additional_tokens: list[str] = Field(
+        default_factory=list,
+        description=(
+            "Tokens of other bots served by the same process, each bot "
+            "gets webhook_path with its ID appended"
+        ),
+    )
 
     # Server settings
     host: str = Field("0.0.0.0", description="Host for the bot")
@@ -43,11 +188,50 @@ class TelegramConfig(BaseModel):
         "so-secret-token",
         description="Webhook secret token for the bot",
     )
-    webhook_base_url: str = Field(
-        ...,
-        description="Webhook base URL for the bot",
+    webhook_base_url: Optional[str] = Field(
+        None,
+        description="Webhook base URL for the bot, required for webhooks",
+    )
+    reload_path: str = Field(
+        "/admin/reload",
+        description="Path of the settings reload endpoint",
+    )
+    reload_token: Optional[str] = Field(
+        None,
+        description=(
+            "Bearer token of the settings reload endpoint, the endpoint "
+            "is disabled if not set"
+        ),
+    )
+    api_base_url: Optional[str] = Field(
+        None,
+        description=(
+            "Base URL of the Bot API server, e.g. a local Bot API server, "
+            "https://api.telegram.org if not set"
+        ),
     )
     info: BotInfo = BotInfo()
+    rate_limits: TelegramRateLimits = TelegramRateLimits()
+    update_pool: TelegramUpdatePool = Field(
+        default=TelegramUpdatePool(),
+        # Name used before long polling was added
+        validation_alias=AliasChoices("update_pool", "webhook_pool"),
+    )
+    polling: TelegramPolling = TelegramPolling()
+    member_cache: TelegramMemberCache = TelegramMemberCache()
+    message_deletion: TelegramMessageDeletion = TelegramMessageDeletion()
+    connection_limit: int = Field(
+        default=100,
+        ge=1,
+        description="Number of simultaneous keep-alive Bot API connections",
+    )
+
+    @property
+    def tokens(self) -> list[str]:
+        """
+        Tokens of all bots, the main bot first.
+        """
+        return [self.token, *self.additional_tokens]
 
     @property
     def webhook_url(self) -> str:
@@ -55,3 +239,20 @@ class TelegramConfig(BaseModel):
         Generate the webhook URL for the bot.
         """
         return f"{self.webhook_base_url}{self.webhook_path}"
+
+    def get_webhook_path(self, bot_id: int, is_main: bool) -> str:
+        """
+        Get the webhook path of a bot.
+
+        Args:
+            bot_id (int): The ID of the bot.
+            is_main (bool): Whether it is the bot of the ``token`` field,
+                it keeps ``webhook_path`` unchanged.
+
+        Returns:
+            str: The webhook path.
+
+        """
+        if is_main:
+            return self.webhook_path
+        return f"{self.webhook_path}/{bot_id}"
@@ -1,11 +1,13 @@
 __all__ = ("TemplatesSettings",)
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class TemplatesSettings(BaseModel):
     """Default settings for the bot."""
 
+    model_config = ConfigDict(frozen=True)
+
     welcome_message_text: str = Field(
         default="Welcome {user}!\nPlease click button below ⤵️",
         description="Welcome message for new members",
@@ -56,3 +58,51 @@ class TemplatesSettings(BaseModel):
         default="I will start to work in this group. 😊",
         description="Text for invited by admin",
     )
+    raid_welcome_message_text: str = Field(
+        default=(
+            "Welcome {users}!\nA lot of users joined at once, please click "
+            "button below ⤵️"
+        ),
+        description="Shared welcome message for users joined in raid mode",
+    )
+    raid_more_users_text: str = Field(
+        default="and {count} more",
+        description="Text for users not mentioned in the shared message",
+    )
+    raid_kicked_users_text: str = Field(
+        default="{count} users have been kicked from the group.",
+        description="Text for the shared message after kicking users",
+    )
+    join_request_challenge_text: str = Field(
+        default=(
+            "Hi {user}!\nPlease click button below to join {chat} ⤵️"
+        ),
+        description="Private message sent to users requesting to join",
+    )
+    join_request_approved_text: str = Field(
+        default="Your request to join the group is approved, welcome!",
+        description="Text for the private message after approving",
+    )
+    join_request_declined_text: str = Field(
+        default="Your request to join the group has expired.",
+        description="Text for the private message after declining",
+    )
+    chat_settings_text: str = Field(
+        default="Settings overridden in this chat:\n{settings}",
+        description="Reply to /settings listing overrides of the chat",
+    )
+    chat_settings_empty_text: str = Field(
+        default="This chat uses default settings.",
+        description="Reply to /settings in a chat without overrides",
+    )
+    chat_setting_updated_text: str = Field(
+        default="Setting {name} updated.",
+        description="Reply to /set and /unset after changing a setting",
+    )
+    chat_setting_error_text: str = Field(
+        default=(
+            "Failed to update setting: {error}\n\n"
+            "Usage: /set name value, /unset name\nSettings: {names}"
+        ),
+        description="Reply to /set and /unset with an invalid setting",
+    )
@@ -0,0 +1,135 @@
+__all__ = ("SettingsReload", "reload_snapshot")
+
+from dataclasses import dataclass, replace
+from typing import Any
+
+from .snapshot import SettingsSnapshot
+
+
+# Settings applied to new updates without restart
+LIVE_SETTINGS = frozenset({
+    "administrators",
+    "default_settings",
+    "text_templates",
+})
+# Settings of live sections sent to Telegram on startup as allowed updates
+# and default administrator rights
+STARTUP_DEFAULT_SETTINGS = frozenset({
+    "delete_join_messages",
+    "verify_join_requests",
+})
+# Sections compared on reload, text templates are compared by source
+MODEL_SECTIONS = (
+    "telegram",
+    "scheduler",
+    "default_settings",
+    "chat_settings",
+    "metrics",
+    "logging",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class SettingsReload:
+    """Result of a settings reload."""
+
+    # Snapshot to use for new updates
+    settings: SettingsSnapshot
+    # Names of changed settings that are applied
+    applied: tuple[str, ...]
+    # Names of changed settings that are applied after restart only
+    restart_required: tuple[str, ...]
+
+
+def get_changed_settings(
+    current: SettingsSnapshot,
+    new: SettingsSnapshot,
+) -> list[str]:
+    """
+    Get dotted names of settings that differ between snapshots.
+
+    Args:
+        current (SettingsSnapshot): The settings in use.
+        new (SettingsSnapshot): The reloaded settings.
+
+    Returns:
+        list[str]: The names, e.g. ``telegram.port``.
+
+    """
+    changed = []
+    if current.administrators != new.administrators:
+        changed.append("administrators")
+    for section in MODEL_SECTIONS:
+        changed.extend(_get_changed_fields(
+            section,
+            getattr(current, section).model_dump(),
+            getattr(new, section).model_dump(),
+        ))
+    changed.extend(_get_changed_fields(
+        "text_templates",
+        current.text_templates_settings.model_dump(),
+        new.text_templates_settings.model_dump(),
+    ))
+    return changed
+
+
+def _get_changed_fields(name: str, current: Any, new: Any) -> list[str]:
+    if not isinstance(current, dict) or not isinstance(new, dict):
+        return [] if current == new else [name]
+    return [
+        changed
+        for key in sorted(current.keys() | new.keys())
+        for changed in _get_changed_fields(
+            f"{name}.{key}", current.get(key), new.get(key),
+        )
+    ]
+
+
+def reload_snapshot(
+    current: SettingsSnapshot,
+    new: SettingsSnapshot,
+) -> SettingsReload:
+    """
+    Apply reloaded settings that can be changed without restart.
+
+    Handlers read administrators, default settings and text templates of
+    the snapshot of each update, so they are applied to new updates. Other
+    settings are used on startup only and keep their current values.
+
+    Args:
+        current (SettingsSnapshot): The settings in use.
+        new (SettingsSnapshot): The reloaded settings.
+
+    Returns:
+        SettingsReload: The snapshot to use and changed setting names.
+
+    """
+    changed = get_changed_settings(current, new)
+    restart_required = tuple(
+        name
+        for name in changed
+        if name.split(".")[0] not in LIVE_SETTINGS
+        or name.removeprefix("default_settings.") in STARTUP_DEFAULT_SETTINGS
+    )
+    applied = tuple(name for name in changed if name not in restart_required)
+    if not applied:
+        return SettingsReload(
+            settings=current,
+            applied=applied,
+            restart_required=restart_required,
+        )
+
+    return SettingsReload(
+        settings=replace(
+            current,
+            administrators=new.administrators,
+            default_settings=new.default_settings.model_copy(update={
+                name: getattr(current.default_settings, name)
+                for name in STARTUP_DEFAULT_SETTINGS
+            }),
+            text_templates=new.text_templates,
+            text_templates_settings=new.text_templates_settings,
+        ),
+        applied=applied,
+        restart_required=restart_required,
+    )
@@ -0,0 +1,297 @@
+__all__ = (
+    "SettingsSnapshot",
+    "CompiledTemplates",
+    "compile_template",
+    "CHAT_SETTINGS",
+)
+
+from dataclasses import dataclass, fields, replace
+from string import Formatter
+from typing import TYPE_CHECKING, Callable, Mapping
+
+from .models.chat_settings import ChatSettingsConfig
+from .models.default_settings import DefaultSettings
+from .models.logging import LoggingConfig
+from .models.metrics import MetricsConfig
+from .models.scheduler import SchedulerConfig
+from .models.telegram import TelegramConfig
+from .models.templates import TemplatesSettings
+from .telegram_html import validate_telegram_html
+
+if TYPE_CHECKING:
+    from .config import Settings
+
+
+RenderCallable = Callable[..., str]
+
+
+def compile_template(
+    name: str,
+    template: str,
+    allowed_fields: frozenset[str],
+    html: bool = False,
+) -> RenderCallable:
+    """
+    Compile a text template into a render callable.
+
+    Templates without fields are returned as is, templates with a single
+    plain field are rendered by concatenation, other templates fall back
+    to ``str.format``. Render callables accept any keyword arguments, like
+    ``str.format`` does.
+
+    Args:
+        name (str): The name of the template, used in errors.
+        template (str): The template text.
+        allowed_fields (frozenset[str]): Fields the template may use.
+        html (bool): Whether the template is sent with the HTML parse mode
+            and must be valid markup.
+
+    Returns:
+        Callable[..., str]: The render callable.
+
+    Raises:
+        ValueError: If the template uses an unknown field or is not valid
+            markup.
+
+    """
+    parsed = list(Formatter().parse(template))
+    template_fields = [
+        (field_name, format_spec, conversion)
+        for _, field_name, format_spec, conversion in parsed
+        if field_name is not None
+    ]
+
+    unknown_fields = {
+        field_name for field_name, _, _ in template_fields
+    } - allowed_fields
+    if unknown_fields:
+        raise ValueError(
+            f"Template {name} uses unknown fields: {sorted(unknown_fields)}, "
+            f"allowed: {sorted(allowed_fields)}"
+        )
+
+    if html:
+        try:
+            validate_telegram_html(template)
+        except ValueError as html_exc:
+            raise ValueError(
+                f"Template {name} is not valid HTML: {html_exc}"
+            ) from html_exc
+
+    if not template_fields:
+        text = "".join(literal for literal, *_ in parsed)
+
+        def render_text(**kwargs) -> str:
+            return text
+
+        return render_text
+
+    if len(template_fields) == 1 and template_fields[0][1:] == ("", None):
+        field_name = template_fields[0][0]
+        field_index = next(
+            index
+            for index, (_, parsed_field, *_) in enumerate(parsed)
+            if parsed_field is not None
+        )
+        prefix = "".join(
+            literal for literal, *_ in parsed[:field_index + 1]
+        )
+        suffix = "".join(
+            literal for literal, *_ in parsed[field_index + 1:]
+        )
+
+        def render_field(**kwargs) -> str:
+            return f"{prefix}{kwargs[field_name]}{suffix}"
+
+        return render_field
+
+    return template.format
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledTemplates:
+    """Text templates compiled into render callables."""
+
+    welcome_message_text: RenderCallable
+    confirm_button_text: RenderCallable
+    confirmed_member_text: RenderCallable
+    user_left_text: RenderCallable
+    kicked_user_text: RenderCallable
+    kick_user_error_text: RenderCallable
+    additional_text_for_permissions: RenderCallable
+    button_click_user_id_mismatch_text: RenderCallable
+    button_click_confirmed_member_text: RenderCallable
+    invited_not_by_admin_text: RenderCallable
+    invited_by_admin_text: RenderCallable
+    raid_welcome_message_text: RenderCallable
+    raid_more_users_text: RenderCallable
+    raid_kicked_users_text: RenderCallable
+    join_request_challenge_text: RenderCallable
+    join_request_approved_text: RenderCallable
+    join_request_declined_text: RenderCallable
+    chat_settings_text: RenderCallable
+    chat_settings_empty_text: RenderCallable
+    chat_setting_updated_text: RenderCallable
+    chat_setting_error_text: RenderCallable
+
+    # Fields that can be used in each template
+    FIELDS = {
+        "welcome_message_text": frozenset({"user"}),
+        "confirmed_member_text": frozenset({"user"}),
+        "user_left_text": frozenset({"user"}),
+        "kicked_user_text": frozenset({"user"}),
+        "kick_user_error_text": frozenset({"user"}),
+        "additional_text_for_permissions": frozenset({"access_dt"}),
+        "invited_not_by_admin_text": frozenset({"user"}),
+        "invited_by_admin_text": frozenset({"user"}),
+        "raid_welcome_message_text": frozenset({"users"}),
+        "raid_more_users_text": frozenset({"count"}),
+        "raid_kicked_users_text": frozenset({"count"}),
+        "join_request_challenge_text": frozenset({"user", "chat"}),
+        "chat_settings_text": frozenset({"settings"}),
+        "chat_setting_updated_text": frozenset({"name"}),
+        "chat_setting_error_text": frozenset({"error", "names"}),
+    }
+    # Templates of buttons and callback answers, sent without parse mode
+    PLAIN_TEXT = frozenset({
+        "confirm_button_text",
+        "button_click_user_id_mismatch_text",
+        "button_click_confirmed_member_text",
+    })
+
+    @classmethod
+    def from_settings(
+        cls,
+        templates: TemplatesSettings,
+    ) -> "CompiledTemplates":
+        """
+        Compile all templates.
+
+        Args:
+            templates (TemplatesSettings): The text templates settings.
+
+        Returns:
+            CompiledTemplates: The compiled templates.
+
+        """
+        return cls(**{
+            field.name: compile_template(
+                name=field.name,
+                template=getattr(templates, field.name),
+                allowed_fields=cls.FIELDS.get(field.name, frozenset()),
+                html=field.name not in cls.PLAIN_TEXT,
+            )
+            for field in fields(cls)
+        })
+
+
+# Default settings a chat can override
+CHAT_DEFAULT_SETTINGS = frozenset({
+    "remove_user_after",
+    "additional_delay_for_permissions",
+})
+# Settings a chat can override, all text templates included
+CHAT_SETTINGS = CHAT_DEFAULT_SETTINGS | frozenset(
+    field.name for field in fields(CompiledTemplates)
+)
+
+
+@dataclass(frozen=True, slots=True)
+class SettingsSnapshot:
+    """
+    Immutable settings resolved once at startup.
+
+    Handlers receive it through the dispatcher workflow data as the
+    ``settings`` argument.
+    """
+
+    administrators: frozenset[int]
+    telegram: TelegramConfig
+    scheduler: SchedulerConfig
+    default_settings: DefaultSettings
+    chat_settings: ChatSettingsConfig
+    metrics: MetricsConfig
+    logging: LoggingConfig
+    text_templates: CompiledTemplates
+    # Source of text_templates, compared on reload
+    text_templates_settings: TemplatesSettings
+
+    @classmethod
+    def from_settings(cls, settings: "Settings") -> "SettingsSnapshot":
+        """
+        Create a snapshot of the settings.
+
+        Args:
+            settings (Settings): The validated settings.
+
+        Returns:
+            SettingsSnapshot: The settings snapshot.
+
+        """
+        return cls(
+            administrators=frozenset(settings.administrators),
+            telegram=settings.telegram,
+            scheduler=settings.scheduler,
+            default_settings=settings.default_settings,
+            chat_settings=settings.chat_settings,
+            metrics=settings.metrics,
+            logging=settings.logging,
+            text_templates=CompiledTemplates.from_settings(
+                settings.text_templates,
+            ),
+            text_templates_settings=settings.text_templates,
+        )
+
+    def with_overrides(
+        self, overrides: Mapping[str, str],
+    ) -> "SettingsSnapshot":
+        """
+        Create a snapshot with settings of a chat overridden.
+
+        Args:
+            overrides (Mapping[str, str]): Values by setting name, names
+                are of ``CHAT_SETTINGS``.
+
+        Returns:
+            SettingsSnapshot: The snapshot, this one if there are no
+                overrides.
+
+        Raises:
+            ValueError: If a name is unknown or a value is invalid.
+
+        """
+        if not overrides:
+            return self
+
+        unknown_names = overrides.keys() - CHAT_SETTINGS
+        if unknown_names:
+            raise ValueError(f"Unknown settings: {sorted(unknown_names)}")
+
+        default_settings = self.default_settings
+        default_overrides = {
+            name: value
+            for name, value in overrides.items()
+            if name in CHAT_DEFAULT_SETTINGS
+        }
+        if default_overrides:
+            default_settings = DefaultSettings.model_validate({
+                **default_settings.model_dump(),
+                **default_overrides,
+            })
+
+        return replace(
+            self,
+            default_settings=default_settings,
+            text_templates=replace(self.text_templates, **{
+                name: compile_template(
+                    name=name,
+                    template=value,
+                    allowed_fields=CompiledTemplates.FIELDS.get(
+                        name, frozenset(),
+                    ),
+                    html=name not in CompiledTemplates.PLAIN_TEXT,
+                )
+                for name, value in overrides.items()
+                if name not in CHAT_DEFAULT_SETTINGS
+            }),
+        )
@@ -0,0 +1,95 @@
+__all__ = ("validate_telegram_html",)
+
+from html.parser import HTMLParser
+
+# Tags of the HTML parse mode and attributes each of them requires
+SUPPORTED_TAGS = {
+    "b": frozenset(),
+    "strong": frozenset(),
+    "i": frozenset(),
+    "em": frozenset(),
+    "u": frozenset(),
+    "ins": frozenset(),
+    "s": frozenset(),
+    "strike": frozenset(),
+    "del": frozenset(),
+    "span": frozenset({"class"}),
+    "tg-spoiler": frozenset(),
+    "a": frozenset({"href"}),
+    "tg-emoji": frozenset({"emoji-id"}),
+    "code": frozenset(),
+    "pre": frozenset(),
+    "blockquote": frozenset(),
+}
+# Named entities of the HTML parse mode, numeric ones are all supported
+SUPPORTED_ENTITIES = frozenset({"lt", "gt", "amp", "quot"})
+
+
+class TelegramHTMLValidator(HTMLParser):
+    """Parser that rejects markup Telegram can't parse in HTML mode."""
+
+    def __init__(self):
+        """Initialize the validator."""
+        super().__init__(convert_charrefs=False)
+        self.open_tags: list[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in SUPPORTED_TAGS:
+            raise ValueError(f"unsupported tag <{tag}>")
+        missing = SUPPORTED_TAGS[tag] - {name for name, _ in attrs}
+        if missing:
+            raise ValueError(
+                f"tag <{tag}> misses attributes: {sorted(missing)}"
+            )
+        if tag == "span" and dict(attrs)["class"] != "tg-spoiler":
+            raise ValueError("tag <span> supports only tg-spoiler class")
+        self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        raise ValueError(f"unsupported self-closing tag <{tag}/>")
+
+    def handle_endtag(self, tag):
+        if not self.open_tags or self.open_tags[-1] != tag:
+            raise ValueError(f"unexpected end tag </{tag}>")
+        self.open_tags.pop()
+
+    def handle_data(self, data):
+        if "<" in data:
+            raise ValueError("unescaped <, use &lt;")
+
+    def handle_entityref(self, name):
+        if name not in SUPPORTED_ENTITIES:
+            raise ValueError(f"unsupported entity &{name};")
+
+    def handle_comment(self, data):
+        raise ValueError("comments are not supported")
+
+    def handle_decl(self, decl):
+        raise ValueError("declarations are not supported")
+
+    def handle_pi(self, data):
+        raise ValueError("processing instructions are not supported")
+
+    def unknown_decl(self, data):
+        raise ValueError("declarations are not supported")
+
+
+def validate_telegram_html(text: str):
+    """
+    Check that a text is valid markup of the Telegram HTML parse mode.
+
+    Only tags and named entities supported by Telegram are allowed, and
+    tags must be closed in order.
+
+    Args:
+        text (str): The text to check.
+
+    Raises:
+        ValueError: If Telegram would reject the markup.
+
+    """
+    validator = TelegramHTMLValidator()
+    validator.feed(text)
+    validator.close()
+    if validator.open_tags:
+        raise ValueError(f"unclosed tag <{validator.open_tags[-1]}>")
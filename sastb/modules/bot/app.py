@@ -1,11 +1,17 @@
 __all__ = ("BotApp",)
 
-from typing import TYPE_CHECKING, Optional
+import asyncio
+import hmac
+import signal
+from typing import TYPE_CHECKING, Any, Callable, Optional, Sequence
 
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import PRODUCTION, TelegramAPIServer
 from aiogram.enums import ParseMode
+from aiogram.methods import GetUpdates
+from aiogram.types import BotCommand, BotCommandScopeAllChatAdministrators
 from aiogram.types.chat_administrator_rights import ChatAdministratorRights
 from aiogram.webhook.aiohttp_server import (
     SimpleRequestHandler,
@@ -14,106 +20,503 @@ from aiogram.webhook.aiohttp_server import (
 from aiohttp import web
 from loguru import logger
 
+from sastb.config import ApplicationSettings
+from sastb.config.reload import reload_snapshot
 from sastb.utils.singleton import Singleton
 
 from . import routes
+from .utils.bot_context import BotContext, BotContextMiddleware
+from .utils.chat_settings import ChatSettings, ChatSettingsMiddleware
 from .utils.exceptions import SetupError
+from .utils.fast_ack_request_handler import FastAckRequestHandler
+from .utils.log_context import LogContextMiddleware
+from .utils.metrics import (
+    BotApiMetrics,
+    HandlerMetricsMiddleware,
+    create_webhook_metrics_middleware,
+    metrics_handler,
+)
+from .utils.outbound_scheduler import OutboundScheduler
+from .utils.member_cache import MemberCache
+from .utils.update_shards import ShardRouter, ShardServer
+from .utils.update_worker_pool import UpdateWorkerPool
 
 if TYPE_CHECKING:
+    from aiogram.types import ChatMember
+
+    from sastb.config import SettingsSnapshot
+    from sastb.config.reload import SettingsReload
     from sastb.config.models.telegram import TelegramConfig
 
+# Extra time on top of the getUpdates timeout before the request is dropped
+POLLING_TIMEOUT_MARGIN = 10
+
 
 class BotApp(metaclass=Singleton):
     """BotApp class for the bot."""
 
     bot: "Bot"
+    contexts: dict[int, "BotContext"]
     dispatcher: "Dispatcher"
     config: "TelegramConfig"
 
-    def __init__(self, config: Optional["TelegramConfig"] = None):
+    def __init__(
+        self,
+        settings: Optional["SettingsSnapshot"] = None,
+        settings_loader: Optional[Callable[[], "SettingsSnapshot"]] = None,
+        on_reload: Optional[Callable[[], Any]] = None,
+    ):
         """
         Initialize the bot app.
 
+        All bots of the configured tokens share one session, its connection
+        pool and rate limiter, and one dispatcher.
+
         Args:
-            token (str): The bot token.
+            settings (SettingsSnapshot): The application settings snapshot.
+            settings_loader (Callable | None): Function reading settings on
+                reload, ``ApplicationSettings().snapshot()`` if None.
+            on_reload (Callable | None): Function called after settings
+                are reloaded.
 
         """
-        if not config:
-            raise ValueError("config cannot be None")
+        if not settings:
+            raise ValueError("settings cannot be None")
 
-        self.config = config
+        self.settings_loader = settings_loader or (
+            lambda: ApplicationSettings().snapshot()  # type: ignore
+        )
+        self.on_reload = on_reload
 
-        session = AiohttpSession()
-        self.bot = Bot(
-            self.config.token,
-            session=session,
-            default=DefaultBotProperties(parse_mode=ParseMode.HTML),
+        self.config = settings.telegram
+        self.metrics_config = settings.metrics
+
+        session = AiohttpSession(
+            api=(
+                TelegramAPIServer.from_base(self.config.api_base_url)
+                if self.config.api_base_url
+                else PRODUCTION
+            ),
+            limit=self.config.connection_limit,
         )
-        self.dispatcher = Dispatcher()
+        if self.config.rate_limits.enabled:
+            session.middleware(OutboundScheduler(self.config.rate_limits))
+        if self.metrics_config.enabled:
+            # Registered last to measure requests without rate limit waits
+            session.middleware(BotApiMetrics())
+        bots = [
+            Bot(
+                token,
+                session=session,
+                default=DefaultBotProperties(parse_mode=ParseMode.HTML),
+            )
+            for token in self.config.tokens
+        ]
+        self.bot = bots[0]
+        self.contexts = {
+            bot.id: BotContext(
+                bot=bot,
+                flush_interval=self.config.message_deletion.flush_interval,
+            )
+            for bot in bots
+        }
+        if len(self.contexts) != len(bots):
+            raise ValueError("bot tokens must be unique")
 
-    async def on_startup(self, dispatcher: Dispatcher, bot: Bot):
-        try:
-            result = await self.bot.set_webhook(
-                url=self.config.webhook_url,
-                secret_token=self.config.webhook_secret_token,
-                allowed_updates=[
-                    "chat_member",
-                    "my_chat_member",
-                    "callback_query",
-                ]
+        # Member states don't depend on the bot, so the cache is shared
+        self.member_cache = (
+            MemberCache(
+                max_size=self.config.member_cache.max_size,
+                ttl=self.config.member_cache.ttl,
             )
-            logger.info(f"Webhook set: {result} to {self.config.webhook_url}")
-            result = await self.bot.set_my_short_description(
-                short_description=self.config.info.short_description,
+            if self.config.member_cache.enabled
+            else None
+        )
+        self.chat_settings = (
+            ChatSettings(
+                settings=settings,
+                file_name=settings.chat_settings.file_name,
+                cache_size=settings.chat_settings.cache_size,
+                main_bot_id=self.bot.id,
             )
-            logger.info(f"Short description set: {result}")
-            result = await self.bot.set_my_description(
-                description=self.config.info.description,
+            if settings.chat_settings.enabled
+            else None
+        )
+        self.dispatcher = Dispatcher(
+            settings=settings,
+            member_cache=self.member_cache,
+            chat_settings=self.chat_settings,
+            **self.get_context().workflow_data,
+        )
+        # Repeated warnings and errors are counted per chat
+        self.dispatcher.update.outer_middleware(LogContextMiddleware())
+        if self.chat_settings is not None:
+            # Replaces the global settings with settings of the chat
+            self.dispatcher.update.outer_middleware(
+                ChatSettingsMiddleware(self.chat_settings),
+            )
+            self.dispatcher.shutdown.register(self.chat_settings.close)
+        if len(self.contexts) > 1:
+            # Replaces the data of the main bot for updates of other bots
+            self.dispatcher.update.outer_middleware(
+                BotContextMiddleware(self.contexts),
+            )
+        for context in self.contexts.values():
+            # Queued deletions are sent before the session is closed
+            self.dispatcher.shutdown.register(context.message_deleter.close)
+
+    @property
+    def settings(self) -> "SettingsSnapshot":
+        """Settings snapshot passed to handlers."""
+        return self.dispatcher["settings"]
+
+    def get_context(self, bot_id: Optional[int] = None) -> "BotContext":
+        """
+        Get the context of a hosted bot.
+
+        Args:
+            bot_id (int | None): The ID of the bot, the main bot if None.
+
+        Returns:
+            BotContext: The bot context.
+
+        """
+        if bot_id is None:
+            bot_id = self.bot.id
+        return self.contexts[bot_id]
+
+    def reload_settings(self) -> "SettingsReload":
+        """
+        Read settings again and use them for new updates.
+
+        Updates being processed keep settings they started with. Changed
+        settings that are used on startup only are reported and keep their
+        current values.
+
+        Returns:
+            SettingsReload: The reload result.
+
+        Raises:
+            ValueError: If the new settings are invalid.
+
+        """
+        result = reload_snapshot(self.settings, self.settings_loader())
+        if result.applied:
+            # Swapped without awaiting, so no update gets global settings
+            # of one version and chat settings of another
+            self.dispatcher["settings"] = result.settings
+            if self.chat_settings is not None:
+                self.chat_settings.set_global_settings(result.settings)
+            logger.info(f"Settings reloaded: {', '.join(result.applied)}")
+        else:
+            logger.info("Settings reloaded, no changes to apply")
+        if result.restart_required:
+            logger.warning(
+                "Settings changes applied after restart only: "
+                f"{', '.join(result.restart_required)}"
             )
-            logger.info(f"Description set: {result}")
-            result = await self.bot.set_my_default_administrator_rights(
-                rights=ChatAdministratorRights(
-                    # Required permissions
-                    can_restrict_members=True,
-                    # Other to False
-                    is_anonymous=False,
-                    can_manage_chat=False,
-                    can_delete_messages=False,
-                    can_manage_video_chats=False,
-                    can_promote_members=False,
-                    can_change_info=False,
-                    can_invite_users=False,
-                    can_post_stories=False,
-                    can_edit_stories=False,
-                    can_delete_stories=False,
+
+        if self.on_reload is not None:
+            self.on_reload()
+        return result
+
+    def _reload_on_signal(self):
+        try:
+            self.reload_settings()
+        except Exception as e:
+            logger.error(f"Failed to reload settings: {e}")
+
+    def _add_reload_signal_handler(self):
+        asyncio.get_running_loop().add_signal_handler(
+            signal.SIGHUP, self._reload_on_signal,
+        )
+
+    async def reload_handler(self, request: web.Request) -> web.Response:
+        """
+        Reload settings on request of an administrator.
+
+        Args:
+            request (web.Request): The request with ``reload_token`` as
+                bearer token.
+
+        Returns:
+            web.Response: Applied and restart-only changes, or the error.
+
+        """
+        if not hmac.compare_digest(
+            request.headers.get("Authorization", "").encode(),
+            f"Bearer {self.config.reload_token}".encode(),
+        ):
+            return web.json_response({"error": "Unauthorized"}, status=401)
+
+        try:
+            result = self.reload_settings()
+        except ValueError as e:
+            logger.error(f"Failed to reload settings: {e}")
+            return web.json_response({"error": str(e)}, status=400)
+
+        return web.json_response({
+            "applied": result.applied,
+            "restart_required": result.restart_required,
+        })
+
+    async def get_chat_settings(
+        self, bot_id: int, chat_id: int,
+    ) -> "SettingsSnapshot":
+        """
+        Get the settings of a chat.
+
+        Args:
+            bot_id (int): The ID of the bot.
+            chat_id (int): The ID of the chat.
+
+        Returns:
+            SettingsSnapshot: The settings with overrides of the chat, the
+                global settings if chat settings are disabled.
+
+        """
+        if self.chat_settings is None:
+            return self.settings
+        return await self.chat_settings.get(bot_id, chat_id)
+
+    async def get_chat_member(
+        self, bot: "Bot", chat_id: int, user_id: int,
+    ) -> Optional["ChatMember"]:
+        """
+        Get the state of a chat member, from the member cache if possible.
+
+        Args:
+            bot (Bot): The bot instance.
+            chat_id (int): The ID of the chat.
+            user_id (int): The ID of the user.
+
+        Returns:
+            ChatMember | None: The member state, None if it could not be
+                requested.
+
+        """
+        if self.member_cache is not None:
+            chat_member = self.member_cache.get(chat_id, user_id)
+            if chat_member is not None:
+                return chat_member
+
+        try:
+            return await bot.get_chat_member(chat_id=chat_id, user_id=user_id)
+        except Exception as get_chat_member_exc:
+            logger.warning(
+                f"Error getting chat member {user_id}: {get_chat_member_exc}"
+            )
+            return None
+
+    def get_webhook_path(self, bot: "Bot") -> str:
+        """
+        Get the webhook path of a hosted bot.
+
+        Args:
+            bot (Bot): The bot instance.
+
+        Returns:
+            str: The webhook path.
+
+        """
+        return self.config.get_webhook_path(bot.id, is_main=bot is self.bot)
+
+    def get_allowed_updates(self) -> list[str]:
+        """
+        Get update types the bot handles.
+
+        Returns:
+            list[str]: The update types.
+
+        """
+        allowed_updates = [
+            "chat_member",
+            "my_chat_member",
+            "callback_query",
+        ]
+        if (
+            self.settings.default_settings.delete_join_messages
+            or self.settings.chat_settings.enabled
+        ):
+            # Join service messages and commands are message updates
+            allowed_updates.append("message")
+        if self.settings.default_settings.verify_join_requests:
+            allowed_updates.append("chat_join_request")
+        return allowed_updates
+
+    async def setup_bot_info(self, bot: "Bot"):
+        """
+        Set the bot descriptions and default administrator rights.
+
+        Args:
+            bot (Bot): The bot instance.
+
+        """
+        result = await bot.set_my_short_description(
+            short_description=self.config.info.short_description,
+        )
+        logger.info(f"Short description set: {result}")
+        result = await bot.set_my_description(
+            description=self.config.info.description,
+        )
+        logger.info(f"Description set: {result}")
+        result = await bot.set_my_default_administrator_rights(
+            rights=ChatAdministratorRights(
+                # Required permissions
+                can_restrict_members=True,
+                # Required to delete join service messages
+                can_delete_messages=(
+                    self.settings.default_settings.delete_join_messages
                 ),
+                # Required to approve and decline join requests
+                can_invite_users=(
+                    self.settings.default_settings.verify_join_requests
+                ),
+                # Other to False
+                is_anonymous=False,
+                can_manage_chat=False,
+                can_manage_video_chats=False,
+                can_promote_members=False,
+                can_change_info=False,
+                can_post_stories=False,
+                can_edit_stories=False,
+                can_delete_stories=False,
+            ),
+        )
+        logger.info(f"Default administrator rights set: {result}")
+
+        if self.settings.chat_settings.enabled:
+            result = await bot.set_my_commands(
+                commands=[
+                    BotCommand(
+                        command="settings",
+                        description="List settings of this chat",
+                    ),
+                    BotCommand(
+                        command="set",
+                        description="Override a setting: /set name value",
+                    ),
+                    BotCommand(
+                        command="unset",
+                        description="Reset a setting: /unset name",
+                    ),
+                ],
+                scope=BotCommandScopeAllChatAdministrators(),
             )
-            logger.info(f"Default administrator rights set: {result}")
+            logger.info(f"Commands set: {result}")
+
+    async def on_startup(self, dispatcher: Dispatcher, bot: Bot):
+        if not self.config.webhook_base_url:
+            logger.error("Webhook base URL is required to run with webhook")
+            raise SetupError("webhook_base_url is not set")
+
+        try:
+            for context in self.contexts.values():
+                webhook_url = (
+                    self.config.webhook_base_url
+                    + self.get_webhook_path(context.bot)
+                )
+                result = await context.bot.set_webhook(
+                    url=webhook_url,
+                    secret_token=self.config.webhook_secret_token,
+                    allowed_updates=self.get_allowed_updates(),
+                )
+                logger.info(f"Webhook set: {result} to {webhook_url}")
+                await self.setup_bot_info(context.bot)
         except Exception as setup_error:
             logger.error(f"Error on startup: {setup_error}")
             raise SetupError from setup_error
 
-    async def start(self):
-        """Start the bot."""
-        self.dispatcher.include_routers(
+    def _include_routers(self):
+        routers = (
             routes.bot_member_handler,
+            routes.chat_settings_handler,
             routes.confirm_btn_handler,
+            routes.join_request_handler,
             routes.member_join_handler,
             routes.member_left_handler,
         )
+        if self.metrics_config.enabled:
+            for router in routers:
+                middleware = HandlerMetricsMiddleware(router.name)
+                for observer in router.observers.values():
+                    observer.middleware(middleware)
+
+        self.dispatcher.include_routers(*routers)
+
+    async def start(self, shard_paths: Sequence[str] = ()):
+        """
+        Start the bot with webhook.
+
+        Args:
+            shard_paths (Sequence[str]): Unix socket paths of worker
+                processes. When set, updates are routed to the workers
+                instead of being processed in this process. Supported with
+                a single bot only.
+
+        """
+        if shard_paths and len(self.contexts) > 1:
+            raise SetupError("Sharding is supported with a single bot only")
+
+        self._include_routers()
 
         self.dispatcher.startup.register(self.on_startup)
 
-        app = web.Application()
+        webhook_paths = {
+            bot_id: self.get_webhook_path(context.bot)
+            for bot_id, context in self.contexts.items()
+        }
 
-        webhook_requests_handler = SimpleRequestHandler(
-            dispatcher=self.dispatcher,
-            bot=self.bot,
-            secret_token=self.config.webhook_secret_token,
+        shard_router = (
+            ShardRouter(
+                bot=self.bot,
+                paths=shard_paths,
+                secret_token=self.config.webhook_secret_token,
+            )
+            if shard_paths
+            else None
         )
-        webhook_requests_handler.register(app, path=self.config.webhook_path)
+
+        app = web.Application()
+        if self.metrics_config.enabled:
+            app.middlewares.append(
+                create_webhook_metrics_middleware(
+                    frozenset(webhook_paths.values()),
+                ),
+            )
+            # Handlers and the scheduler run in workers
+            app.router.add_get(
+                self.metrics_config.path,
+                shard_router.metrics_handler
+                if shard_router
+                else metrics_handler,
+            )
+        if self.config.reload_token:
+            app.router.add_post(self.config.reload_path, self.reload_handler)
+
+        for bot_id, context in self.contexts.items():
+            if shard_router:
+                webhook_requests_handler = shard_router
+            elif self.config.update_pool.enabled:
+                # Each bot gets its own worker pool
+                webhook_requests_handler = FastAckRequestHandler(
+                    dispatcher=self.dispatcher,
+                    bot=context.bot,
+                    config=self.config.update_pool,
+                    secret_token=self.config.webhook_secret_token,
+                )
+            else:
+                webhook_requests_handler = SimpleRequestHandler(
+                    dispatcher=self.dispatcher,
+                    bot=context.bot,
+                    secret_token=self.config.webhook_secret_token,
+                )
+            webhook_requests_handler.register(
+                app, path=webhook_paths[bot_id],
+            )
 
         setup_application(app, self.dispatcher, bot=self.bot)
+        self._add_reload_signal_handler()
 
         while True:
             try:
@@ -133,3 +536,103 @@ class BotApp(metaclass=Singleton):
             finally:
                 await self.bot.session.close()
                 logger.info("Bot stopped.")
+
+    async def start_polling(self):
+        """
+        Start the bot with long polling.
+
+        Updates of each getUpdates batch are processed concurrently by the
+        update worker pool while the next batch is requested. Requesting
+        waits while the pool is full. Supported with a single bot only.
+        """
+        if len(self.contexts) > 1:
+            raise SetupError("Polling is supported with a single bot only")
+
+        self._include_routers()
+
+        pool = UpdateWorkerPool(
+            dispatcher=self.dispatcher,
+            bot=self.bot,
+            config=self.config.update_pool,
+        )
+        polling = self.config.polling
+        allowed_updates = self.get_allowed_updates()
+        self._add_reload_signal_handler()
+
+        try:
+            await self.bot.delete_webhook()
+            logger.info("Webhook deleted, starting long polling")
+            await self.setup_bot_info(self.bot)
+            await self.dispatcher.emit_startup(bot=self.bot)
+            await pool.start()
+
+            offset: Optional[int] = None
+            while True:
+                try:
+                    updates = await self.bot(
+                        GetUpdates(
+                            offset=offset,
+                            limit=polling.limit,
+                            timeout=polling.timeout,
+                            allowed_updates=allowed_updates,
+                        ),
+                        request_timeout=(
+                            polling.timeout + POLLING_TIMEOUT_MARGIN
+                        ),
+                    )
+                except Exception as polling_error:
+                    logger.error(
+                        f"Failed to get updates: {polling_error}, "
+                        f"retry in {polling.retry_delay}s"
+                    )
+                    await asyncio.sleep(polling.retry_delay)
+                    continue
+
+                for update in updates:
+                    await pool.put(update)
+                    offset = update.update_id + 1
+        finally:
+            await pool.close()
+            await self.dispatcher.emit_shutdown(bot=self.bot)
+            await self.bot.session.close()
+            logger.info("Bot stopped.")
+
+    async def start_shard(self, path: str):
+        """
+        Start the bot as a worker process of a sharded bot.
+
+        Updates are received from the front process through a Unix socket,
+        the webhook is set by the front process.
+
+        Args:
+            path (str): The Unix socket path to listen on.
+
+        """
+        if len(self.contexts) > 1:
+            raise SetupError("Sharding is supported with a single bot only")
+
+        self._include_routers()
+
+        pool = UpdateWorkerPool(
+            dispatcher=self.dispatcher,
+            bot=self.bot,
+            config=self.config.update_pool,
+        )
+        server = ShardServer(
+            pool=pool,
+            path=path,
+            serve_metrics=self.metrics_config.enabled,
+        )
+        self._add_reload_signal_handler()
+
+        try:
+            await self.dispatcher.emit_startup(bot=self.bot)
+            await pool.start()
+            logger.info(f"Listening for updates on {path}")
+            await server.serve_forever()
+        finally:
+            await server.close()
+            await pool.close()
+            await self.dispatcher.emit_shutdown(bot=self.bot)
+            await self.bot.session.close()
+            logger.info("Bot stopped.")
@@ -1,11 +1,15 @@
 __all__ = (
     "bot_member_handler",
+    "chat_settings_handler",
     "confirm_btn_handler",
+    "join_request_handler",
     "member_join_handler",
     "member_left_handler",
 )
 
 from .bot_member_update import router as bot_member_handler
+from .chat_settings import router as chat_settings_handler
 from .confirm_btn import router as confirm_btn_handler
+from .join_request import router as join_request_handler
 from .member_join import router as member_join_handler
 from .member_left import router as member_left_handler
@@ -7,7 +7,8 @@ from aiogram.types import ChatMemberUpdated
 from aiogram.filters.chat_member_updated import ChatMemberUpdatedFilter
 from aiogram.filters import IS_MEMBER, IS_NOT_MEMBER
 
-from sastb.config.config import ApplicationSettings
+from sastb.config import SettingsSnapshot
+from sastb.modules.scheduler import SchedulerApp
 
 
 router = Router(
@@ -19,6 +20,7 @@ router = Router(
 async def bot_join_handler(
     event: "ChatMemberUpdated",
     bot: "Bot",
+    settings: "SettingsSnapshot",
 ):
     """
     Handle the event when the bot joins a chat.
@@ -27,10 +29,9 @@ async def bot_join_handler(
         event (ChatMemberUpdated): The event object containing information
             about the member who joined.
         bot (Bot): The bot instance.
+        settings (SettingsSnapshot): The application settings snapshot.
 
     """
-    settings = ApplicationSettings()  # type: ignore
-
     logger.info(f"New member: {event.new_chat_member.user.id}")
 
     if not settings.administrators:
@@ -42,7 +43,7 @@ async def bot_join_handler(
             f"User {event.from_user.id} is not an administrator, skipping..."
         )
         await event.answer(
-            text=settings.text_templates.invited_not_by_admin_text.format(
+            text=settings.text_templates.invited_not_by_admin_text(
                 user=event.from_user.mention_html(),
             ),
         )
@@ -54,8 +55,31 @@ async def bot_join_handler(
         return
 
     await event.answer(
-        text=settings.text_templates.invited_by_admin_text.format(
+        text=settings.text_templates.invited_by_admin_text(
             user=event.from_user.mention_html(),
         ),
     )
     logger.info(f"Bot joined the chat with id: {event.chat.id}")
+
+
+@router.my_chat_member(ChatMemberUpdatedFilter(IS_MEMBER >> IS_NOT_MEMBER))
+async def bot_left_handler(event: "ChatMemberUpdated", bot: "Bot"):
+    """
+    Handle the event when the bot is removed from a chat.
+
+    Users can't be kicked and welcome messages can't be edited anymore, so
+    all pending verifications of the chat are cancelled.
+
+    Args:
+        event (ChatMemberUpdated): The event object containing information
+            about the bot membership change.
+        bot (Bot): The bot instance.
+
+    """
+    verifications = SchedulerApp().get_verifications(bot.id).cancel_chat(
+        chat_id=event.chat.id,
+    )
+    logger.info(
+        f"Bot left the chat with id: {event.chat.id}, "
+        f"verifications cancelled: {len(verifications)}"
+    )
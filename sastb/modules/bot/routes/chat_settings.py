@@ -0,0 +1,157 @@
+__all__ = ("router",)
+
+import html
+from typing import TYPE_CHECKING, Optional
+
+from loguru import logger
+
+from aiogram import F, Router
+from aiogram.enums import ChatType
+from aiogram.filters import Command, CommandObject
+from aiogram.utils.chat_member import ADMINS
+
+from sastb.config.snapshot import CHAT_SETTINGS
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+    from aiogram.types import Message
+
+    from sastb.config import SettingsSnapshot
+
+    from ..utils.chat_settings import ChatSettings
+
+
+router = Router(
+    name="chat_settings",
+)
+router.message.filter(F.chat.type.in_({ChatType.GROUP, ChatType.SUPERGROUP}))
+
+
+async def is_chat_admin(
+    message: "Message",
+    bot: "Bot",
+    settings: "SettingsSnapshot",
+) -> bool:
+    """
+    Check whether the message is sent by an administrator of its chat.
+
+    Args:
+        message (Message): The command message.
+        bot (Bot): The bot instance.
+        settings (SettingsSnapshot): The application settings snapshot.
+
+    Returns:
+        bool: True for chat administrators, anonymous ones included, and
+            bot administrators.
+
+    """
+    if message.sender_chat and message.sender_chat.id == message.chat.id:
+        return True
+    if not message.from_user:
+        return False
+    if message.from_user.id in settings.administrators:
+        return True
+
+    try:
+        member = await bot.get_chat_member(
+            chat_id=message.chat.id,
+            user_id=message.from_user.id,
+        )
+    except Exception as e:
+        logger.error(f"Failed to get chat member: {e}")
+        return False
+    return isinstance(member, ADMINS)
+
+
+@router.message(Command("settings"))
+async def settings_command_handler(
+    message: "Message",
+    bot: "Bot",
+    settings: "SettingsSnapshot",
+    chat_settings: Optional["ChatSettings"],
+):
+    """
+    List settings overridden in the chat.
+
+    Args:
+        message (Message): The command message.
+        bot (Bot): The bot instance.
+        settings (SettingsSnapshot): The chat settings snapshot.
+        chat_settings (ChatSettings | None): The per-chat settings store.
+
+    """
+    if chat_settings is None or not await is_chat_admin(
+        message, bot, settings,
+    ):
+        return
+
+    overrides = await chat_settings.get_overrides(
+        bot.id, message.chat.id,
+    )
+    if not overrides:
+        await message.reply(settings.text_templates.chat_settings_empty_text())
+        return
+
+    await message.reply(settings.text_templates.chat_settings_text(
+        settings="\n".join(
+            f"<b>{name}</b>: {html.escape(value, quote=False)}"
+            for name, value in sorted(overrides.items())
+        ),
+    ))
+
+
+@router.message(Command("set", "unset"))
+async def set_command_handler(
+    message: "Message",
+    command: "CommandObject",
+    bot: "Bot",
+    settings: "SettingsSnapshot",
+    chat_settings: Optional["ChatSettings"],
+):
+    """
+    Override a setting of the chat with ``/set name value`` or reset it to
+    the global value with ``/unset name``.
+
+    Args:
+        message (Message): The command message.
+        command (CommandObject): The parsed command.
+        bot (Bot): The bot instance.
+        settings (SettingsSnapshot): The chat settings snapshot.
+        chat_settings (ChatSettings | None): The per-chat settings store.
+
+    """
+    if chat_settings is None or not await is_chat_admin(
+        message, bot, settings,
+    ):
+        return
+
+    # Values may contain spaces and new lines
+    args = (command.args or "").split(maxsplit=1)
+    name = args[0] if args else ""
+    value = args[1] if len(args) > 1 else None
+    try:
+        if name not in CHAT_SETTINGS:
+            raise ValueError(f"unknown setting {name!r}")
+        if command.command == "unset":
+            await chat_settings.unset(bot.id, message.chat.id, name)
+        elif value is None:
+            raise ValueError(f"no value for {name}")
+        else:
+            await chat_settings.set(bot.id, message.chat.id, name, value)
+    except ValueError as e:
+        logger.warning(f"Invalid setting in chat {message.chat.id}: {e}")
+        await message.reply(settings.text_templates.chat_setting_error_text(
+            error=html.escape(str(e), quote=False),
+            names=", ".join(sorted(CHAT_SETTINGS)),
+        ))
+        return
+
+    # Replies with the updated settings, e.g. in the new language
+    chat_settings_snapshot = await chat_settings.get(
+        bot.id, message.chat.id,
+    )
+    await message.reply(
+        chat_settings_snapshot.text_templates.chat_setting_updated_text(
+            name=name,
+        ),
+    )
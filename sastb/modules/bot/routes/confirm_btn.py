@@ -1,5 +1,6 @@
 __all__ = ("router",)
 
+import asyncio
 from datetime import timedelta, datetime
 from typing import TYPE_CHECKING
 
@@ -8,27 +9,67 @@ from loguru import logger
 from aiogram import F, Router
 from aiogram.types import InaccessibleMessage, ChatPermissions
 
-from sastb.config.config import ApplicationSettings
 from sastb.modules.scheduler import SchedulerApp
+from sastb.utils.log_sampling import LOG_EVENTS
 
 from ..utils.verify_user_callback import VerifyUserCallback
-from ..utils.kick_user_job_id_generator import get_kick_user_job_id
 
 
 if TYPE_CHECKING:
     from aiogram import Bot
     from aiogram.types import CallbackQuery
 
+    from sastb.config import SettingsSnapshot
+
+    from ..utils.raid_mode import RaidMode
+
 
 router = Router(
     name="confirm_btn",
 )
 
 
+async def restore_member_permissions(
+    bot: "Bot",
+    chat_id: int,
+    user_id: int,
+) -> bool:
+    """
+    Restore send messages permission of a confirmed member.
+
+    Args:
+        bot (Bot): The bot instance.
+        chat_id (int): The ID of the chat.
+        user_id (int): The ID of the user.
+
+    Returns:
+        bool: True if the permission was restored.
+
+    """
+    # Restore only send messages permission
+    # and set a timeout for 30 seconds
+    # after which the user will be able to use all default permissions
+    try:
+        is_restriction_removed = await bot.restrict_chat_member(
+            chat_id=chat_id,
+            user_id=user_id,
+            permissions=ChatPermissions(
+                can_send_messages=True,
+            ),
+            until_date=datetime.now() + timedelta(seconds=30),
+        )
+        logger.info("User permissions restored successfully")
+        return is_restriction_removed
+    except Exception as e:
+        logger.error(f"Failed to restore user permissions: {e}")
+        return False
+
+
 @router.callback_query(VerifyUserCallback.filter(F.action == "confirm"))
 async def confirm_btn_click_handler(
     event: "CallbackQuery",
     bot: "Bot",
+    settings: "SettingsSnapshot",
 ):
     """
     Handle the confirmation button click event.
@@ -36,11 +77,11 @@ async def confirm_btn_click_handler(
     Args:
         event (CallbackQuery): The callback query event.
         bot (Bot): The bot instance.
+        settings (SettingsSnapshot): The application settings snapshot.
 
     """
     logger.info(f"Confirm button clicked by: {event.from_user.id}")
-    settings = ApplicationSettings()  # type: ignore
-    scheduler = SchedulerApp()
+    verifications = SchedulerApp().get_verifications(bot.id)
 
     if not event.data:
         logger.warning("No data found in callback query")
@@ -54,7 +95,7 @@ async def confirm_btn_click_handler(
             f"!= {event.from_user.id}",
         )
         await event.answer(
-            settings.text_templates.button_click_user_id_mismatch_text,
+            settings.text_templates.button_click_user_id_mismatch_text(),
             show_alert=True,
         )
         return
@@ -63,57 +104,138 @@ async def confirm_btn_click_handler(
         logger.warning("No message found in callback query")
         return
 
-    # Cancel scheduled task to kick user
-    job_id = get_kick_user_job_id(
+    # Cancel scheduled kick of the user, the row is deleted by the writer
+    verifications.cancel(
         chat_id=event.message.chat.id,
         user_id=event.from_user.id,
     )
-    scheduler.cancel_job(job_id)
+    LOG_EVENTS.record(event.message.chat.id, "confirms")
+
+    # The alert does not depend on the other calls, the message text
+    # depends only on the restriction result
+    try:
+        async with asyncio.TaskGroup() as task_group:
+            task_group.create_task(answer_confirmed(event, settings))
+            task_group.create_task(
+                edit_confirmed_message(event, bot, settings),
+            )
+    except* Exception as exc_group:
+        for exc in exc_group.exceptions:
+            logger.error(f"Failed to process confirmation: {exc}")
+
+
+async def answer_confirmed(
+    event: "CallbackQuery",
+    settings: "SettingsSnapshot",
+):
+    """
+    Show the confirmation alert to the user.
 
+    Args:
+        event (CallbackQuery): The callback query event.
+        settings (SettingsSnapshot): The application settings snapshot.
+
+    """
     await event.answer(
-        settings.text_templates.button_click_confirmed_member_text,
+        settings.text_templates.button_click_confirmed_member_text(),
         show_alert=True,
     )
 
+
+async def edit_confirmed_message(
+    event: "CallbackQuery",
+    bot: "Bot",
+    settings: "SettingsSnapshot",
+):
+    """
+    Restore permissions of the confirmed user and edit the welcome message.
+
+    Args:
+        event (CallbackQuery): The callback query event with an accessible
+            message.
+        bot (Bot): The bot instance.
+        settings (SettingsSnapshot): The application settings snapshot.
+
+    """
+    message = event.message
     additional_text = ""
-    is_restriction_removed = False
-    # Restore only send messages permission
-    # and set a timeout for 30 seconds
-    # after which the user will be able to use all default permissions
-    try:
-        is_restriction_removed = await bot.restrict_chat_member(
-            chat_id=event.message.chat.id,
-            user_id=event.from_user.id,
-            permissions=ChatPermissions(
-                can_send_messages=True,
-            ),
-            until_date=datetime.now() + timedelta(seconds=30),
-        )
-        logger.info("User permissions restored successfully")
-    except Exception as e:
-        logger.error(f"Failed to restore user permissions: {e}")
+    is_restriction_removed = await restore_member_permissions(
+        bot=bot,
+        chat_id=message.chat.id,
+        user_id=event.from_user.id,
+    )
 
     if not is_restriction_removed:
         access_dt = (
-            event.message.date + timedelta(
+            message.date + timedelta(
                 minutes=settings.default_settings.restore_permissions_time,
             )
         )
         additional_text = (
-            settings.text_templates.additional_text_for_permissions.format(
+            settings.text_templates.additional_text_for_permissions(
                 access_dt=access_dt.strftime("%H:%M:%S"),
             )
         )
 
     try:
         await bot.edit_message_text(
-            chat_id=event.message.chat.id,
-            message_id=event.message.message_id,
+            chat_id=message.chat.id,
+            message_id=message.message_id,
             reply_markup=None,
-            text=settings.text_templates.confirmed_member_text.format(
+            text=settings.text_templates.confirmed_member_text(
                 user=event.from_user.mention_html(),
             ) + additional_text,
         )
         logger.info("Message edited successfully")
     except Exception as e:
         logger.error(f"Failed to edit message: {e}")
+
+
+@router.callback_query(VerifyUserCallback.filter(F.action == "confirm_raid"))
+async def confirm_raid_btn_click_handler(
+    event: "CallbackQuery",
+    bot: "Bot",
+    settings: "SettingsSnapshot",
+    raid_mode: "RaidMode",
+):
+    """
+    Handle the confirmation button click on a shared raid message.
+
+    Args:
+        event (CallbackQuery): The callback query event.
+        bot (Bot): The bot instance.
+        settings (SettingsSnapshot): The application settings snapshot.
+        raid_mode (RaidMode): The burst joins handler.
+
+    """
+    logger.info(f"Raid confirm button clicked by: {event.from_user.id}")
+
+    if not event.message or isinstance(event.message, InaccessibleMessage):
+        logger.warning("No message found in callback query")
+        return
+
+    is_removed = raid_mode.remove_user(
+        chat_id=event.message.chat.id,
+        message_id=event.message.message_id,
+        user_id=event.from_user.id,
+    )
+    if not is_removed:
+        logger.warning(f"User {event.from_user.id} is not in raid batch")
+        await event.answer(
+            settings.text_templates.button_click_user_id_mismatch_text(),
+            show_alert=True,
+        )
+        return
+
+    LOG_EVENTS.record(event.message.chat.id, "confirms")
+    try:
+        async with asyncio.TaskGroup() as task_group:
+            task_group.create_task(answer_confirmed(event, settings))
+            task_group.create_task(restore_member_permissions(
+                bot=bot,
+                chat_id=event.message.chat.id,
+                user_id=event.from_user.id,
+            ))
+    except* Exception as exc_group:
+        for exc in exc_group.exceptions:
+            logger.error(f"Failed to process confirmation: {exc}")
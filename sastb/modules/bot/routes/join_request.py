@@ -0,0 +1,182 @@
+__all__ = ("router",)
+
+import asyncio
+import html
+import time
+from datetime import timedelta
+from typing import TYPE_CHECKING, Optional
+
+from loguru import logger
+
+from aiogram import Router
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from sastb.modules.scheduler import SchedulerApp
+from sastb.modules.scheduler.pending_verifications import KIND_JOIN_REQUEST
+from sastb.utils.log_sampling import LOG_EVENTS
+
+from ..utils.verify_join_request_callback import VerifyJoinRequestCallback
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+    from aiogram.types import CallbackQuery, ChatJoinRequest
+
+    from sastb.config import SettingsSnapshot
+
+    from ..utils.chat_settings import ChatSettings
+
+
+router = Router(
+    name="join_request",
+)
+
+
+@router.chat_join_request()
+async def join_request_handler(
+    event: "ChatJoinRequest",
+    bot: "Bot",
+    settings: "SettingsSnapshot",
+):
+    """
+    Send the challenge of a join request to the user in private chat.
+
+    Args:
+        event (ChatJoinRequest): The join request.
+        bot (Bot): The bot instance.
+        settings (SettingsSnapshot): The application settings snapshot.
+
+    """
+    if not settings.default_settings.verify_join_requests:
+        return
+
+    verifications = SchedulerApp().get_verifications(bot.id)
+    user = event.from_user
+    logger.info(f"Join request: {user.id}")
+    LOG_EVENTS.record(event.chat.id, "joins")
+
+    # Declined after the deadline even if the challenge is not sent
+    verification = verifications.add(
+        chat_id=event.chat.id,
+        user_id=user.id,
+        message_id=None,
+        joined_at=event.date.timestamp(),
+        deadline=time.time() + timedelta(
+            minutes=settings.default_settings.remove_user_after,
+        ).total_seconds(),
+        kind=KIND_JOIN_REQUEST,
+    )
+    logger.info(f"Scheduled verification: {verification}")
+    # Telegram keeps the request pending until it is declined, so the
+    # deadline is written before the challenge is sent
+    await verifications.persist(verification)
+
+    try:
+        message = await bot.send_message(
+            chat_id=event.user_chat_id,
+            text=settings.text_templates.join_request_challenge_text(
+                user=user.mention_html(),
+                # Titles may contain markup characters
+                chat=html.escape(event.chat.title or "", quote=False),
+            ),
+            reply_markup=InlineKeyboardMarkup(
+                inline_keyboard=[[
+                    InlineKeyboardButton(
+                        text=settings.text_templates.confirm_button_text(),
+                        callback_data=VerifyJoinRequestCallback(
+                            chat_id=event.chat.id,
+                        ).pack(),
+                    ),
+                ]],
+            ),
+        )
+    except Exception as e:
+        LOG_EVENTS.record(event.chat.id, "failures")
+        logger.error(f"Failed to send challenge: {e}")
+        return
+    logger.info(f"Challenge sent: {message.message_id}")
+
+    verifications.set_message_id(
+        chat_id=event.chat.id,
+        user_id=user.id,
+        message_id=message.message_id,
+    )
+
+
+@router.callback_query(VerifyJoinRequestCallback.filter())
+async def confirm_join_request_handler(
+    event: "CallbackQuery",
+    callback_data: "VerifyJoinRequestCallback",
+    bot: "Bot",
+    settings: "SettingsSnapshot",
+    chat_settings: Optional["ChatSettings"],
+):
+    """
+    Approve the join request after the challenge button click.
+
+    Args:
+        event (CallbackQuery): The callback query event.
+        callback_data (VerifyJoinRequestCallback): The callback data.
+        bot (Bot): The bot instance.
+        settings (SettingsSnapshot): The application settings snapshot.
+        chat_settings (ChatSettings | None): The per-chat settings store.
+
+    """
+    chat_id = callback_data.chat_id
+    user_id = event.from_user.id
+    if chat_settings is not None:
+        # Clicked in private chat, texts are of the requested chat
+        settings = await chat_settings.get(bot.id, chat_id)
+    logger.info(f"Join request confirmed by: {user_id}")
+
+    verifications = SchedulerApp().get_verifications(bot.id)
+    verification = verifications.cancel(
+        chat_id=chat_id,
+        user_id=user_id,
+    )
+    if verification is None:
+        logger.warning("Verification not found, request has expired")
+        await event.answer(
+            settings.text_templates.join_request_declined_text(),
+            show_alert=True,
+        )
+        return
+    LOG_EVENTS.record(chat_id, "confirms")
+
+    try:
+        await bot.approve_chat_join_request(chat_id=chat_id, user_id=user_id)
+        logger.info(f"Join request of {user_id} approved")
+    except Exception as e:
+        LOG_EVENTS.record(chat_id, "failures")
+        logger.error(f"Failed to approve join request: {e}")
+        # Still pending, the request is declined after the deadline
+        # unless the button is clicked again
+        verifications.add(
+            chat_id=chat_id,
+            user_id=user_id,
+            message_id=verification.message_id,
+            joined_at=verification.joined_at,
+            deadline=verification.deadline,
+            kind=KIND_JOIN_REQUEST,
+        )
+        await event.answer()
+        return
+
+    try:
+        async with asyncio.TaskGroup() as task_group:
+            task_group.create_task(bot.answer_callback_query(
+                callback_query_id=event.id,
+                text=(
+                    settings.text_templates
+                    .button_click_confirmed_member_text()
+                ),
+            ))
+            if event.message:
+                task_group.create_task(bot.edit_message_text(
+                    chat_id=event.message.chat.id,
+                    message_id=event.message.message_id,
+                    text=settings.text_templates.join_request_approved_text(),
+                    reply_markup=None,
+                ))
+    except* Exception as exc_group:
+        for exc in exc_group.exceptions:
+            logger.error(f"Failed to process confirmation: {exc}")
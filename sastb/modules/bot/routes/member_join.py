@@ -1,27 +1,32 @@
 __all__ = ("router",)
 
+import asyncio
+import time
 from datetime import timedelta
+from typing import Optional
+
 from loguru import logger
 
-from aiogram import Bot, Router
+from aiogram import Bot, F, Router
 from aiogram.types import (
     ChatMemberUpdated,
     ChatPermissions,
     InlineKeyboardButton,
     InlineKeyboardMarkup,
+    Message,
 )
 from aiogram.utils.chat_member import ADMINS
 from aiogram.filters.chat_member_updated import ChatMemberUpdatedFilter
 from aiogram.filters import IS_MEMBER, IS_NOT_MEMBER
 
-from apscheduler.triggers.interval import IntervalTrigger
-
-from sastb.config.config import ApplicationSettings
+from sastb.config import SettingsSnapshot
 from sastb.modules.scheduler import SchedulerApp
-from sastb.modules.scheduler.routes import kick_user_job
+from sastb.utils.log_sampling import LOG_EVENTS
 
+from ..utils.member_cache import MemberCache
+from ..utils.message_deleter import MessageDeleter
+from ..utils.raid_mode import RaidMode
 from ..utils.verify_user_callback import VerifyUserCallback
-from ..utils.kick_user_job_id_generator import get_kick_user_job_id
 
 
 router = Router(
@@ -29,10 +34,52 @@ router = Router(
 )
 
 
+async def restrict_new_member(
+    event: "ChatMemberUpdated",
+    bot: "Bot",
+    settings: "SettingsSnapshot",
+):
+    """
+    Restrict all permissions of a new member until the kick deadline.
+
+    Args:
+        event (ChatMemberUpdated): The member join event.
+        bot (Bot): The bot instance.
+        settings (SettingsSnapshot): The application settings snapshot.
+
+    """
+    try:
+        result = await bot.restrict_chat_member(
+            chat_id=event.chat.id,
+            user_id=event.new_chat_member.user.id,
+            permissions=ChatPermissions(
+                can_send_messages=False,
+                can_send_media_messages=False,
+                can_send_polls=False,
+                can_send_other_messages=False,
+                can_add_web_page_previews=False,
+                can_change_info=False,
+                can_invite_users=False,
+                can_pin_messages=False,
+                can_manage_chat=False,
+            ),
+            until_date=event.date + timedelta(
+                minutes=settings.default_settings.restore_permissions_time,
+            ),
+        )
+        logger.info(f"User access has been restricted: {result}")
+    except Exception as e:
+        LOG_EVENTS.record(event.chat.id, "failures")
+        logger.error(f"Failed to restrict user: {e}")
+
+
 @router.chat_member(ChatMemberUpdatedFilter(IS_NOT_MEMBER >> IS_MEMBER))
 async def member_join_handler(
     event: "ChatMemberUpdated",
     bot: "Bot",
+    settings: "SettingsSnapshot",
+    raid_mode: "RaidMode",
+    member_cache: Optional["MemberCache"],
 ):
     """
     Handle member join event.
@@ -41,12 +88,20 @@ async def member_join_handler(
         event (ChatMemberUpdated): The event object containing information
             about the member who joined.
         bot (Bot): The bot instance.
+        settings (SettingsSnapshot): The application settings snapshot.
+        raid_mode (RaidMode): The burst joins handler.
+        member_cache (MemberCache | None): The chat member states cache.
 
     """
-    settings = ApplicationSettings()  # type: ignore
-    scheduler = SchedulerApp()
+    verifications = SchedulerApp().get_verifications(bot.id)
 
     logger.info(f"New member: {event.new_chat_member.user.id}")
+    if member_cache is not None:
+        member_cache.set(
+            event.chat.id,
+            event.new_chat_member.user.id,
+            event.new_chat_member,
+        )
 
     if event.new_chat_member.user.is_bot:
         logger.info("Member is a bot, skipping...")
@@ -57,39 +112,92 @@ async def member_join_handler(
         logger.info("Member is admin, skipping...")
         return
 
-    if settings.default_settings.additional_delay_for_permissions:
-        try:
-            result = await bot.restrict_chat_member(
-                chat_id=event.chat.id,
-                user_id=event.new_chat_member.user.id,
-                permissions=ChatPermissions(
-                    can_send_messages=False,
-                    can_send_media_messages=False,
-                    can_send_polls=False,
-                    can_send_other_messages=False,
-                    can_add_web_page_previews=False,
-                    can_change_info=False,
-                    can_invite_users=False,
-                    can_pin_messages=False,
-                    can_manage_chat=False,
-                ),
-                until_date=event.date + timedelta(
-                    minutes=settings.default_settings.restore_permissions_time,
-                ),
+    if (
+        event.via_join_request
+        and settings.default_settings.verify_join_requests
+    ):
+        # Passed the challenge or approved by an administrator, whose
+        # approval also ends the challenge
+        verifications.cancel(
+            chat_id=event.chat.id,
+            user_id=event.new_chat_member.user.id,
+        )
+        logger.info("Member joined by approved request, skipping...")
+        return
+
+    LOG_EVENTS.record(event.chat.id, "joins")
+
+    raid_mode_settings = settings.default_settings.raid_mode
+    if raid_mode_settings.enabled and raid_mode.register_join(
+        chat_id=event.chat.id,
+        config=raid_mode_settings,
+    ):
+        # Verify all users joined during raid with one shared message
+        await restrict_new_member(event, bot, settings)
+        raid_mode.add_user(
+            bot=bot,
+            settings=settings,
+            chat_id=event.chat.id,
+            user_id=event.new_chat_member.user.id,
+            mention=event.new_chat_member.user.mention_html(),
+        )
+        logger.info("User added to raid batch")
+        return
+
+    # Record the deadline before any Bot API call, so the user is kicked
+    # even if the process stops before the welcome message is sent
+    verification = verifications.add(
+        chat_id=event.chat.id,
+        user_id=event.new_chat_member.user.id,
+        message_id=None,
+        joined_at=event.date.timestamp(),
+        deadline=time.time() + timedelta(
+            minutes=settings.default_settings.remove_user_after,
+        ).total_seconds(),
+    )
+    logger.info(f"Scheduled verification: {verification}")
+    # Only this row is written, other changes are left to the writer
+    await verifications.persist(verification)
+
+    # Restrictions go ahead of other Bot API calls, so the user is
+    # restricted while the welcome message is being sent
+    try:
+        async with asyncio.TaskGroup() as task_group:
+            if settings.default_settings.additional_delay_for_permissions:
+                task_group.create_task(
+                    restrict_new_member(event, bot, settings),
+                )
+            task_group.create_task(
+                send_welcome_message(event, bot, settings),
             )
-            logger.info(f"User access has been restricted: {result}")
-        except Exception as e:
-            logger.error(f"Failed to restrict user: {e}")
+    except* Exception as exc_group:
+        for exc in exc_group.exceptions:
+            logger.error(f"Failed to process new member: {exc}")
+
+
+async def send_welcome_message(
+    event: "ChatMemberUpdated",
+    bot: "Bot",
+    settings: "SettingsSnapshot",
+):
+    """
+    Send the welcome message with the confirm button and attach it to the
+    pending verification of the new member.
+
+    Args:
+        event (ChatMemberUpdated): The member join event.
+        bot (Bot): The bot instance.
+        settings (SettingsSnapshot): The application settings snapshot.
 
-    # Send welcome message and start scheduled task to kick user
+    """
     new_message = await event.answer(
-        text=settings.text_templates.welcome_message_text.format(
+        text=settings.text_templates.welcome_message_text(
             user=event.new_chat_member.user.mention_html(),
         ),
         reply_markup=InlineKeyboardMarkup(
             inline_keyboard=[[
                 InlineKeyboardButton(
-                    text=settings.text_templates.confirm_button_text,
+                    text=settings.text_templates.confirm_button_text(),
                     callback_data=VerifyUserCallback(
                         user_id=event.new_chat_member.user.id
                     ).pack()
@@ -99,21 +207,42 @@ async def member_join_handler(
     )
     logger.info(f"Welcome message sent: {new_message.message_id}")
 
-    # Schedule task to kick user after 5 minutes
-    job_id = get_kick_user_job_id(
+    is_attached = SchedulerApp().get_verifications(bot.id).set_message_id(
         chat_id=event.chat.id,
         user_id=event.new_chat_member.user.id,
+        message_id=new_message.message_id,
     )
-    scheduler.schedule_job(
-        job_id=job_id,
-        func=kick_user_job,
-        kwargs={
-            "chat_id": event.chat.id,
-            "user_id": event.new_chat_member.user.id,
-            "message_id": new_message.message_id,
-        },
-        trigger=IntervalTrigger(
-            minutes=settings.default_settings.remove_user_after,
-        ),
-    )
-    logger.info(f"Scheduled job: {job_id}")
+    if is_attached:
+        return
+
+    # The user has left or has been kicked while the message was sent
+    logger.info("Verification not found, deleting welcome message...")
+    try:
+        await bot.delete_message(
+            chat_id=event.chat.id,
+            message_id=new_message.message_id,
+        )
+    except Exception as e:
+        logger.error(f"Failed to delete message: {e}")
+
+
+@router.message(F.new_chat_members)
+async def join_message_handler(
+    message: "Message",
+    settings: "SettingsSnapshot",
+    message_deleter: "MessageDeleter",
+):
+    """
+    Delete the join service message, message updates are received only
+    when ``delete_join_messages`` or chat settings are enabled.
+
+    Args:
+        message (Message): The join service message.
+        settings (SettingsSnapshot): The application settings snapshot.
+        message_deleter (MessageDeleter): The batched message deleter.
+
+    """
+    if not settings.default_settings.delete_join_messages:
+        return
+
+    message_deleter.add(chat_id=message.chat.id, message_id=message.message_id)
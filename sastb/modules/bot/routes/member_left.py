@@ -1,5 +1,7 @@
 __all__ = ("router",)
 
+from typing import Optional
+
 from loguru import logger
 
 from aiogram import Bot, Router
@@ -9,12 +11,12 @@ from aiogram.types import (
 from aiogram.filters.chat_member_updated import ChatMemberUpdatedFilter
 from aiogram.filters import IS_MEMBER, IS_NOT_MEMBER
 
-from apscheduler.job import Job
-
-from sastb.config import ApplicationSettings
+from sastb.config import SettingsSnapshot
 from sastb.modules.scheduler import SchedulerApp
+from sastb.utils.log_sampling import LOG_EVENTS
 
-from ..utils.kick_user_job_id_generator import get_kick_user_job_id
+from ..utils.member_cache import MemberCache
+from ..utils.message_deleter import MessageDeleter
 
 
 router = Router(
@@ -26,6 +28,9 @@ router = Router(
 async def member_left_handler(
     event: "ChatMemberUpdated",
     bot: "Bot",
+    settings: "SettingsSnapshot",
+    member_cache: Optional["MemberCache"],
+    message_deleter: "MessageDeleter",
 ):
     """
     Handle member left event.
@@ -34,46 +39,46 @@ async def member_left_handler(
         event (ChatMemberUpdated): The event object containing information
             about the member who left.
         bot (Bot): The bot instance.
+        settings (SettingsSnapshot): The application settings snapshot.
+        member_cache (MemberCache | None): The chat member states cache.
+        message_deleter (MessageDeleter): The batched message deleter.
 
     """
-    settings = ApplicationSettings()  # type: ignore
-    scheduler = SchedulerApp()
+    verifications = SchedulerApp().get_verifications(bot.id)
 
     logger.info(f"Member left: {event.new_chat_member.user.id}")
-    job: Job | None = scheduler.get_job(
-        job_id=get_kick_user_job_id(
-            chat_id=event.chat.id,
-            user_id=event.new_chat_member.user.id,
+    if member_cache is not None:
+        member_cache.set(
+            event.chat.id,
+            event.new_chat_member.user.id,
+            event.new_chat_member,
         )
+    verification = verifications.cancel(
+        chat_id=event.chat.id,
+        user_id=event.new_chat_member.user.id,
     )
-    if not job:
-        logger.info("Job not found, skipping...")
+    if not verification:
+        logger.info("Verification not found, skipping...")
         return
+    LOG_EVENTS.record(event.chat.id, "left")
+    logger.info(f"Verification cancelled: {verification}")
 
-    scheduler.cancel_job(job_id=job.id)
-    logger.info(f"Job removed: {job.id}")
-
-    message_id = job.kwargs["message_id"]
-    is_message_deleted = False
-    try:
-        is_message_deleted = await bot.delete_message(
+    async def edit_welcome_message():
+        await bot.edit_message_text(
+            text=settings.text_templates.user_left_text(
+                user=event.old_chat_member.user.mention_html(),
+            ),
             chat_id=event.chat.id,
-            message_id=message_id,
+            message_id=verification.message_id,
+            reply_markup=None,
         )
-        logger.info(f"Message deleted: {message_id}")
-    except Exception as e:
-        logger.error(f"Failed to delete message: {e}")
+        logger.info(f"Message edited: {verification.message_id}")
 
-    if not is_message_deleted:
-        try:
-            await bot.edit_message_text(
-                text=settings.text_templates.user_left_text.format(
-                    user=event.old_chat_member.user.mention_html(),
-                ),
-                chat_id=event.chat.id,
-                message_id=message_id,
-                reply_markup=None,
-            )
-            logger.info(f"Message edited: {message_id}")
-        except Exception as e:
-            logger.error(f"Failed to edit message: {e}")
+    # Deleted together with other messages of the chat, or edited if it is
+    # too old to delete, the welcome message is sent after the join
+    message_deleter.add(
+        chat_id=event.chat.id,
+        message_id=verification.message_id,
+        fallback=edit_welcome_message,
+        sent_at=verification.joined_at,
+    )
@@ -0,0 +1,64 @@
+__all__ = ("BotContext", "BotContextMiddleware")
+
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+
+from .message_deleter import MessageDeleter
+from .raid_mode import RaidMode
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+    from aiogram.types import TelegramObject
+
+
+class BotContext:
+    """State of one bot hosted by the bot app."""
+
+    def __init__(self, bot: "Bot", flush_interval: float):
+        """
+        Initialize the bot context.
+
+        Args:
+            bot (Bot): The bot instance.
+            flush_interval (float): Time in seconds to collect messages of
+                a chat before deleting them.
+
+        """
+        self.bot = bot
+        self.raid_mode = RaidMode(bot_id=bot.id)
+        self.message_deleter = MessageDeleter(
+            bot=bot,
+            flush_interval=flush_interval,
+        )
+
+    @property
+    def workflow_data(self) -> dict[str, Any]:
+        """Data passed to handlers of updates of this bot."""
+        return {
+            "raid_mode": self.raid_mode,
+            "message_deleter": self.message_deleter,
+        }
+
+
+class BotContextMiddleware(BaseMiddleware):
+    """Outer update middleware passing the context of the receiving bot."""
+
+    def __init__(self, contexts: dict[int, BotContext]):
+        """
+        Initialize the middleware.
+
+        Args:
+            contexts (dict[int, BotContext]): Contexts by bot ID.
+
+        """
+        self.contexts = contexts
+
+    async def __call__(
+        self,
+        handler: Callable[["TelegramObject", dict[str, Any]], Awaitable[Any]],
+        event: "TelegramObject",
+        data: dict[str, Any],
+    ) -> Any:
+        data.update(self.contexts[data["bot"].id].workflow_data)
+        return await handler(event, data)
@@ -0,0 +1,301 @@
+__all__ = ("ChatSettings", "ChatSettingsMiddleware")
+
+import asyncio
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Optional
+
+import aiosqlite
+from loguru import logger
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.middlewares.user_context import EVENT_CHAT_KEY
+from aiogram.enums import ChatType
+
+from sastb.modules.scheduler.aiosqlite_job_store import SQLITE_PRAGMAS
+from sastb.utils.metrics import CHAT_SETTINGS_LOOKUPS
+
+if TYPE_CHECKING:
+    from aiogram.types import Chat, TelegramObject
+
+    from sastb.config import SettingsSnapshot
+
+
+HITS = CHAT_SETTINGS_LOOKUPS.labels("hit")
+MISSES = CHAT_SETTINGS_LOOKUPS.labels("miss")
+
+
+class ChatSettings:
+    """
+    Per-chat overrides of the global settings, kept in SQLite.
+
+    Overrides are kept per bot, so bots hosted in one process and added
+    to the same chat are configured separately. Resolved settings are
+    kept in a least recently used cache, chats without overrides
+    included, so updates of a chat seen before don't read the database.
+    Changing an override of a chat invalidates its cached settings.
+    """
+
+    def __init__(
+        self,
+        settings: "SettingsSnapshot",
+        file_name: str,
+        cache_size: int,
+        main_bot_id: int,
+        tablename: str = "chat_settings",
+    ):
+        """
+        Initialize the chat settings.
+
+        Args:
+            settings (SettingsSnapshot): The global settings snapshot.
+            file_name (str): The SQLite database file name.
+            cache_size (int): Number of chats whose settings are cached.
+            main_bot_id (int): The ID of the main bot, overrides stored
+                before they were kept per bot belong to it.
+            tablename (str): The table of overrides.
+
+        """
+        self.settings = settings
+        self.file_name = file_name
+        self.cache_size = cache_size
+        self.main_bot_id = main_bot_id
+        self.tablename = tablename
+
+        # (bot_id, chat_id) -> resolved settings
+        self._cache: OrderedDict[
+            tuple[int, int], "SettingsSnapshot"
+        ] = OrderedDict()
+        # Incremented on every change, settings read before a change are
+        # not cached
+        self._version = 0
+        self._connection: Optional[aiosqlite.Connection] = None
+        self._connect_lock = asyncio.Lock()
+
+    async def get(self, bot_id: int, chat_id: int) -> "SettingsSnapshot":
+        """
+        Get the settings of a chat.
+
+        Args:
+            bot_id (int): The ID of the bot.
+            chat_id (int): The ID of the chat.
+
+        Returns:
+            SettingsSnapshot: The global settings with overrides of the
+                chat applied.
+
+        """
+        key = (bot_id, chat_id)
+        settings = self._cache.get(key)
+        if settings is not None:
+            self._cache.move_to_end(key)
+            HITS.inc()
+            return settings
+
+        MISSES.inc()
+        version = self._version
+        overrides = await self.get_overrides(bot_id, chat_id)
+        try:
+            settings = self.settings.with_overrides(overrides)
+        except ValueError as e:
+            # E.g. the global settings changed since the override was set
+            logger.error(f"Invalid settings of chat {chat_id}: {e}")
+            settings = self.settings
+
+        if version == self._version:
+            self._cache[key] = settings
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return settings
+
+    async def get_overrides(
+        self, bot_id: int, chat_id: int,
+    ) -> dict[str, str]:
+        """
+        Get the stored overrides of a chat.
+
+        Args:
+            bot_id (int): The ID of the bot.
+            chat_id (int): The ID of the chat.
+
+        Returns:
+            dict[str, str]: Values by setting name.
+
+        """
+        connection = await self._connect()
+        async with connection.execute(
+            f"SELECT name, value FROM {self.tablename} "
+            "WHERE bot_id = ? AND chat_id = ?",
+            (bot_id, chat_id),
+        ) as cursor:
+            return dict(await cursor.fetchall())
+
+    async def set(self, bot_id: int, chat_id: int, name: str, value: str):
+        """
+        Override a setting of a chat.
+
+        Args:
+            bot_id (int): The ID of the bot.
+            chat_id (int): The ID of the chat.
+            name (str): The setting name, one of ``CHAT_SETTINGS``.
+            value (str): The setting value.
+
+        Raises:
+            ValueError: If the name is unknown or the value is invalid.
+
+        """
+        overrides = await self.get_overrides(bot_id, chat_id)
+        overrides[name] = value
+        # Validate before storing
+        self.settings.with_overrides(overrides)
+
+        connection = await self._connect()
+        await connection.execute(
+            f"INSERT INTO {self.tablename} (bot_id, chat_id, name, value) "
+            "VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (bot_id, chat_id, name) "
+            "DO UPDATE SET value = excluded.value",
+            (bot_id, chat_id, name, value),
+        )
+        await connection.commit()
+        self.invalidate(bot_id, chat_id)
+        logger.info(f"Setting {name} of chat {chat_id} overridden")
+
+    async def unset(self, bot_id: int, chat_id: int, name: str) -> bool:
+        """
+        Remove an override of a chat, the global setting is used again.
+
+        Args:
+            bot_id (int): The ID of the bot.
+            chat_id (int): The ID of the chat.
+            name (str): The setting name.
+
+        Returns:
+            bool: True if the setting was overridden.
+
+        """
+        connection = await self._connect()
+        cursor = await connection.execute(
+            f"DELETE FROM {self.tablename} "
+            "WHERE bot_id = ? AND chat_id = ? AND name = ?",
+            (bot_id, chat_id, name),
+        )
+        await connection.commit()
+        self.invalidate(bot_id, chat_id)
+        logger.info(f"Setting {name} of chat {chat_id} reset")
+        return cursor.rowcount > 0
+
+    def set_global_settings(self, settings: "SettingsSnapshot"):
+        """
+        Use new global settings, cached settings of all chats are dropped.
+
+        Args:
+            settings (SettingsSnapshot): The global settings snapshot.
+
+        """
+        self.settings = settings
+        self.invalidate()
+
+    def invalidate(
+        self,
+        bot_id: Optional[int] = None,
+        chat_id: Optional[int] = None,
+    ):
+        """
+        Drop cached settings, they are read again on the next lookup.
+
+        Args:
+            bot_id (int | None): The ID of the bot, all chats if None.
+            chat_id (int | None): The ID of the chat, all chats if None.
+
+        """
+        self._version += 1
+        if bot_id is None or chat_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop((bot_id, chat_id), None)
+
+    async def close(self):
+        """Close the database connection."""
+        if self._connection is None:
+            return
+
+        await self._connection.close()
+        self._connection = None
+
+    async def _connect(self) -> aiosqlite.Connection:
+        # Opened on first use, kick jobs may need settings before startup
+        async with self._connect_lock:
+            if self._connection is not None:
+                return self._connection
+
+            Path(self.file_name).parent.mkdir(exist_ok=True, parents=True)
+            connection = await aiosqlite.connect(self.file_name)
+            for pragma in SQLITE_PRAGMAS:
+                await connection.execute(pragma)
+            await self._migrate(connection)
+            await self._create_table(connection)
+            await connection.commit()
+            self._connection = connection
+            return connection
+
+    async def _create_table(self, connection: aiosqlite.Connection):
+        await connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.tablename} ("
+            "bot_id INTEGER NOT NULL, "
+            "chat_id INTEGER NOT NULL, "
+            "name TEXT NOT NULL, "
+            "value TEXT NOT NULL, "
+            "PRIMARY KEY (bot_id, chat_id, name))"
+        )
+
+    async def _migrate(self, connection: aiosqlite.Connection):
+        """Copy overrides stored without the bot ID to the main bot."""
+        async with connection.execute(
+            f"PRAGMA table_info({self.tablename})",
+        ) as cursor:
+            columns = {row[1] async for row in cursor}
+        if not columns or "bot_id" in columns:
+            return
+
+        previous = f"{self.tablename}_previous"
+        await connection.execute(
+            f"ALTER TABLE {self.tablename} RENAME TO {previous}"
+        )
+        await self._create_table(connection)
+        await connection.execute(
+            f"INSERT INTO {self.tablename} (bot_id, chat_id, name, value) "
+            f"SELECT ?, chat_id, name, value FROM {previous}",
+            (self.main_bot_id,),
+        )
+        await connection.execute(f"DROP TABLE {previous}")
+        await connection.commit()
+        logger.info(f"Table {self.tablename} migrated")
+
+
+class ChatSettingsMiddleware(BaseMiddleware):
+    """Outer update middleware passing settings of the update chat."""
+
+    def __init__(self, chat_settings: ChatSettings):
+        """
+        Initialize the middleware.
+
+        Args:
+            chat_settings (ChatSettings): The chat settings.
+
+        """
+        self.chat_settings = chat_settings
+
+    async def __call__(
+        self,
+        handler: Callable[["TelegramObject", dict[str, Any]], Awaitable[Any]],
+        event: "TelegramObject",
+        data: dict[str, Any],
+    ) -> Any:
+        chat: Optional["Chat"] = data.get(EVENT_CHAT_KEY)
+        # Overrides are set in groups only
+        if chat is not None and chat.type != ChatType.PRIVATE:
+            data["settings"] = await self.chat_settings.get(
+                data["bot"].id, chat.id,
+            )
+        return await handler(event, data)
@@ -0,0 +1,97 @@
+__all__ = ("FastAckRequestHandler",)
+
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import web
+
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler
+
+from .update_worker_pool import UpdateWorkerPool
+
+if TYPE_CHECKING:
+    from aiogram import Bot, Dispatcher
+
+    from sastb.config.models.telegram import TelegramUpdatePool
+
+
+class FastAckRequestHandler(SimpleRequestHandler):
+    """
+    Webhook handler that responds to Telegram as soon as the update is
+    queued to the worker pool.
+
+    When the pool is full, Telegram gets 503 and delivers the update again
+    later.
+    """
+
+    def __init__(
+        self,
+        dispatcher: "Dispatcher",
+        bot: "Bot",
+        config: "TelegramUpdatePool",
+        secret_token: str | None = None,
+        **data: Any,
+    ):
+        """
+        Initialize the request handler.
+
+        Args:
+            dispatcher (Dispatcher): The dispatcher to feed updates to.
+            bot (Bot): The bot instance.
+            config (TelegramUpdatePool): The worker pool settings.
+            secret_token (str | None): The webhook secret token.
+            **data: Additional data passed to handlers.
+
+        """
+        super().__init__(
+            dispatcher=dispatcher,
+            bot=bot,
+            secret_token=secret_token,
+            **data,
+        )
+        self.pool = UpdateWorkerPool(
+            dispatcher=dispatcher,
+            bot=bot,
+            config=config,
+            **data,
+        )
+
+    def register(self, app: web.Application, /, path: str, **kwargs: Any):
+        """
+        Register the route and the worker pool lifecycle callbacks.
+
+        Args:
+            app (web.Application): The aiohttp application.
+            path (str): The webhook path.
+
+        """
+        app.on_startup.append(self.pool.start)
+        super().register(app, path=path, **kwargs)
+
+    async def close(self):
+        """Process queued updates and close the bot session."""
+        await self.pool.close()
+        await super().close()
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """
+        Queue the update and respond immediately.
+
+        Args:
+            request (web.Request): The webhook request.
+
+        Returns:
+            web.Response: The response to Telegram.
+
+        """
+        if not self.verify_secret(
+            request.headers.get("X-Telegram-Bot-Api-Secret-Token", ""),
+            self.bot,
+        ):
+            return web.Response(body="Unauthorized", status=401)
+
+        update = await request.json(loads=self.bot.session.json_loads)
+        if not self.pool.submit(update):
+            return web.Response(body="Overloaded", status=503)
+        return web.json_response({}, dumps=self.bot.session.json_dumps)
+
+    __call__ = handle
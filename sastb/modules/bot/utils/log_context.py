@@ -0,0 +1,31 @@
+__all__ = ("LogContextMiddleware",)
+
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Optional
+
+from loguru import logger
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.middlewares.user_context import EVENT_CHAT_KEY
+
+if TYPE_CHECKING:
+    from aiogram.types import Chat, TelegramObject
+
+
+class LogContextMiddleware(BaseMiddleware):
+    """
+    Outer update middleware adding the chat ID to records logged while
+    the update is handled.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[["TelegramObject", dict[str, Any]], Awaitable[Any]],
+        event: "TelegramObject",
+        data: dict[str, Any],
+    ) -> Any:
+        chat: Optional["Chat"] = data.get(EVENT_CHAT_KEY)
+        if chat is None:
+            return await handler(event, data)
+
+        with logger.contextualize(chat_id=chat.id):
+            return await handler(event, data)
@@ -0,0 +1,89 @@
+__all__ = ("MemberCache",)
+
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Optional
+
+from sastb.utils.metrics import MEMBER_CACHE_LOOKUPS, MEMBER_CACHE_SIZE
+
+if TYPE_CHECKING:
+    from aiogram.types import ChatMember
+
+
+HITS = MEMBER_CACHE_LOOKUPS.labels("hit")
+MISSES = MEMBER_CACHE_LOOKUPS.labels("miss")
+
+
+class MemberCache:
+    """
+    Last known chat member states taken from chat_member updates.
+
+    Least recently used entries are evicted when the cache is full, entries
+    older than ``ttl`` are treated as missing, so a member state is never
+    trusted longer than that even if an update was lost.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size (int): Maximum number of cached members.
+            ttl (float): Time in seconds a member state is trusted.
+
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        # (chat_id, user_id) -> (member, expires_at)
+        self._members: OrderedDict[
+            tuple[int, int], tuple["ChatMember", float]
+        ] = OrderedDict()
+        MEMBER_CACHE_SIZE.labels().set_function(self.__len__)
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def set(self, chat_id: int, user_id: int, member: "ChatMember"):
+        """
+        Store the current state of a chat member.
+
+        Args:
+            chat_id (int): The ID of the chat.
+            user_id (int): The ID of the user.
+            member (ChatMember): The new chat member state.
+
+        """
+        key = (chat_id, user_id)
+        self._members[key] = (member, time.monotonic() + self.ttl)
+        self._members.move_to_end(key)
+        if len(self._members) > self.max_size:
+            self._members.popitem(last=False)
+
+    def get(self, chat_id: int, user_id: int) -> Optional["ChatMember"]:
+        """
+        Get the last known state of a chat member.
+
+        Args:
+            chat_id (int): The ID of the chat.
+            user_id (int): The ID of the user.
+
+        Returns:
+            ChatMember | None: The member state, None if it is unknown or
+                expired.
+
+        """
+        key = (chat_id, user_id)
+        entry = self._members.get(key)
+        if entry is None:
+            MISSES.inc()
+            return None
+
+        member, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._members[key]
+            MISSES.inc()
+            return None
+
+        self._members.move_to_end(key)
+        HITS.inc()
+        return member
@@ -0,0 +1,153 @@
+__all__ = ("MessageDeleter",)
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+
+# Maximum number of messages deleted by one deleteMessages call
+MAX_BATCH_SIZE = 100
+# Age in seconds after which bots can't delete their messages in groups,
+# 48 hours with an hour of margin
+DELETE_WINDOW = 47 * 60 * 60
+
+
+class MessageDeleter:
+    """
+    Per-chat buffer of messages to delete.
+
+    Message IDs of a chat are collected for ``flush_interval`` seconds
+    after the first one, or until there are ``MAX_BATCH_SIZE`` of them,
+    and deleted with one deleteMessages call. Telegram skips messages that
+    can't be deleted anymore without an error, so messages older than
+    ``DELETE_WINDOW`` get their fallbacks called right away instead of
+    being queued. If the call fails, the fallbacks of its messages are
+    called instead.
+    """
+
+    def __init__(self, bot: "Bot", flush_interval: float):
+        """
+        Initialize the deleter.
+
+        Args:
+            bot (Bot): The bot instance.
+            flush_interval (float): Time in seconds to collect messages of
+                a chat before deleting them.
+
+        """
+        self.bot = bot
+        self.flush_interval = flush_interval
+
+        # chat_id -> [(message_id, fallback), ...]
+        self._buffers: dict[
+            int, list[tuple[int, Optional[Callable[[], Awaitable]]]]
+        ] = {}
+        self._timers: dict[int, asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def add(
+        self,
+        chat_id: int,
+        message_id: Optional[int],
+        fallback: Optional[Callable[[], Awaitable]] = None,
+        sent_at: Optional[float] = None,
+    ):
+        """
+        Queue a message for deletion.
+
+        Args:
+            chat_id (int): The ID of the chat.
+            message_id (int | None): The ID of the message, ignored if None.
+            fallback (Callable | None): Coroutine function called if the
+                message could not be deleted, e.g. to edit it instead.
+            sent_at (float | None): UNIX timestamp of the message, or an
+                earlier one, None if unknown.
+
+        """
+        if message_id is None:
+            return
+
+        if (
+            fallback is not None
+            and sent_at is not None
+            and time.time() - sent_at > DELETE_WINDOW
+        ):
+            # Would be skipped by deleteMessages
+            self._spawn(self._run_fallbacks(chat_id, [fallback]))
+            return
+
+        messages = self._buffers.setdefault(chat_id, [])
+        messages.append((message_id, fallback))
+        if len(messages) >= MAX_BATCH_SIZE:
+            self._flush_chat(chat_id)
+        elif chat_id not in self._timers:
+            self._timers[chat_id] = asyncio.get_running_loop().call_later(
+                self.flush_interval, self._flush_chat, chat_id,
+            )
+
+    async def close(self):
+        """Delete all queued messages and wait for pending calls."""
+        for chat_id in list(self._buffers):
+            self._flush_chat(chat_id)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _flush_chat(self, chat_id: int):
+        timer = self._timers.pop(chat_id, None)
+        if timer is not None:
+            timer.cancel()
+        messages = self._buffers.pop(chat_id, None)
+        if not messages:
+            return
+
+        self._spawn(self._delete(chat_id, messages))
+
+    def _spawn(self, coro: Awaitable):
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _delete(
+        self,
+        chat_id: int,
+        messages: list[tuple[int, Optional[Callable[[], Awaitable]]]],
+    ):
+        try:
+            await self.bot.delete_messages(
+                chat_id=chat_id,
+                message_ids=[message_id for message_id, _ in messages],
+            )
+            logger.info(
+                f"Messages deleted in chat {chat_id}: {len(messages)}"
+            )
+            return
+        except Exception as e:
+            logger.error(
+                f"Failed to delete {len(messages)} messages "
+                f"in chat {chat_id}: {e}"
+            )
+
+        await self._run_fallbacks(
+            chat_id, [fallback for _, fallback in messages if fallback],
+        )
+
+    async def _run_fallbacks(
+        self,
+        chat_id: int,
+        fallbacks: list[Callable[[], Awaitable]],
+    ):
+        results = await asyncio.gather(
+            *(fallback() for fallback in fallbacks),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(
+                    f"Failed to process undeleted message "
+                    f"in chat {chat_id}: {result}"
+                )
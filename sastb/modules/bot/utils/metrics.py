@@ -0,0 +1,154 @@
+__all__ = (
+    "BotApiMetrics",
+    "HandlerMetricsMiddleware",
+    "create_webhook_metrics_middleware",
+    "metrics_handler",
+)
+
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Collection
+
+from aiohttp import web
+
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+
+from sastb.utils.metrics import (
+    BOT_API_ERRORS,
+    BOT_API_LATENCY,
+    HANDLER_LATENCY,
+    REGISTRY,
+    WEBHOOK_REQUESTS,
+)
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+    from aiogram.methods import Response, TelegramMethod
+    from aiogram.methods.base import TelegramType
+    from aiogram.types import TelegramObject
+
+    from sastb.utils.metrics import CounterChild, HistogramChild
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Inner middleware recording handler latency of a router."""
+
+    def __init__(self, router_name: str):
+        """
+        Initialize the middleware.
+
+        Args:
+            router_name (str): The name of the router, used as label.
+
+        """
+        self.latency = HANDLER_LATENCY.labels(router_name)
+
+    async def __call__(
+        self,
+        handler: Callable[["TelegramObject", dict[str, Any]], Awaitable[Any]],
+        event: "TelegramObject",
+        data: dict[str, Any],
+    ) -> Any:
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            self.latency.observe(time.perf_counter() - started)
+
+
+class BotApiMetrics(BaseRequestMiddleware):
+    """Session middleware recording Bot API latency and errors by method."""
+
+    def __init__(self):
+        self.latencies: dict[str, "HistogramChild"] = {}
+        self.errors: dict[tuple[str, str], "CounterChild"] = {}
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType["TelegramType"],
+        bot: "Bot",
+        method: "TelegramMethod[TelegramType]",
+    ) -> "Response[TelegramType]":
+        method_name = type(method).__name__
+        latency = self.latencies.get(method_name)
+        if latency is None:
+            latency = self.latencies[method_name] = BOT_API_LATENCY.labels(
+                method_name,
+            )
+
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception as request_exc:
+            key = (method_name, type(request_exc).__name__)
+            errors = self.errors.get(key)
+            if errors is None:
+                errors = self.errors[key] = BOT_API_ERRORS.labels(*key)
+            errors.inc()
+            raise
+        finally:
+            latency.observe(time.perf_counter() - started)
+
+
+def create_webhook_metrics_middleware(paths: Collection[str]):
+    """
+    Create aiohttp middleware counting webhook requests by status.
+
+    Args:
+        paths (Collection[str]): The webhook paths of all bots.
+
+    Returns:
+        The aiohttp middleware.
+
+    """
+    # Statuses returned by webhook handlers
+    counters = {
+        status: WEBHOOK_REQUESTS.labels(status)
+        for status in (200, 401, 500, 503)
+    }
+
+    @web.middleware
+    async def webhook_metrics_middleware(request: web.Request, handler):
+        if request.path not in paths:
+            return await handler(request)
+
+        try:
+            response = await handler(request)
+        except web.HTTPException as http_exc:
+            status = http_exc.status
+            raise
+        except Exception:
+            status = 500
+            raise
+        else:
+            status = response.status
+            return response
+        finally:
+            counter = counters.get(status)
+            if counter is None:
+                counter = counters[status] = WEBHOOK_REQUESTS.labels(status)
+            counter.inc()
+
+    return webhook_metrics_middleware
+
+
+async def metrics_handler(request: web.Request) -> web.Response:
+    """
+    Respond with all metrics in Prometheus text format.
+
+    Args:
+        request (web.Request): The metrics request.
+
+    Returns:
+        web.Response: The metrics response.
+
+    """
+    return web.Response(
+        text=REGISTRY.render(),
+        content_type="text/plain",
+        charset="utf-8",
+        headers={"X-Content-Type-Options": "nosniff"},
+    )
@@ -0,0 +1,289 @@
+__all__ = ("OutboundScheduler", "Priority", "TokenBucket")
+
+import asyncio
+import heapq
+import itertools
+import time
+from enum import IntEnum
+from typing import TYPE_CHECKING, Optional
+
+from loguru import logger
+
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+    from aiogram.methods import Response, TelegramMethod
+    from aiogram.methods.base import TelegramType
+
+    from sastb.config.models.telegram import TelegramRateLimits
+
+
+class Priority(IntEnum):
+    """Priority class of an outbound request, lower goes first."""
+
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+# Moderation goes ahead of replies, cosmetic changes go last
+METHOD_PRIORITIES = {
+    "BanChatMember": Priority.HIGH,
+    "RestrictChatMember": Priority.HIGH,
+    "UnbanChatMember": Priority.HIGH,
+    "ApproveChatJoinRequest": Priority.HIGH,
+    "DeclineChatJoinRequest": Priority.HIGH,
+    "EditMessageText": Priority.LOW,
+    "EditMessageReplyMarkup": Priority.LOW,
+    "DeleteMessage": Priority.LOW,
+    "DeleteMessages": Priority.LOW,
+}
+
+# Methods that post or change messages count against the per-chat limit
+CHAT_LIMITED_METHODS = frozenset({
+    "SendMessage",
+    "EditMessageText",
+    "EditMessageReplyMarkup",
+})
+
+# Methods that are not rate limited
+UNLIMITED_METHODS = frozenset({
+    "GetUpdates",
+})
+
+# Idle per-chat buckets are dropped when there are more of them
+MAX_IDLE_CHAT_BUCKETS = 10_000
+
+
+class TokenBucket:
+    """
+    Token bucket that serves waiters in priority order.
+
+    Requests take a token immediately while the bucket has tokens and
+    nobody waits. Otherwise they wait in a heap ordered by priority and
+    arrival, and a single timer hands out tokens as they refill.
+    """
+
+    def __init__(self, rate: float, period: float):
+        """
+        Initialize the token bucket.
+
+        Args:
+            rate (float): Number of requests allowed per period.
+            period (float): The period in seconds.
+
+        """
+        self.capacity = rate
+        self.fill_rate = rate / period
+        self.tokens = rate
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def is_idle(self) -> bool:
+        """Whether the bucket is full and nobody waits for it."""
+        self._refill(time.monotonic())
+        return not self._waiters and self.tokens >= self.capacity
+
+    async def acquire(self, priority: Priority = Priority.NORMAL):
+        """
+        Take a token, waiting for it if necessary.
+
+        Args:
+            priority (Priority): The priority of the request.
+
+        """
+        now = time.monotonic()
+        self._refill(now)
+        if not self._waiters and self.tokens >= 1 and now >= self.paused_until:
+            self.tokens -= 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._waiters, (priority, next(self._counter), waiter),
+        )
+        self._schedule()
+        await waiter
+
+    def pause(self, seconds: float):
+        """
+        Stop handing out tokens.
+
+        Args:
+            seconds (float): Time in seconds to pause for.
+
+        """
+        self.paused_until = max(
+            self.paused_until, time.monotonic() + seconds,
+        )
+        self.tokens = 0
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        self._schedule()
+
+    def _refill(self, now: float):
+        self.tokens = min(
+            self.capacity,
+            self.tokens + (now - self.updated_at) * self.fill_rate,
+        )
+        self.updated_at = now
+
+    def _schedule(self):
+        if self._timer or not self._waiters:
+            return
+
+        now = time.monotonic()
+        delay = max(
+            self.paused_until - now,
+            (1 - self.tokens) / self.fill_rate,
+            0,
+        )
+        self._timer = asyncio.get_running_loop().call_later(
+            delay, self._release,
+        )
+
+    def _release(self):
+        self._timer = None
+        now = time.monotonic()
+        self._refill(now)
+
+        while self._waiters and now >= self.paused_until:
+            _, _, waiter = self._waiters[0]
+            if waiter.done():
+                # Cancelled while waiting
+                heapq.heappop(self._waiters)
+                continue
+            if self.tokens < 1:
+                break
+            heapq.heappop(self._waiters)
+            self.tokens -= 1
+            waiter.set_result(None)
+
+        self._schedule()
+
+
+class OutboundScheduler(BaseRequestMiddleware):
+    """
+    Session middleware that keeps Bot API calls within Telegram limits.
+
+    Every call takes a token from the global bucket of its bot, calls that
+    post or change messages also take one from the bucket of their chat.
+    Bots sharing the session keep separate buckets. Waiting
+    calls are served by priority, so restrictions and bans are not stuck
+    behind message edits. Calls failed with flood control are retried
+    after ``retry_after`` seconds.
+    """
+
+    def __init__(self, config: "TelegramRateLimits"):
+        """
+        Initialize the outbound scheduler.
+
+        Args:
+            config (TelegramRateLimits): The rate limits settings.
+
+        """
+        self.config = config
+        self.global_buckets: dict[int, TokenBucket] = {}
+        self.chat_buckets: dict[tuple[int, int | str], TokenBucket] = {}
+
+    def get_global_bucket(self, bot_id: int) -> TokenBucket:
+        """
+        Get the token bucket of all calls of a bot.
+
+        Args:
+            bot_id (int): The ID of the bot.
+
+        Returns:
+            TokenBucket: The token bucket.
+
+        """
+        bucket = self.global_buckets.get(bot_id)
+        if bucket is None:
+            bucket = self.global_buckets[bot_id] = TokenBucket(
+                rate=self.config.global_rate,
+                period=self.config.global_period,
+            )
+        return bucket
+
+    def get_chat_bucket(self, bot_id: int, chat_id: int | str) -> TokenBucket:
+        """
+        Get the token bucket of a chat.
+
+        Args:
+            bot_id (int): The ID of the bot.
+            chat_id (int | str): The ID of the chat.
+
+        Returns:
+            TokenBucket: The token bucket.
+
+        """
+        key = (bot_id, chat_id)
+        bucket = self.chat_buckets.get(key)
+        if bucket is not None:
+            return bucket
+
+        if len(self.chat_buckets) >= MAX_IDLE_CHAT_BUCKETS:
+            self.chat_buckets = {
+                bucket_key: chat_bucket
+                for bucket_key, chat_bucket in self.chat_buckets.items()
+                if not chat_bucket.is_idle
+            }
+
+        bucket = self.chat_buckets[key] = TokenBucket(
+            rate=self.config.chat_rate,
+            period=self.config.chat_period,
+        )
+        return bucket
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType["TelegramType"],
+        bot: "Bot",
+        method: "TelegramMethod[TelegramType]",
+    ) -> "Response[TelegramType]":
+        method_name = type(method).__name__
+        if method_name in UNLIMITED_METHODS:
+            return await make_request(bot, method)
+
+        priority = METHOD_PRIORITIES.get(method_name, Priority.NORMAL)
+
+        chat_bucket = None
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is not None and method_name in CHAT_LIMITED_METHODS:
+            chat_bucket = self.get_chat_bucket(bot.id, chat_id)
+        global_bucket = self.get_global_bucket(bot.id)
+
+        attempt = 0
+        while True:
+            if chat_bucket:
+                await chat_bucket.acquire(priority)
+            await global_bucket.acquire(priority)
+
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as retry_exc:
+                attempt += 1
+                if attempt > self.config.max_retries:
+                    raise
+
+                logger.warning(
+                    f"Flood control on {method_name} in chat {chat_id}, "
+                    f"retry {attempt} in {retry_exc.retry_after}s"
+                )
+                # Flood control without a chat applies to all calls of the
+                # bot, other queued calls wait for it too
+                if chat_bucket:
+                    chat_bucket.pause(retry_exc.retry_after)
+                else:
+                    global_bucket.pause(retry_exc.retry_after)
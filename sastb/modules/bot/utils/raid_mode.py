@@ -0,0 +1,334 @@
+__all__ = ("RaidMode", "RaidBatch", "get_raid_sweep_job_id")
+
+import asyncio
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Optional
+
+from loguru import logger
+
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from apscheduler.triggers.date import DateTrigger
+
+from sastb.modules.scheduler import SchedulerApp
+from sastb.modules.scheduler.routes import kick_raid_batch_job
+
+from .verify_user_callback import VerifyUserCallback
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+    from sastb.config import SettingsSnapshot
+    from sastb.config.models.default_settings import RaidModeSettings
+
+
+def get_raid_sweep_job_id(bot_id: int, chat_id: int, message_id: int) -> str:
+    """
+    Generate a unique job ID for the kick sweep of a raid batch.
+
+    Args:
+        bot_id (int): The ID of the bot that sent the message.
+        chat_id (int): The ID of the chat.
+        message_id (int): The ID of the shared verification message.
+
+    Returns:
+        str: A unique job ID for the kick sweep.
+    """
+    return f"raid_sweep_{bot_id}_{chat_id}_{message_id}"
+
+
+class RaidBatch:
+    """Users joined in raid mode that share one verification message."""
+
+    __slots__ = (
+        "chat_id",
+        "user_ids",
+        "mentions",
+        "closes_at",
+        "deadline",
+        "message_id",
+        "is_dirty",
+    )
+
+    def __init__(self, chat_id: int, closes_at: float, deadline: float):
+        self.chat_id = chat_id
+        self.user_ids: set[int] = set()
+        self.mentions: list[str] = []
+        self.closes_at = closes_at
+        self.deadline = deadline
+        self.message_id: Optional[int] = None
+        self.is_dirty = False
+
+
+class RaidMode:
+    """
+    Per-chat burst joins detection and shared verification of raiders.
+
+    A chat is in raid mode while ``join_threshold`` joins happened within
+    ``join_window`` seconds and ``cooldown`` seconds after that. Users
+    joined in raid mode are collected into batches: each batch has one
+    verification message, edited as more users join, and one scheduled
+    kick sweep for all its unconfirmed users.
+    """
+
+    def __init__(self, bot_id: int):
+        """
+        Initialize the raid mode of a bot.
+
+        Args:
+            bot_id (int): The ID of the bot, sweep jobs are namespaced by it.
+
+        """
+        self.bot_id = bot_id
+        self._joins: dict[int, deque[float]] = {}
+        self._active_until: dict[int, float] = {}
+        # Open batch of each chat
+        self._batches: dict[int, RaidBatch] = {}
+        # Batches with sent message, until their last edit
+        self._sent_batches: dict[tuple[int, int], RaidBatch] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def register_join(self, chat_id: int, config: "RaidModeSettings") -> bool:
+        """
+        Count a join and check whether the chat is in raid mode.
+
+        Args:
+            chat_id (int): The ID of the chat.
+            config (RaidModeSettings): The raid mode settings.
+
+        Returns:
+            bool: True if the chat is in raid mode.
+
+        """
+        now = time.monotonic()
+        joins = self._joins.get(chat_id)
+        if joins is None or joins.maxlen != config.join_threshold:
+            joins = self._joins[chat_id] = deque(
+                joins or (), maxlen=config.join_threshold,
+            )
+        joins.append(now)
+
+        if (
+            len(joins) == joins.maxlen
+            and now - joins[0] <= config.join_window
+        ):
+            if chat_id not in self._active_until:
+                logger.warning(f"Raid mode started in chat {chat_id}")
+            self._active_until[chat_id] = now + config.cooldown
+
+        active_until = self._active_until.get(chat_id)
+        if active_until is None:
+            return False
+        if now > active_until:
+            logger.warning(f"Raid mode finished in chat {chat_id}")
+            del self._active_until[chat_id]
+            return False
+        return True
+
+    def add_user(
+        self,
+        bot: "Bot",
+        settings: "SettingsSnapshot",
+        chat_id: int,
+        user_id: int,
+        mention: str,
+    ) -> RaidBatch:
+        """
+        Add a joined user to the open batch of the chat.
+
+        Args:
+            bot (Bot): The bot instance.
+            settings (SettingsSnapshot): The application settings snapshot.
+            chat_id (int): The ID of the chat.
+            user_id (int): The ID of the user.
+            mention (str): HTML mention of the user.
+
+        Returns:
+            RaidBatch: The batch the user was added to.
+
+        """
+        now = time.time()
+        batch = self._batches.get(chat_id)
+        if batch is None or now >= batch.closes_at:
+            raid_mode = settings.default_settings.raid_mode
+            batch = self._batches[chat_id] = RaidBatch(
+                chat_id=chat_id,
+                closes_at=now + raid_mode.batch_window,
+                deadline=now + timedelta(
+                    minutes=settings.default_settings.remove_user_after,
+                ).total_seconds(),
+            )
+            task = asyncio.create_task(self._run_batch(bot, settings, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        batch.user_ids.add(user_id)
+        batch.mentions.append(mention)
+        batch.is_dirty = True
+        return batch
+
+    def remove_user(self, chat_id: int, message_id: int, user_id: int) -> bool:
+        """
+        Remove a user from the kick sweep of a batch.
+
+        Args:
+            chat_id (int): The ID of the chat.
+            message_id (int): The ID of the shared verification message.
+            user_id (int): The ID of the user.
+
+        Returns:
+            bool: True if the user was waiting for the sweep.
+
+        """
+        batch = self._sent_batches.get((chat_id, message_id))
+        if batch is not None:
+            if user_id not in batch.user_ids:
+                return False
+            batch.user_ids.discard(user_id)
+            self._schedule_sweep(batch)
+            return True
+
+        # Batch is closed, its users are kept only in the sweep job
+        scheduler = SchedulerApp()
+        job = scheduler.get_job(
+            get_raid_sweep_job_id(self.bot_id, chat_id, message_id),
+        )
+        if job is None or user_id not in job.kwargs["user_ids"]:
+            return False
+
+        scheduler.schedule_job(
+            job_id=job.id,
+            func=kick_raid_batch_job,
+            kwargs={
+                **job.kwargs,
+                "user_ids": [
+                    batch_user_id
+                    for batch_user_id in job.kwargs["user_ids"]
+                    if batch_user_id != user_id
+                ],
+            },
+            trigger=job.trigger,
+            coalesce=job.coalesce,
+            misfire_grace_time=job.misfire_grace_time,
+        )
+        return True
+
+    def _schedule_sweep(self, batch: RaidBatch):
+        if batch.message_id is None:
+            return
+
+        scheduler = SchedulerApp()
+        scheduler.schedule_job(
+            job_id=get_raid_sweep_job_id(
+                self.bot_id, batch.chat_id, batch.message_id,
+            ),
+            func=kick_raid_batch_job,
+            kwargs={
+                "bot_id": self.bot_id,
+                "chat_id": batch.chat_id,
+                "message_id": batch.message_id,
+                "user_ids": sorted(batch.user_ids),
+            },
+            trigger=DateTrigger(
+                run_date=datetime.fromtimestamp(
+                    batch.deadline, tz=timezone.utc,
+                ),
+            ),
+            # The one-shot sweep is the only kick of its users, it runs
+            # even if the process was down at the deadline
+            coalesce=True,
+            misfire_grace_time=scheduler.config.misfire_grace_time,
+        )
+
+    def _add_verifications(self, batch: RaidBatch):
+        # The sweep needs the shared message, users of a batch without it
+        # are kicked one by one
+        verifications = SchedulerApp().get_verifications(self.bot_id)
+        for user_id in batch.user_ids:
+            verifications.add(
+                chat_id=batch.chat_id,
+                user_id=user_id,
+                message_id=None,
+                deadline=batch.deadline,
+            )
+        logger.info(
+            f"Scheduled verifications of {len(batch.user_ids)} raid users"
+        )
+
+    def _render_text(self, settings: "SettingsSnapshot", batch: RaidBatch):
+        max_mentions = settings.default_settings.raid_mode.max_mentions
+        users = ", ".join(batch.mentions[:max_mentions])
+        if len(batch.mentions) > max_mentions:
+            users += " " + settings.text_templates.raid_more_users_text(
+                count=len(batch.mentions) - max_mentions,
+            )
+        return settings.text_templates.raid_welcome_message_text(users=users)
+
+    async def _run_batch(
+        self,
+        bot: "Bot",
+        settings: "SettingsSnapshot",
+        batch: RaidBatch,
+    ):
+        reply_markup = InlineKeyboardMarkup(
+            inline_keyboard=[[
+                InlineKeyboardButton(
+                    text=settings.text_templates.confirm_button_text(),
+                    callback_data=VerifyUserCallback(
+                        action="confirm_raid",
+                        user_id=0,
+                    ).pack()
+                ),
+            ]],
+        )
+        try:
+            batch.is_dirty = False
+            try:
+                message = await bot.send_message(
+                    chat_id=batch.chat_id,
+                    text=self._render_text(settings, batch),
+                    reply_markup=reply_markup,
+                )
+            except Exception as send_message_exc:
+                logger.error(
+                    f"Failed to send raid message: {send_message_exc}"
+                )
+                self._add_verifications(batch)
+                return
+
+            batch.message_id = message.message_id
+            self._sent_batches[(batch.chat_id, batch.message_id)] = batch
+            logger.info(
+                f"Raid verification message sent: {message.message_id}"
+            )
+            self._schedule_sweep(batch)
+
+            while time.time() < batch.closes_at or batch.is_dirty:
+                await asyncio.sleep(
+                    settings.default_settings.raid_mode.edit_interval,
+                )
+                if not batch.is_dirty:
+                    continue
+
+                batch.is_dirty = False
+                self._schedule_sweep(batch)
+                try:
+                    await bot.edit_message_text(
+                        chat_id=batch.chat_id,
+                        message_id=batch.message_id,
+                        text=self._render_text(settings, batch),
+                        reply_markup=reply_markup,
+                    )
+                except Exception as edit_message_exc:
+                    logger.error(
+                        f"Failed to edit raid message: {edit_message_exc}"
+                    )
+        except Exception as batch_exc:
+            logger.error(f"Failed to process raid batch: {batch_exc}")
+        finally:
+            if self._batches.get(batch.chat_id) is batch:
+                del self._batches[batch.chat_id]
+            if batch.message_id is not None:
+                del self._sent_batches[(batch.chat_id, batch.message_id)]
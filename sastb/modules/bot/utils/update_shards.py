@@ -0,0 +1,367 @@
+__all__ = (
+    "ShardRouter",
+    "ShardServer",
+    "get_metrics_path",
+    "get_update_shard",
+    "read_frame",
+    "write_frame",
+)
+
+import asyncio
+import hmac
+import struct
+from typing import TYPE_CHECKING, Any, Optional, Sequence
+
+from aiohttp import web
+from loguru import logger
+
+from sastb.utils.metrics import REGISTRY, label_samples
+
+from .update_worker_pool import get_update_chat_id
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+    from .update_worker_pool import UpdateWorkerPool
+
+
+# Frames are raw update JSON prefixed with its length
+FRAME_HEADER = struct.Struct("!I")
+# Time in seconds to wait for metrics of a worker
+METRICS_TIMEOUT = 5
+
+
+def get_metrics_path(path: str) -> str:
+    """
+    Get the Unix socket path a worker serves its metrics on.
+
+    Args:
+        path (str): The Unix socket path the worker receives updates on.
+
+    Returns:
+        str: The metrics socket path.
+
+    """
+    return f"{path}.metrics"
+
+
+def get_update_shard(update: dict[str, Any], shards: int) -> int:
+    """
+    Get the shard that processes a raw update.
+
+    Updates of one chat always go to the same shard, updates without
+    a chat are spread by their ID.
+
+    Args:
+        update (dict): The raw update.
+        shards (int): The number of shards.
+
+    Returns:
+        int: The shard index.
+
+    """
+    chat_id = get_update_chat_id(update)
+    if chat_id is None:
+        return update.get("update_id", 0) % shards
+    return chat_id % shards
+
+
+async def read_frame(reader: asyncio.StreamReader) -> bytes:
+    """
+    Read one frame.
+
+    Args:
+        reader (asyncio.StreamReader): The stream to read from.
+
+    Returns:
+        bytes: The frame payload.
+
+    Raises:
+        asyncio.IncompleteReadError: If the stream is closed.
+
+    """
+    header = await reader.readexactly(FRAME_HEADER.size)
+    (size,) = FRAME_HEADER.unpack(header)
+    return await reader.readexactly(size)
+
+
+def write_frame(writer: asyncio.StreamWriter, payload: bytes):
+    """
+    Write one frame, the caller drains the stream.
+
+    Args:
+        writer (asyncio.StreamWriter): The stream to write to.
+        payload (bytes): The frame payload.
+
+    """
+    writer.write(FRAME_HEADER.pack(len(payload)) + payload)
+
+
+class ShardServer:
+    """
+    Worker side of update sharding.
+
+    Receives raw updates from the front process through a Unix socket and
+    queues them to the worker pool. Frames are read one by one, so the
+    order of updates is kept and a full pool slows down the front. Metrics
+    of the worker are written to every connection of the metrics socket,
+    so the front process can expose them.
+    """
+
+    def __init__(
+        self,
+        pool: "UpdateWorkerPool",
+        path: str,
+        serve_metrics: bool = False,
+    ):
+        """
+        Initialize the shard server.
+
+        Args:
+            pool (UpdateWorkerPool): The pool to queue updates to.
+            path (str): The Unix socket path.
+            serve_metrics (bool): Whether to serve metrics on the socket
+                of ``get_metrics_path``.
+
+        """
+        self.pool = pool
+        self.path = path
+        self.serve_metrics = serve_metrics
+        self._server: Optional[asyncio.Server] = None
+        self._metrics_server: Optional[asyncio.Server] = None
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    async def start(self):
+        """Start listening on the sockets."""
+        if self.serve_metrics:
+            self._metrics_server = await asyncio.start_unix_server(
+                self._handle_metrics, path=get_metrics_path(self.path),
+            )
+        self._server = await asyncio.start_unix_server(
+            self._handle, path=self.path,
+        )
+
+    async def serve_forever(self):
+        """Start listening and serve until cancelled."""
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def close(self):
+        """Stop listening on the sockets."""
+        if self._metrics_server is not None:
+            self._metrics_server.close()
+            await self._metrics_server.wait_closed()
+            self._metrics_server = None
+        if self._server is not None:
+            self._server.close()
+            # Server waits for its connections to be closed
+            for writer in self._writers:
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ):
+        loads = self.pool.bot.session.json_loads
+        self._writers.add(writer)
+        try:
+            while True:
+                payload = await read_frame(reader)
+                await self.pool.put(loads(payload))
+        except asyncio.IncompleteReadError:
+            logger.info("Front process disconnected")
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _handle_metrics(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ):
+        try:
+            writer.write(REGISTRY.render().encode())
+            await writer.drain()
+        except ConnectionError as connection_error:
+            logger.warning(f"Failed to send metrics: {connection_error}")
+        finally:
+            writer.close()
+
+
+class ShardRouter:
+    """
+    Front side of update sharding.
+
+    Webhook handler that routes raw updates to worker processes by the
+    chat ID and responds to Telegram as soon as the update is written to
+    the worker socket. Updates are parsed only to find the chat ID.
+    """
+
+    def __init__(
+        self,
+        bot: "Bot",
+        paths: Sequence[str],
+        secret_token: Optional[str] = None,
+        connect_timeout: float = 30,
+    ):
+        """
+        Initialize the shard router.
+
+        Args:
+            bot (Bot): The bot instance, used for JSON serialization.
+            paths (Sequence[str]): Unix socket paths of the workers.
+            secret_token (str | None): The webhook secret token.
+            connect_timeout (float): Time in seconds to wait for workers.
+
+        """
+        self.bot = bot
+        self.paths = tuple(paths)
+        self.secret_token = secret_token
+        self.connect_timeout = connect_timeout
+        self.writers: list[Optional[asyncio.StreamWriter]] = [
+            None for _ in self.paths
+        ]
+        self.routed = [0 for _ in self.paths]
+
+    def register(self, app: web.Application, /, path: str):
+        """
+        Register the route and the worker connections lifecycle callbacks.
+
+        Args:
+            app (web.Application): The aiohttp application.
+            path (str): The webhook path.
+
+        """
+        app.on_startup.append(self.connect)
+        app.on_shutdown.append(self.close)
+        app.router.add_route("POST", path, self.handle)
+
+    async def connect(self, *args: Any, **kwargs: Any):
+        """Connect to all workers, waiting for them to start listening."""
+        await asyncio.gather(*(
+            self._connect(shard) for shard in range(len(self.paths))
+        ))
+
+    async def close(self, *args: Any, **kwargs: Any):
+        """Close the worker connections."""
+        for shard, writer in enumerate(self.writers):
+            if writer is not None:
+                writer.close()
+                self.writers[shard] = None
+        logger.info(f"Updates routed to workers: {self.routed}")
+
+    def verify_secret(self, telegram_secret_token: str) -> bool:
+        """
+        Check the webhook secret token.
+
+        Args:
+            telegram_secret_token (str): The token of the request.
+
+        Returns:
+            bool: True if the token is valid.
+
+        """
+        if not self.secret_token:
+            return True
+        return hmac.compare_digest(telegram_secret_token, self.secret_token)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """
+        Route the update to its worker and respond immediately.
+
+        Args:
+            request (web.Request): The webhook request.
+
+        Returns:
+            web.Response: The response to Telegram.
+
+        """
+        if not self.verify_secret(
+            request.headers.get("X-Telegram-Bot-Api-Secret-Token", ""),
+        ):
+            return web.Response(body="Unauthorized", status=401)
+
+        payload = await request.read()
+        update = self.bot.session.json_loads(payload)
+        shard = get_update_shard(update, len(self.paths))
+
+        writer = self.writers[shard]
+        if writer is None or writer.is_closing():
+            return web.Response(body="Worker unavailable", status=503)
+
+        try:
+            write_frame(writer, payload)
+            await writer.drain()
+        except ConnectionError as connection_error:
+            logger.error(f"Worker {shard} disconnected: {connection_error}")
+            self.writers[shard] = None
+            return web.Response(body="Worker unavailable", status=503)
+
+        self.routed[shard] += 1
+        return web.json_response({}, dumps=self.bot.session.json_dumps)
+
+    async def metrics_handler(self, request: web.Request) -> web.Response:
+        """
+        Respond with metrics of this process and all workers.
+
+        Samples of workers get the ``shard`` label, workers that don't
+        respond are skipped.
+
+        Args:
+            request (web.Request): The metrics request.
+
+        Returns:
+            web.Response: The metrics response.
+
+        """
+        extra_samples: dict[str, list[str]] = {}
+        for shard, text in enumerate(await asyncio.gather(*(
+            self._read_metrics(shard) for shard in range(len(self.paths))
+        ))):
+            if text is None:
+                continue
+            for name, samples in label_samples(
+                text, "shard", str(shard),
+            ).items():
+                extra_samples.setdefault(name, []).extend(samples)
+
+        return web.Response(
+            text=REGISTRY.render(extra_samples),
+            content_type="text/plain",
+            charset="utf-8",
+            headers={"X-Content-Type-Options": "nosniff"},
+        )
+
+    async def _read_metrics(self, shard: int) -> Optional[str]:
+        try:
+            async with asyncio.timeout(METRICS_TIMEOUT):
+                reader, writer = await asyncio.open_unix_connection(
+                    get_metrics_path(self.paths[shard]),
+                )
+                try:
+                    return (await reader.read()).decode()
+                finally:
+                    writer.close()
+        except (OSError, TimeoutError) as metrics_exc:
+            logger.warning(
+                f"Failed to read metrics of worker {shard}: {metrics_exc}"
+            )
+            return None
+
+    async def _connect(self, shard: int):
+        async with asyncio.timeout(self.connect_timeout):
+            while True:
+                try:
+                    _, writer = await asyncio.open_unix_connection(
+                        self.paths[shard],
+                    )
+                except (FileNotFoundError, ConnectionRefusedError):
+                    await asyncio.sleep(0.1)
+                    continue
+                self.writers[shard] = writer
+                logger.info(f"Connected to worker {shard}")
+                return
@@ -0,0 +1,304 @@
+__all__ = ("UpdateWorkerPool", "get_update_chat_id")
+
+import asyncio
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Hashable, Optional, Union
+
+from loguru import logger
+
+from aiogram.methods import TelegramMethod
+from aiogram.types import Update
+
+from sastb.utils.metrics import (
+    UPDATE_QUEUE_DEPTH,
+    UPDATE_QUEUE_WAIT,
+    UPDATES_DROPPED,
+)
+
+from .verify_join_request_callback import VerifyJoinRequestCallback
+
+if TYPE_CHECKING:
+    from aiogram import Bot, Dispatcher
+
+    from sastb.config.models.telegram import TelegramUpdatePool
+
+
+# Update types with a chat object on top level
+CHAT_UPDATE_TYPES = (
+    "chat_member",
+    "my_chat_member",
+    "chat_join_request",
+    "message",
+    "edited_message",
+)
+# Callback data of join request challenges, clicked in private chat
+JOIN_REQUEST_CALLBACK_PREFIX = (
+    VerifyJoinRequestCallback.__prefix__
+    + VerifyJoinRequestCallback.__separator__
+)
+
+
+def get_callback_chat_id(
+    data: Optional[str],
+    message_chat_id: Optional[int],
+) -> Optional[int]:
+    """
+    Get the chat ID of a callback query.
+
+    Join request challenges are clicked in private chat, so they are
+    queued with the updates of the requested chat from the callback data.
+
+    Args:
+        data (str | None): The callback data.
+        message_chat_id (int | None): The chat ID of the message with
+            the button.
+
+    Returns:
+        int | None: The chat ID, None if the callback query has no chat.
+
+    """
+    if data and data.startswith(JOIN_REQUEST_CALLBACK_PREFIX):
+        try:
+            return VerifyJoinRequestCallback.unpack(data).chat_id
+        except (TypeError, ValueError):
+            pass
+    return message_chat_id
+
+
+def get_update_chat_id(
+    update: Union[dict[str, Any], Update],
+) -> Optional[int]:
+    """
+    Get the chat ID of an update, raw updates are not parsed.
+
+    Args:
+        update (dict | Update): The raw or parsed update.
+
+    Returns:
+        int | None: The chat ID, None if the update has no chat.
+
+    """
+    if isinstance(update, Update):
+        for update_type in CHAT_UPDATE_TYPES:
+            event = getattr(update, update_type)
+            if event is not None:
+                return event.chat.id
+
+        callback_query = update.callback_query
+        if callback_query is not None:
+            return get_callback_chat_id(
+                callback_query.data,
+                (
+                    callback_query.message.chat.id
+                    if callback_query.message else None
+                ),
+            )
+        return None
+
+    for update_type in CHAT_UPDATE_TYPES:
+        event = update.get(update_type)
+        if event is not None:
+            return event.get("chat", {}).get("id")
+
+    callback_query = update.get("callback_query")
+    if callback_query is not None:
+        return get_callback_chat_id(
+            callback_query.get("data"),
+            callback_query.get("message", {}).get("chat", {}).get("id"),
+        )
+    return None
+
+
+class UpdateWorkerPool:
+    """
+    Bounded pool of workers feeding updates to the dispatcher.
+
+    Updates are queued per chat: updates of one chat are processed one by
+    one in order of arrival, updates of different chats are processed
+    concurrently by up to ``workers`` workers. Updates are rejected when
+    ``max_queue_size`` updates are waiting, or wait for a free slot when
+    queued with ``put``.
+    """
+
+    def __init__(
+        self,
+        dispatcher: "Dispatcher",
+        bot: "Bot",
+        config: "TelegramUpdatePool",
+        **data: Any,
+    ):
+        """
+        Initialize the worker pool.
+
+        Args:
+            dispatcher (Dispatcher): The dispatcher to feed updates to.
+            bot (Bot): The bot instance.
+            config (TelegramUpdatePool): The worker pool settings.
+            **data: Additional data passed to handlers.
+
+        """
+        self.dispatcher = dispatcher
+        self.bot = bot
+        self.config = config
+        self.data = data
+
+        self._chat_queues: dict[Hashable, deque] = {}
+        self._ready: asyncio.Queue[Hashable] = asyncio.Queue()
+        self._tasks: list[asyncio.Task] = []
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+
+        self.depth = 0
+        self.processed = 0
+        self.dropped = 0
+        self.wait_time_total = 0.0
+        # Reset after every stats log line
+        self.wait_time_max = 0.0
+
+        UPDATE_QUEUE_DEPTH.labels(bot.id).set_function(lambda: self.depth)
+        self._queue_wait = UPDATE_QUEUE_WAIT.labels(bot.id)
+        self._dropped = UPDATES_DROPPED.labels(bot.id)
+
+    def stats(self) -> dict[str, float]:
+        """
+        Get the pool statistics.
+
+        Returns:
+            dict[str, float]: Queue depth, number of processed and dropped
+                updates, average queue wait time in seconds and maximum
+                one since the last stats log line.
+
+        """
+        return {
+            "depth": self.depth,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "wait_time_avg": (
+                self.wait_time_total / self.processed if self.processed else 0
+            ),
+            "wait_time_max": self.wait_time_max,
+        }
+
+    def submit(self, update: Union[dict[str, Any], Update]) -> bool:
+        """
+        Queue an update for processing.
+
+        Args:
+            update (dict | Update): The raw or parsed update.
+
+        Returns:
+            bool: False if the update was rejected because the pool is full.
+
+        """
+        if self.depth >= self.config.max_queue_size:
+            self.dropped += 1
+            self._dropped.inc()
+            return False
+
+        chat_id = get_update_chat_id(update)
+        key = chat_id if chat_id is not None else ("update", id(update))
+
+        queue = self._chat_queues.get(key)
+        if queue is None:
+            queue = self._chat_queues[key] = deque()
+            self._ready.put_nowait(key)
+        queue.append((time.monotonic(), update))
+        self.depth += 1
+        if self.depth >= self.config.max_queue_size:
+            self._not_full.clear()
+        return True
+
+    async def put(self, update: Union[dict[str, Any], Update]):
+        """
+        Queue an update for processing, waiting while the pool is full.
+
+        Args:
+            update (dict | Update): The raw or parsed update.
+
+        """
+        while self.depth >= self.config.max_queue_size:
+            self._not_full.clear()
+            await self._not_full.wait()
+        self.submit(update)
+
+    async def start(self, *args: Any, **kwargs: Any):
+        """Start the workers."""
+        self._tasks = [
+            asyncio.create_task(self._worker())
+            for _ in range(self.config.workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._log_stats()))
+
+    async def close(self, *args: Any, **kwargs: Any):
+        """Wait for queued updates and stop the workers."""
+        try:
+            async with asyncio.timeout(self.config.close_timeout):
+                while self.depth:
+                    await asyncio.sleep(0.1)
+        except TimeoutError:
+            logger.warning(f"Updates left unprocessed: {self.depth}")
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self):
+        while True:
+            key = await self._ready.get()
+            queue = self._chat_queues[key]
+            # The queue stays registered while processing,
+            # so new updates of the chat are appended to it
+            while queue:
+                enqueued_at, update = queue[0]
+                wait_time = time.monotonic() - enqueued_at
+                self.wait_time_total += wait_time
+                self.wait_time_max = max(self.wait_time_max, wait_time)
+                self._queue_wait.observe(wait_time)
+
+                try:
+                    await self._process(update)
+                except Exception:
+                    update_id = (
+                        update.update_id
+                        if isinstance(update, Update)
+                        else update.get("update_id")
+                    )
+                    logger.exception(f"Failed to process update {update_id}")
+
+                queue.popleft()
+                self.depth -= 1
+                self.processed += 1
+                if self.depth < self.config.max_queue_size:
+                    self._not_full.set()
+            del self._chat_queues[key]
+
+    async def _process(self, update: Union[dict[str, Any], Update]):
+        if isinstance(update, Update):
+            result = await self.dispatcher.feed_update(
+                bot=self.bot,
+                update=update,
+                **self.data,
+            )
+        else:
+            result = await self.dispatcher.feed_raw_update(
+                bot=self.bot,
+                update=update,
+                **self.data,
+            )
+        if isinstance(result, TelegramMethod):
+            await self.dispatcher.silent_call_request(
+                bot=self.bot,
+                result=result,
+            )
+
+    async def _log_stats(self):
+        processed = self.processed
+        while True:
+            await asyncio.sleep(self.config.stats_interval)
+            if self.processed == processed and not self.depth:
+                continue
+            processed = self.processed
+            logger.info(f"Update worker pool stats: {self.stats()}")
+            self.wait_time_max = 0.0
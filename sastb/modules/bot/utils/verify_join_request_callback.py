@@ -0,0 +1,8 @@
+__all__ = ("VerifyJoinRequestCallback",)
+
+from aiogram.filters.callback_data import CallbackData
+
+
+class VerifyJoinRequestCallback(CallbackData, prefix="verify_request"):
+    # The button is sent in private chat, so the group is kept in data
+    chat_id: int
@@ -0,0 +1,264 @@
+__all__ = ("AioSQLiteJobStore",)
+
+import asyncio
+import pickle
+import time
+from pathlib import Path
+from typing import Optional
+
+import aiosqlite
+from loguru import logger
+
+from apscheduler.job import Job
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.util import datetime_to_utc_timestamp
+
+from sastb.utils.metrics import JOB_STORE_LATENCY
+
+
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA busy_timeout=5000",
+)
+
+# Stored jobs read and unpickled at once on restore
+RESTORE_PAGE_SIZE = 500
+
+FLUSH_LATENCY = JOB_STORE_LATENCY.labels("jobs", "flush")
+
+
+class AioSQLiteJobStore(MemoryJobStore):
+    """
+    Job store that serves all lookups from memory and persists changes
+    to SQLite in background using aiosqlite.
+
+    APScheduler calls job store methods synchronously from the event loop,
+    so every change is applied to the in-memory index immediately and
+    queued for writing. The queue is drained by a background task that
+    runs SQLite I/O in the aiosqlite thread, coalescing repeated changes of
+    the same job into a single write.
+
+    The table layout is the same as in ``SQLAlchemyJobStore``, so existing
+    databases are restored without migration.
+
+    Unlike ``SQLAlchemyJobStore``, changes are not on disk when a method
+    returns: jobs added, updated or removed within the last
+    ``flush_interval`` seconds are lost if the process crashes. Pending
+    changes are written on a clean shutdown.
+    """
+
+    def __init__(
+        self,
+        file_name: str,
+        tablename: str = "apscheduler_jobs",
+        flush_interval: float = 0.5,
+        pickle_protocol: int = pickle.HIGHEST_PROTOCOL,
+    ):
+        """
+        Initialize the job store.
+
+        Args:
+            file_name (str): The SQLite database file name.
+            tablename (str): The name of the table to store jobs in.
+            flush_interval (float): Time in seconds to collect changes
+                before writing them to the database.
+            pickle_protocol (int): Pickle protocol used for job states.
+
+        """
+        super().__init__()
+        self.file_name = file_name
+        self.tablename = tablename
+        self.flush_interval = flush_interval
+        self.pickle_protocol = pickle_protocol
+
+        self._connection: Optional[aiosqlite.Connection] = None
+        self._restored_jobs: list[Job] = []
+        self._failed_job_ids: list[str] = []
+        # job id -> job to write or None to delete
+        self._pending: dict[str, Optional[Job]] = {}
+        self._clear_pending = False
+        self._wakeup = asyncio.Event()
+        self._writer_task: Optional[asyncio.Task] = None
+
+    async def open(self):
+        """
+        Open the database connection and read stored jobs.
+
+        Jobs are read and unpickled page by page, so raw job states of
+        the whole table are never held in memory at once. Must be awaited
+        before the scheduler is started.
+        """
+        Path(self.file_name).parent.mkdir(exist_ok=True, parents=True)
+        self._connection = await aiosqlite.connect(self.file_name)
+        for pragma in SQLITE_PRAGMAS:
+            await self._connection.execute(pragma)
+
+        await self._connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.tablename} ("
+            "id VARCHAR(191) NOT NULL PRIMARY KEY, "
+            "next_run_time FLOAT, "
+            "job_state BLOB NOT NULL)"
+        )
+        await self._connection.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_{self.tablename}_next_run_time "
+            f"ON {self.tablename} (next_run_time)"
+        )
+        await self._connection.commit()
+
+        async with self._connection.execute(
+            f"SELECT id, job_state FROM {self.tablename}",
+        ) as cursor:
+            while rows := await cursor.fetchmany(RESTORE_PAGE_SIZE):
+                for job_id, job_state in rows:
+                    try:
+                        job = self._reconstitute_job(job_state)
+                    except Exception as restore_exc:
+                        logger.error(
+                            f"Unable to restore job {job_id}, removing: "
+                            f"{restore_exc}"
+                        )
+                        self._failed_job_ids.append(job_id)
+                        continue
+                    self._restored_jobs.append(job)
+
+    def start(self, scheduler, alias):
+        """
+        Restore the stored jobs and start the background writer.
+
+        Args:
+            scheduler (BaseScheduler): The scheduler starting this store.
+            alias (str): The alias of this job store.
+
+        """
+        super().start(scheduler, alias)
+
+        if self._connection is None:
+            raise RuntimeError("Job store must be opened before start")
+
+        for job in self._restored_jobs:
+            job._scheduler = scheduler
+            job._jobstore_alias = alias
+            MemoryJobStore.add_job(self, job)
+        logger.info(
+            f"Jobs restored: {len(self._restored_jobs)}, "
+            f"failed: {len(self._failed_job_ids)}"
+        )
+
+        for job_id in self._failed_job_ids:
+            self._mark_dirty(job_id, None)
+        self._restored_jobs = []
+        self._failed_job_ids = []
+
+        self._writer_task = asyncio.create_task(self._writer())
+
+    def add_job(self, job: Job):
+        super().add_job(job)
+        self._mark_dirty(job.id, job)
+
+    def update_job(self, job: Job):
+        super().update_job(job)
+        self._mark_dirty(job.id, job)
+
+    def remove_job(self, job_id: str):
+        super().remove_job(job_id)
+        self._mark_dirty(job_id, None)
+
+    def remove_all_jobs(self):
+        super().remove_all_jobs()
+        self._pending.clear()
+        self._clear_pending = True
+        self._wakeup.set()
+
+    def shutdown(self):
+        """Keep jobs in memory, they are flushed by ``close``."""
+        if self._writer_task:
+            self._writer_task.cancel()
+
+    async def close(self):
+        """Flush pending changes and close the database connection."""
+        if self._writer_task:
+            self._writer_task.cancel()
+            self._writer_task = None
+
+        if self._connection is None:
+            return
+
+        await self.flush()
+        await self._connection.close()
+        self._connection = None
+
+    async def flush(self):
+        """Write all pending changes to the database in one transaction."""
+        if self._connection is None:
+            return
+
+        pending, self._pending = self._pending, {}
+        clear_pending, self._clear_pending = self._clear_pending, False
+        if not pending and not clear_pending:
+            return
+
+        started = time.perf_counter()
+        upserts = []
+        deletes = []
+        for job_id, job in pending.items():
+            if job is None:
+                deletes.append((job_id,))
+                continue
+            upserts.append((
+                job_id,
+                datetime_to_utc_timestamp(job.next_run_time),
+                pickle.dumps(job.__getstate__(), self.pickle_protocol),
+            ))
+
+        try:
+            if clear_pending:
+                await self._connection.execute(
+                    f"DELETE FROM {self.tablename}",
+                )
+            if deletes:
+                await self._connection.executemany(
+                    f"DELETE FROM {self.tablename} WHERE id = ?",
+                    deletes,
+                )
+            if upserts:
+                await self._connection.executemany(
+                    f"INSERT OR REPLACE INTO {self.tablename} "
+                    "(id, next_run_time, job_state) VALUES (?, ?, ?)",
+                    upserts,
+                )
+            await self._connection.commit()
+        except Exception as flush_exc:
+            logger.error(f"Failed to write jobs: {flush_exc}")
+            await self._connection.rollback()
+            # Keep newer changes made while writing
+            self._pending = pending | self._pending
+            self._clear_pending = self._clear_pending or clear_pending
+            self._wakeup.set()
+        finally:
+            FLUSH_LATENCY.observe(time.perf_counter() - started)
+
+    def _mark_dirty(self, job_id: str, job: Optional[Job]):
+        self._pending[job_id] = job
+        self._wakeup.set()
+
+    async def _writer(self):
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.flush_interval)
+            self._wakeup.clear()
+            await self.flush()
+
+    def _reconstitute_job(self, job_state: bytes) -> Job:
+        state = pickle.loads(job_state)
+        state["jobstore"] = self
+        job = Job.__new__(Job)
+        job.__setstate__(state)
+        job._scheduler = self._scheduler
+        job._jobstore_alias = self._alias
+        return job
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} (file_name={self.file_name})>"
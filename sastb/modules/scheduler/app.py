@@ -1,6 +1,8 @@
 __all__ = ("SchedulerApp",)
 
-from typing import TYPE_CHECKING, Callable, Optional
+import time
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Optional, Sequence
 
 from loguru import logger
 
@@ -10,29 +12,52 @@ from apscheduler.triggers.date import DateTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.jobstores.base import ConflictingIdError, BaseJobStore
 from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.util import undefined
 
 from sqlalchemy import create_engine
+from sastb.utils.metrics import (
+    JOB_STORE_LATENCY,
+    PENDING_VERIFICATIONS,
+    SCHEDULED_JOBS,
+)
 from sastb.utils.singleton import Singleton
 
+from .aiosqlite_job_store import AioSQLiteJobStore
 from .custom_job_executor import AsyncExecutorWithLoggerContext
+from .monitor import SchedulerMonitor
+from .pending_verifications import KIND_JOIN_REQUEST, PendingVerifications
+from .routes import decline_join_request_job, kick_user_job
 
 
 if TYPE_CHECKING:
     from sastb.config.models.scheduler import SchedulerConfig
 
+SCHEDULE_LATENCY = JOB_STORE_LATENCY.labels("jobs", "schedule")
+CANCEL_LATENCY = JOB_STORE_LATENCY.labels("jobs", "cancel")
+
 
 class SchedulerApp(metaclass=Singleton):
     """Async Background Scheduler with the desired scheduled functions."""
 
     __scheduler: "AsyncIOScheduler"
+    __job_store: "BaseJobStore"
     config: "SchedulerConfig"
+    verifications: "PendingVerifications"
+    monitor: "SchedulerMonitor"
 
-    def __init__(self, config: Optional["SchedulerConfig"] = None):
+    def __init__(
+        self,
+        config: Optional["SchedulerConfig"] = None,
+        bot_ids: Sequence[int] = (),
+    ):
         """
         Initialize the scheduler.
 
         Args:
             config (SchedulerConfig): The scheduler configuration.
+            bot_ids (Sequence[int]): IDs of hosted bots, the main bot
+                first. Each bot other than the main one gets its own
+                verifications table.
 
         """
         if not config:
@@ -42,20 +67,124 @@ class SchedulerApp(metaclass=Singleton):
 
         self.config = config
 
-        engine = create_engine(
-            self.config.jobstores.sqlite_url,
-        )
-
+        self.__job_store = self._create_job_store()
         jobstores: dict[str, BaseJobStore] = {
-            "default": SQLAlchemyJobStore(
-                engine=engine,
-            ),
+            "default": self.__job_store,
         }
 
         self.__scheduler = AsyncIOScheduler(
             jobstores=jobstores,
         )
 
+        self.monitor = SchedulerMonitor(self.config.monitoring)
+        # The main bot keeps the table of single bot setups
+        self.verifications = self._create_verifications()
+        self.bot_verifications = {
+            bot_id: self._create_verifications(bot_id)
+            for bot_id in bot_ids[1:]
+        }
+
+        PENDING_VERIFICATIONS.labels().set_function(
+            lambda: sum(
+                len(verifications)
+                for verifications in self._get_all_verifications()
+            ),
+        )
+        SCHEDULED_JOBS.labels().set_function(
+            lambda: len(self.__scheduler.get_jobs()),
+        )
+
+    def _create_verifications(
+        self, bot_id: Optional[int] = None,
+    ) -> "PendingVerifications":
+        """
+        Create pending verifications of a bot.
+
+        Args:
+            bot_id (int | None): The ID of the bot, None for the main bot.
+
+        Returns:
+            PendingVerifications: The pending verifications.
+
+        """
+        return PendingVerifications(
+            file_name=self.config.jobstores.file_name,
+            on_deadline=partial(self._on_verification_deadline, bot_id=bot_id),
+            flush_interval=self.config.verifications.flush_interval,
+            catch_up_rate=self.config.verifications.catch_up_rate,
+            catch_up_concurrency=(
+                self.config.verifications.catch_up_concurrency
+            ),
+            tablename=(
+                "pending_verifications"
+                if bot_id is None
+                else f"pending_verifications_{bot_id}"
+            ),
+            monitor=self.monitor,
+        )
+
+    def _get_all_verifications(self) -> list["PendingVerifications"]:
+        return [self.verifications, *self.bot_verifications.values()]
+
+    def get_verifications(
+        self, bot_id: Optional[int] = None,
+    ) -> "PendingVerifications":
+        """
+        Get pending verifications of a bot.
+
+        Args:
+            bot_id (int | None): The ID of the bot.
+
+        Returns:
+            PendingVerifications: The verifications of the bot, those of
+                the main bot if the ID is None or of the main bot.
+
+        """
+        return self.bot_verifications.get(bot_id, self.verifications)
+
+    @staticmethod
+    async def _on_verification_deadline(
+        chat_id: int,
+        user_id: int,
+        message_id: Optional[int],
+        kind: str,
+        bot_id: Optional[int],
+    ):
+        """Kick the user or decline the join request after the deadline."""
+        job = (
+            decline_join_request_job
+            if kind == KIND_JOIN_REQUEST
+            else kick_user_job
+        )
+        await job(
+            chat_id=chat_id,
+            user_id=user_id,
+            message_id=message_id,
+            bot_id=bot_id,
+        )
+
+    def _create_job_store(self) -> "BaseJobStore":
+        """
+        Create the default job store for the configured backend.
+
+        Returns:
+            BaseJobStore: The job store instance.
+
+        """
+        jobstores_config = self.config.jobstores
+        if jobstores_config.backend == "sqlalchemy":
+            engine = create_engine(
+                jobstores_config.sqlite_url,
+            )
+            return SQLAlchemyJobStore(
+                engine=engine,
+            )
+
+        return AioSQLiteJobStore(
+            file_name=jobstores_config.file_name,
+            flush_interval=jobstores_config.flush_interval,
+        )
+
     def get_job(self, job_id: str):
         """
         Get a job with given ID.
@@ -84,6 +213,8 @@ class SchedulerApp(metaclass=Singleton):
         kwargs: Optional[dict] = None,
         *,
         replace_existing: bool = True,
+        coalesce: Any = undefined,
+        misfire_grace_time: Any = undefined,
     ):
         """
         Add a new job to the scheduler.
@@ -96,11 +227,17 @@ class SchedulerApp(metaclass=Singleton):
             kwargs (dict, optional): Keyword arguments to pass to the function.
             replace_existing (bool, optional): Whether to replace an existing
                 job with the same ID.
+            coalesce (bool, optional): Whether to run missed runs of the job
+                once, the scheduler default if not set.
+            misfire_grace_time (int | None, optional): Time in seconds a late
+                job is still run, None for any delay, the scheduler default
+                if not set.
 
         Raises:
             ValueError: If the job ID is empty or the function is not callable.
 
         """
+        started = time.perf_counter()
         try:
             job = self.__scheduler.add_job(
                 func=func,
@@ -109,10 +246,14 @@ class SchedulerApp(metaclass=Singleton):
                 name=job_id,
                 kwargs=kwargs,
                 replace_existing=replace_existing,
+                coalesce=coalesce,
+                misfire_grace_time=misfire_grace_time,
             )
         except ConflictingIdError:
             logger.warning(f"Job {job_id} already exists")
             return
+        finally:
+            SCHEDULE_LATENCY.observe(time.perf_counter() - started)
 
         logger.info(
             f"Added job {job_id}: next_run={job.next_run_time}, "
@@ -130,6 +271,7 @@ class SchedulerApp(metaclass=Singleton):
             bool: True if job was removed, False otherwise (job not found)
 
         """
+        started = time.perf_counter()
         # Find if job exists
         job = self.__scheduler.get_job(job_id=job_id)
         if not job:
@@ -137,18 +279,62 @@ class SchedulerApp(metaclass=Singleton):
             return False
 
         self.__scheduler.remove_job(job_id=job_id)
+        CANCEL_LATENCY.observe(time.perf_counter() - started)
         logger.info(f"Removed job {job_id}")
         return True
 
-    def start(self):
+    async def start(self):
         """Start the scheduler."""
-        self.__scheduler.add_executor(AsyncExecutorWithLoggerContext())
+        if isinstance(self.__job_store, AioSQLiteJobStore):
+            await self.__job_store.open()
+
+        self.__scheduler.add_executor(
+            AsyncExecutorWithLoggerContext(monitor=self.monitor),
+        )
         self.__scheduler.start()
+        self.monitor.start()
         logger.info("Scheduler started")
 
-        # Print all restored jobs
-        jobs_info = [
-            (j.id, j.next_run_time)
-            for j in self.__scheduler.get_jobs()
-        ]
-        logger.info(f"Jobs restored: {jobs_info}")
+        all_verifications = self._get_all_verifications()
+        for verifications in all_verifications:
+            await verifications.open()
+        self._migrate_kick_jobs()
+        logger.info(
+            "Pending verifications restored: "
+            f"{sum(map(len, all_verifications))}"
+        )
+        for verifications in all_verifications:
+            verifications.start()
+
+    def _migrate_kick_jobs(self):
+        """
+        Move kick user jobs created by previous versions to verifications.
+        """
+        moved_count = 0
+        for job in self.__scheduler.get_jobs():
+            if job.func is not kick_user_job or job.next_run_time is None:
+                continue
+
+            self.verifications.add(
+                chat_id=job.kwargs["chat_id"],
+                user_id=job.kwargs["user_id"],
+                message_id=job.kwargs["message_id"],
+                deadline=job.next_run_time.timestamp(),
+            )
+            self.__scheduler.remove_job(job_id=job.id)
+            moved_count += 1
+        if moved_count:
+            logger.info(f"Kick jobs moved to verifications: {moved_count}")
+
+    async def stop(self):
+        """Stop the scheduler and flush pending job changes."""
+        if self.__scheduler.running:
+            self.__scheduler.shutdown(wait=False)
+
+        for verifications in self._get_all_verifications():
+            await verifications.close()
+        await self.monitor.close()
+
+        if isinstance(self.__job_store, AioSQLiteJobStore):
+            await self.__job_store.close()
+        logger.info("Scheduler stopped")
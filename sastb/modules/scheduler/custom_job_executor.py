@@ -1,13 +1,42 @@
 __all__ = ("AsyncExecutorWithLoggerContext",)
 
+import sys
+import time
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Optional
+
+from apscheduler.events import EVENT_JOB_MISSED
 from apscheduler.executors.asyncio import AsyncIOExecutor
+from apscheduler.executors.base import run_coroutine_job
 from apscheduler.job import Job
+from apscheduler.util import iscoroutinefunction_partial
 
 from loguru import logger
 
+if TYPE_CHECKING:
+    from .monitor import SchedulerMonitor
+
 
 class AsyncExecutorWithLoggerContext(AsyncIOExecutor):
-    """Custom executor for the APScheduler."""
+    """
+    Custom executor for the APScheduler.
+
+    Runs jobs with logger context and reports the delay between scheduled
+    and actual start, job runtime, misfires and coalesced runs of
+    coroutine jobs to the scheduler monitor.
+    """
+
+    def __init__(self, monitor: Optional["SchedulerMonitor"] = None):
+        """
+        Initialize the executor.
+
+        Args:
+            monitor (SchedulerMonitor | None): The monitor to report to.
+
+        """
+        super().__init__()
+        self.monitor = monitor
+        self.stats = monitor.get_engine("jobs") if monitor else None
 
     @logger.catch()
     def _do_submit_job(self, job: Job, run_times):
@@ -19,5 +48,58 @@ class AsyncExecutorWithLoggerContext(AsyncIOExecutor):
             run_times (list): The times at which the job should run.
 
         """
+        context = {"app": "scheduler"}
+        if "chat_id" in job.kwargs:
+            context["chat_id"] = job.kwargs["chat_id"]
+        # Copied to the task of the job
+        with logger.contextualize(**context):
+            if self.monitor is None or not iscoroutinefunction_partial(
+                job.func,
+            ):
+                return super()._do_submit_job(job, run_times)
+
+            if job.coalesce:
+                # Job is not updated yet, so it still has all missed runs
+                missed_runs = len(job._get_run_times(run_times[-1]))
+                if missed_runs > 1:
+                    self.monitor.record_coalesced(self.stats, missed_runs - 1)
+
+            def callback(future):
+                self._pending_futures.discard(future)
+                try:
+                    events = future.result()
+                except BaseException:
+                    self._run_job_error(job.id, *sys.exc_info()[1:])
+                else:
+                    self._run_job_success(job.id, events)
+
+            future = self._eventloop.create_task(
+                self._run_coroutine_job(job, run_times),
+            )
+            future.add_done_callback(callback)
+            self._pending_futures.add(future)
+
+    async def _run_coroutine_job(self, job: Job, run_times: list[datetime]):
+        started_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
         with logger.contextualize(app="scheduler"):
-            return super()._do_submit_job(job, run_times)
+            events = await run_coroutine_job(
+                job, job._jobstore_alias, run_times, self._logger.name,
+            )
+        duration = time.perf_counter() - started
+
+        missed_run_times = {
+            event.scheduled_run_time
+            for event in events
+            if event.code == EVENT_JOB_MISSED
+        }
+        executed_runs = len(run_times) - len(missed_run_times)
+        for run_time in run_times:
+            lag = (started_at - run_time).total_seconds()
+            if run_time in missed_run_times:
+                self.monitor.record_misfire(self.stats, lag)
+                continue
+            self.monitor.record_run(
+                self.stats, lag, duration / executed_runs,
+            )
+        return events
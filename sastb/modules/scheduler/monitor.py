@@ -0,0 +1,215 @@
+__all__ = ("SchedulerMonitor", "EngineStats")
+
+import asyncio
+from typing import TYPE_CHECKING, Optional
+
+from loguru import logger
+
+from sastb.utils.metrics import (
+    SCHEDULER_COALESCED_RUNS,
+    SCHEDULER_JOB_DURATION,
+    SCHEDULER_LAG,
+    SCHEDULER_MISFIRES,
+)
+
+if TYPE_CHECKING:
+    from sastb.config.models.scheduler import SchedulerMonitoring
+
+
+class EngineStats:
+    """Metrics of a job engine and its stats since the last summary."""
+
+    __slots__ = (
+        "engine",
+        "lag",
+        "duration",
+        "misfires",
+        "coalesced_runs",
+        "runs",
+        "lag_total",
+        "lag_max",
+        "duration_max",
+        "misfire_count",
+        "coalesced_count",
+        "late_runs",
+    )
+
+    def __init__(self, engine: str):
+        self.engine = engine
+        self.lag = SCHEDULER_LAG.labels(engine)
+        self.duration = SCHEDULER_JOB_DURATION.labels(engine)
+        self.misfires = SCHEDULER_MISFIRES.labels(engine)
+        self.coalesced_runs = SCHEDULER_COALESCED_RUNS.labels(engine)
+        self.reset()
+
+    def reset(self):
+        """Start a new summary interval."""
+        self.runs = 0
+        self.lag_total = 0.0
+        self.lag_max = 0.0
+        self.duration_max = 0.0
+        self.misfire_count = 0
+        self.coalesced_count = 0
+        self.late_runs = 0
+
+    def summary(self) -> dict[str, float]:
+        """
+        Get the stats of the summary interval.
+
+        Returns:
+            dict[str, float]: Number of runs, late runs, misfires and
+                coalesced runs, average and maximum lag and maximum
+                runtime in seconds.
+
+        """
+        return {
+            "runs": self.runs,
+            "late_runs": self.late_runs,
+            "misfires": self.misfire_count,
+            "coalesced_runs": self.coalesced_count,
+            "lag_avg": round(
+                self.lag_total / self.runs if self.runs else 0, 3,
+            ),
+            "lag_max": round(self.lag_max, 3),
+            "duration_max": round(self.duration_max, 3),
+        }
+
+
+class SchedulerMonitor:
+    """
+    Lag, runtime, misfire and coalesced run tracking of job engines.
+
+    Both the APScheduler executor and pending verifications report their
+    runs here. Runs later or longer than the alert thresholds are logged
+    as warnings, once per engine and summary interval, and a summary of
+    each engine is logged every ``summary_interval`` seconds.
+    """
+
+    def __init__(self, config: "SchedulerMonitoring"):
+        """
+        Initialize the monitor.
+
+        Args:
+            config (SchedulerMonitoring): The monitoring settings.
+
+        """
+        self.config = config
+        self.engines: dict[str, EngineStats] = {}
+        self._alerted: set[tuple[str, str]] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def get_engine(self, engine: str) -> EngineStats:
+        """
+        Get the stats of an engine, engines report through them.
+
+        Args:
+            engine (str): The name of the engine.
+
+        Returns:
+            EngineStats: The engine stats.
+
+        """
+        stats = self.engines.get(engine)
+        if stats is None:
+            stats = self.engines[engine] = EngineStats(engine)
+        return stats
+
+    def record_run(self, stats: EngineStats, lag: float, duration: float):
+        """
+        Record a job run.
+
+        Args:
+            stats (EngineStats): The stats of the engine.
+            lag (float): Seconds between scheduled and actual start.
+            duration (float): The job runtime in seconds.
+
+        """
+        lag = max(lag, 0.0)
+        stats.lag.observe(lag)
+        stats.duration.observe(duration)
+        stats.runs += 1
+        stats.lag_total += lag
+        stats.lag_max = max(stats.lag_max, lag)
+        stats.duration_max = max(stats.duration_max, duration)
+
+        if lag > self.config.lag_alert_threshold:
+            stats.late_runs += 1
+            self._alert(
+                stats,
+                "lag",
+                f"Scheduler {stats.engine} is behind: job started "
+                f"{lag:.1f}s after its scheduled time",
+            )
+        if duration > self.config.runtime_alert_threshold:
+            self._alert(
+                stats,
+                "duration",
+                f"Scheduler {stats.engine}: job ran for {duration:.1f}s",
+            )
+
+    def record_misfire(self, stats: EngineStats, lag: float):
+        """
+        Record a job run skipped because of misfire grace time.
+
+        Args:
+            stats (EngineStats): The stats of the engine.
+            lag (float): Seconds the run was late by.
+
+        """
+        stats.misfires.inc()
+        stats.misfire_count += 1
+        self._alert(
+            stats,
+            "misfire",
+            f"Scheduler {stats.engine}: job run missed by {lag:.1f}s "
+            "and skipped",
+        )
+
+    def record_coalesced(self, stats: EngineStats, count: int):
+        """
+        Record missed job runs merged into one run.
+
+        Args:
+            stats (EngineStats): The stats of the engine.
+            count (int): Number of runs merged away.
+
+        """
+        stats.coalesced_runs.inc(count)
+        stats.coalesced_count += count
+
+    def start(self):
+        """Start logging summaries."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._log_summary())
+
+    async def close(self):
+        """Stop logging summaries."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def _alert(self, stats: EngineStats, kind: str, message: str):
+        key = (stats.engine, kind)
+        if key in self._alerted:
+            return
+        self._alerted.add(key)
+        logger.warning(message)
+
+    async def _log_summary(self):
+        while True:
+            await asyncio.sleep(self.config.summary_interval)
+            for stats in self.engines.values():
+                if not stats.runs and not stats.misfire_count:
+                    continue
+
+                is_behind = (
+                    stats.lag_max > self.config.lag_alert_threshold
+                    or stats.misfire_count
+                )
+                logger.log(
+                    "WARNING" if is_behind else "INFO",
+                    f"Scheduler {stats.engine} summary: {stats.summary()}",
+                )
+                stats.reset()
+            self._alerted.clear()
@@ -0,0 +1,690 @@
+__all__ = (
+    "PendingVerification",
+    "PendingVerifications",
+    "KIND_JOIN",
+    "KIND_JOIN_REQUEST",
+)
+
+import asyncio
+import heapq
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional
+
+import aiosqlite
+from loguru import logger
+
+from sastb.utils.metrics import JOB_STORE_LATENCY
+
+from .aiosqlite_job_store import SQLITE_PRAGMAS
+
+if TYPE_CHECKING:
+    from .monitor import SchedulerMonitor
+
+
+# Rebuild the heap when cancelled records take more than half of it
+COMPACT_MIN_SIZE = 1024
+# Stored verifications read at once on restore
+RESTORE_PAGE_SIZE = 500
+# Verification waits for the confirm button click
+STATE_PENDING = "pending"
+# Deadline has passed, the user is being kicked
+STATE_KICKING = "kicking"
+# User joined the group and is kicked if not confirmed
+KIND_JOIN = "join"
+# User requested to join and is declined if not confirmed
+KIND_JOIN_REQUEST = "join_request"
+# Values of columns missing in tables created by previous versions
+MIGRATED_COLUMNS = {
+    "joined_at": "0",
+    "state": f"'{STATE_PENDING}'",
+    "kind": f"'{KIND_JOIN}'",
+}
+# Writes one verification, columns in the order of ``_row``
+UPSERT_QUERY = (
+    "INSERT OR REPLACE INTO {tablename} "
+    "(chat_id, user_id, message_id, joined_at, deadline, state, kind) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+ADD_LATENCY = JOB_STORE_LATENCY.labels("verifications", "add")
+CANCEL_LATENCY = JOB_STORE_LATENCY.labels("verifications", "cancel")
+FLUSH_LATENCY = JOB_STORE_LATENCY.labels("verifications", "flush")
+
+
+class PendingVerification:
+    """Verification of a user that waits for the confirm button click."""
+
+    __slots__ = (
+        "chat_id",
+        "user_id",
+        "message_id",
+        "joined_at",
+        "deadline",
+        "state",
+        "kind",
+        "is_cancelled",
+        "is_persisted",
+        "is_queued",
+    )
+
+    def __init__(
+        self,
+        chat_id: int,
+        user_id: int,
+        message_id: Optional[int],
+        joined_at: float,
+        deadline: float,
+        state: str = STATE_PENDING,
+        kind: str = KIND_JOIN,
+    ):
+        self.chat_id = chat_id
+        self.user_id = user_id
+        self.message_id = message_id
+        self.joined_at = joined_at
+        self.deadline = deadline
+        self.state = state
+        self.kind = kind
+        self.is_cancelled = False
+        # Whether the database has a row for (chat_id, user_id)
+        self.is_persisted = False
+        # Whether it waits in the catch-up queue instead of the heap
+        self.is_queued = False
+
+    def __lt__(self, other: "PendingVerification") -> bool:
+        return self.deadline < other.deadline
+
+    def __repr__(self):
+        return (
+            f"<PendingVerification chat_id={self.chat_id} "
+            f"user_id={self.user_id} deadline={self.deadline} "
+            f"state={self.state} kind={self.kind}>"
+        )
+
+
+class PendingVerifications:
+    """
+    Deadline heap of pending verifications with write-behind persistence.
+
+    Adding takes O(log n), cancelling is O(1): cancelled records are only
+    marked and dropped when they reach the top of the heap, or all at once
+    when they take more than half of it. A single timer task sleeps until
+    the nearest deadline and calls ``on_deadline`` for expired records.
+
+    Changes are written to SQLite every ``flush_interval`` seconds, so a
+    verification that is added and cancelled within this window never
+    reaches the disk. Rows are keyed by (chat_id, user_id) and indexed by
+    deadline, all verifications of a chat are removed with one query.
+
+    Verifications already expired on start, e.g. after downtime, are
+    moved to a catch-up queue and processed oldest first, at most
+    ``catch_up_rate`` per second and ``catch_up_concurrency`` at once, so
+    the backlog does not hit the Bot API as one burst. They can still be
+    cancelled while queued.
+    """
+
+    def __init__(
+        self,
+        file_name: str,
+        on_deadline: Callable[..., Awaitable],
+        flush_interval: float = 1.0,
+        catch_up_rate: float = 5.0,
+        catch_up_concurrency: int = 5,
+        tablename: str = "pending_verifications",
+        monitor: Optional["SchedulerMonitor"] = None,
+    ):
+        """
+        Initialize the pending verifications.
+
+        Args:
+            file_name (str): The SQLite database file name.
+            on_deadline (Callable): Coroutine function called with
+                ``chat_id``, ``user_id``, ``message_id`` and ``kind``
+                keyword arguments when verification is expired,
+                ``message_id`` is None if the message was not sent.
+            flush_interval (float): Time in seconds to collect changes
+                before writing them to the database.
+            catch_up_rate (float): Overdue verifications processed per
+                second after start.
+            catch_up_concurrency (int): Overdue verifications processed
+                at once after start.
+            tablename (str): The name of the table.
+            monitor (SchedulerMonitor | None): The monitor to report
+                deadline lag and runtime to.
+
+        """
+        self.file_name = file_name
+        self.on_deadline = on_deadline
+        self.flush_interval = flush_interval
+        self.catch_up_rate = catch_up_rate
+        self.catch_up_concurrency = catch_up_concurrency
+        self.tablename = tablename
+        self.monitor = monitor
+        self.stats = monitor.get_engine("verifications") if monitor else None
+
+        self._heap: list[PendingVerification] = []
+        self._index: dict[tuple[int, int], PendingVerification] = {}
+        # chat_id -> user_id -> record, for per-chat operations
+        self._chats: dict[int, dict[int, PendingVerification]] = {}
+        self._cancelled_count = 0
+        # (chat_id, user_id) -> record to write or None to delete
+        self._pending: dict[
+            tuple[int, int], Optional[PendingVerification]
+        ] = {}
+        # Chats whose rows are deleted on the next write
+        self._cancelled_chats: set[int] = set()
+
+        self._connection: Optional[aiosqlite.Connection] = None
+        self._flush_lock = asyncio.Lock()
+        self._timer_wakeup = asyncio.Event()
+        self._writer_wakeup = asyncio.Event()
+        self._tasks: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(
+        self,
+        chat_id: int,
+        user_id: int,
+    ) -> Optional[PendingVerification]:
+        """
+        Get a pending verification.
+
+        Args:
+            chat_id (int): The ID of the chat.
+            user_id (int): The ID of the user.
+
+        Returns:
+            PendingVerification | None: The verification if found.
+
+        """
+        return self._index.get((chat_id, user_id))
+
+    def add(
+        self,
+        chat_id: int,
+        user_id: int,
+        message_id: Optional[int],
+        deadline: float,
+        joined_at: Optional[float] = None,
+        kind: str = KIND_JOIN,
+    ) -> PendingVerification:
+        """
+        Add a pending verification, replacing an existing one.
+
+        Args:
+            chat_id (int): The ID of the chat.
+            user_id (int): The ID of the user.
+            message_id (int | None): The ID of the welcome message, None if
+                it is not sent yet.
+            deadline (float): UNIX timestamp after which the user is kicked.
+            joined_at (float | None): UNIX timestamp of the join, now if
+                not set.
+            kind (str): ``KIND_JOIN`` for joined users, kicked after the
+                deadline, or ``KIND_JOIN_REQUEST`` for join requests,
+                declined after the deadline.
+
+        Returns:
+            PendingVerification: The added verification.
+
+        """
+        started = time.perf_counter()
+        key = (chat_id, user_id)
+        record = PendingVerification(
+            chat_id,
+            user_id,
+            message_id,
+            time.time() if joined_at is None else joined_at,
+            deadline,
+            kind=kind,
+        )
+
+        previous = self._index.get(key)
+        if previous is not None:
+            self._mark_cancelled(previous)
+            record.is_persisted = previous.is_persisted
+
+        self._index[key] = record
+        self._chats.setdefault(chat_id, {})[user_id] = record
+        heapq.heappush(self._heap, record)
+        if self._heap[0] is record:
+            self._timer_wakeup.set()
+
+        self._mark_dirty(key, record)
+        ADD_LATENCY.observe(time.perf_counter() - started)
+        return record
+
+    def set_message_id(
+        self,
+        chat_id: int,
+        user_id: int,
+        message_id: int,
+    ) -> bool:
+        """
+        Attach the welcome message to a pending verification.
+
+        Args:
+            chat_id (int): The ID of the chat.
+            user_id (int): The ID of the user.
+            message_id (int): The ID of the welcome message.
+
+        Returns:
+            bool: False if the verification is not pending anymore.
+
+        """
+        key = (chat_id, user_id)
+        record = self._index.get(key)
+        if record is None:
+            return False
+
+        record.message_id = message_id
+        self._mark_dirty(key, record)
+        return True
+
+    def cancel(
+        self,
+        chat_id: int,
+        user_id: int,
+    ) -> Optional[PendingVerification]:
+        """
+        Cancel a pending verification.
+
+        Args:
+            chat_id (int): The ID of the chat.
+            user_id (int): The ID of the user.
+
+        Returns:
+            PendingVerification | None: The cancelled verification if found.
+
+        """
+        started = time.perf_counter()
+        key = (chat_id, user_id)
+        record = self._index.get(key)
+        if record is None:
+            return None
+
+        self._unindex(record)
+        self._mark_cancelled(record)
+        if record.is_persisted:
+            self._mark_dirty(key, None)
+        else:
+            # Never written, nothing to delete
+            self._pending.pop(key, None)
+        CANCEL_LATENCY.observe(time.perf_counter() - started)
+        return record
+
+    def cancel_chat(self, chat_id: int) -> list[PendingVerification]:
+        """
+        Cancel all pending verifications of a chat, e.g. when the bot is
+        removed from it.
+
+        Args:
+            chat_id (int): The ID of the chat.
+
+        Returns:
+            list[PendingVerification]: The cancelled verifications.
+
+        """
+        records = list(self._chats.pop(chat_id, {}).values())
+        for record in records:
+            key = (chat_id, record.user_id)
+            del self._index[key]
+            self._mark_cancelled(record)
+            self._pending.pop(key, None)
+        if records:
+            self._cancelled_chats.add(chat_id)
+            self._writer_wakeup.set()
+        return records
+
+    async def open(self):
+        """Open the database connection and restore pending verifications."""
+        Path(self.file_name).parent.mkdir(exist_ok=True, parents=True)
+        self._connection = await aiosqlite.connect(self.file_name)
+        for pragma in SQLITE_PRAGMAS:
+            await self._connection.execute(pragma)
+
+        await self._migrate()
+        await self._create_table()
+        await self._connection.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.tablename}_deadline "
+            f"ON {self.tablename} (deadline)"
+        )
+        await self._connection.commit()
+
+        # Rows come sorted by deadline, so they already form a heap
+        async with self._connection.execute(
+            f"SELECT chat_id, user_id, message_id, joined_at, deadline, "
+            f"state, kind FROM {self.tablename} ORDER BY deadline",
+        ) as cursor:
+            while rows := await cursor.fetchmany(RESTORE_PAGE_SIZE):
+                for row in rows:
+                    record = PendingVerification(*row)
+                    record.is_persisted = True
+                    self._index[(record.chat_id, record.user_id)] = record
+                    self._chats.setdefault(
+                        record.chat_id, {},
+                    )[record.user_id] = record
+                    self._heap.append(record)
+
+    def start(self):
+        """
+        Start the timer, the background writer and catching up overdue
+        verifications.
+        """
+        if self._connection is None:
+            raise RuntimeError("Pending verifications must be opened first")
+
+        overdue = []
+        now = time.time()
+        while self._heap and self._heap[0].deadline <= now:
+            record = heapq.heappop(self._heap)
+            if record.is_cancelled:
+                self._cancelled_count -= 1
+                continue
+            record.is_queued = True
+            overdue.append(record)
+        if overdue:
+            self._spawn(self._catch_up(overdue))
+
+        self._spawn(self._timer())
+        self._spawn(self._writer())
+
+    async def close(self):
+        """Stop background tasks, flush changes and close the database."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        if self._connection is None:
+            return
+
+        await self.flush()
+        await self._connection.close()
+        self._connection = None
+
+    async def flush(self):
+        """Write all pending changes to the database in one transaction."""
+        async with self._flush_lock:
+            await self._flush()
+
+    async def persist(self, record: PendingVerification):
+        """
+        Write a single verification now, ahead of the background writer.
+
+        Args:
+            record (PendingVerification): The verification to write.
+
+        """
+        if self._connection is None:
+            return
+
+        key = (record.chat_id, record.user_id)
+        async with self._flush_lock:
+            if self._pending.get(key) is not record:
+                # Already written, replaced or cancelled
+                return
+
+            del self._pending[key]
+            record.is_persisted = True
+            try:
+                await self._connection.execute(
+                    UPSERT_QUERY.format(tablename=self.tablename),
+                    self._row(record),
+                )
+                await self._connection.commit()
+            except Exception as persist_exc:
+                logger.error(f"Failed to write verification: {persist_exc}")
+                await self._connection.rollback()
+                # Left to the background writer, unless changed meanwhile
+                self._pending.setdefault(key, record)
+                self._writer_wakeup.set()
+
+    async def _create_table(self):
+        await self._connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.tablename} ("
+            "chat_id INTEGER NOT NULL, "
+            "user_id INTEGER NOT NULL, "
+            "message_id INTEGER, "
+            "joined_at FLOAT NOT NULL, "
+            "deadline FLOAT NOT NULL, "
+            f"state TEXT NOT NULL DEFAULT '{STATE_PENDING}', "
+            f"kind TEXT NOT NULL DEFAULT '{KIND_JOIN}', "
+            "PRIMARY KEY (chat_id, user_id))"
+        )
+
+    async def _migrate(self):
+        """Copy rows of a table created by previous versions to a new one."""
+        async with self._connection.execute(
+            f"PRAGMA table_info({self.tablename})",
+        ) as cursor:
+            # Column name -> whether it is NOT NULL
+            columns = {row[1]: row[3] async for row in cursor}
+        if not columns or (
+            columns.keys() >= MIGRATED_COLUMNS.keys()
+            and not columns["message_id"]
+        ):
+            return
+
+        previous = f"{self.tablename}_previous"
+        values = ", ".join(
+            column if column in columns else value
+            for column, value in MIGRATED_COLUMNS.items()
+        )
+        await self._connection.execute(
+            f"ALTER TABLE {self.tablename} RENAME TO {previous}"
+        )
+        await self._create_table()
+        await self._connection.execute(
+            f"INSERT INTO {self.tablename} "
+            f"(chat_id, user_id, message_id, deadline, "
+            f"{', '.join(MIGRATED_COLUMNS)}) "
+            f"SELECT chat_id, user_id, message_id, deadline, {values} "
+            f"FROM {previous}"
+        )
+        await self._connection.execute(f"DROP TABLE {previous}")
+        await self._connection.commit()
+        logger.info(f"Table {self.tablename} migrated")
+
+    async def _flush(self):
+        if self._connection is None or not (
+            self._pending or self._cancelled_chats
+        ):
+            return
+
+        pending, self._pending = self._pending, {}
+        cancelled_chats, self._cancelled_chats = self._cancelled_chats, set()
+
+        started = time.perf_counter()
+        upserts = []
+        deletes = []
+        for key, record in pending.items():
+            if record is None:
+                deletes.append(key)
+                continue
+            record.is_persisted = True
+            upserts.append(self._row(record))
+
+        try:
+            # Before upserts, users may have joined after the cancellation
+            if cancelled_chats:
+                await self._connection.executemany(
+                    f"DELETE FROM {self.tablename} WHERE chat_id = ?",
+                    [(chat_id,) for chat_id in cancelled_chats],
+                )
+            if deletes:
+                await self._connection.executemany(
+                    f"DELETE FROM {self.tablename} "
+                    "WHERE chat_id = ? AND user_id = ?",
+                    deletes,
+                )
+            if upserts:
+                await self._connection.executemany(
+                    UPSERT_QUERY.format(tablename=self.tablename),
+                    upserts,
+                )
+            await self._connection.commit()
+        except Exception as flush_exc:
+            logger.error(f"Failed to write verifications: {flush_exc}")
+            await self._connection.rollback()
+            # Keep newer changes made while writing
+            self._pending = pending | self._pending
+            self._cancelled_chats |= cancelled_chats
+            self._writer_wakeup.set()
+        finally:
+            FLUSH_LATENCY.observe(time.perf_counter() - started)
+
+    @staticmethod
+    def _row(record: PendingVerification) -> tuple:
+        return (
+            record.chat_id,
+            record.user_id,
+            record.message_id,
+            record.joined_at,
+            record.deadline,
+            record.state,
+            record.kind,
+        )
+
+    def _mark_cancelled(self, record: PendingVerification):
+        record.is_cancelled = True
+        if record.is_queued:
+            return
+        self._cancelled_count += 1
+        if (
+            self._cancelled_count > COMPACT_MIN_SIZE
+            and self._cancelled_count * 2 > len(self._heap)
+        ):
+            self._heap = [r for r in self._heap if not r.is_cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled_count = 0
+
+    def _unindex(self, record: PendingVerification):
+        del self._index[(record.chat_id, record.user_id)]
+        users = self._chats[record.chat_id]
+        del users[record.user_id]
+        if not users:
+            del self._chats[record.chat_id]
+
+    def _mark_dirty(
+        self,
+        key: tuple[int, int],
+        record: Optional[PendingVerification],
+    ):
+        self._pending[key] = record
+        self._writer_wakeup.set()
+
+    def _pop_expired(self, now: float) -> Optional[PendingVerification]:
+        heap = self._heap
+        while heap:
+            if heap[0].is_cancelled:
+                heapq.heappop(heap)
+                self._cancelled_count -= 1
+                continue
+            if heap[0].deadline > now:
+                return None
+            record = heapq.heappop(heap)
+            self._unindex(record)
+            return record
+        return None
+
+    async def _timer(self):
+        while True:
+            self._timer_wakeup.clear()
+            record = self._pop_expired(time.time())
+            if record is not None:
+                self._spawn(self._fire(record))
+                continue
+
+            timeout = (
+                self._heap[0].deadline - time.time() if self._heap else None
+            )
+            try:
+                await asyncio.wait_for(self._timer_wakeup.wait(), timeout)
+            except TimeoutError:
+                pass
+
+    async def _fire(self, record: PendingVerification):
+        key = (record.chat_id, record.user_id)
+        # Kicked again after a restart if the kick is interrupted
+        record.state = STATE_KICKING
+        if key not in self._index:
+            self._mark_dirty(key, record)
+        lag = time.time() - record.deadline
+        started = time.perf_counter()
+        with logger.contextualize(app="scheduler", chat_id=record.chat_id):
+            try:
+                await self.on_deadline(
+                    chat_id=record.chat_id,
+                    user_id=record.user_id,
+                    message_id=record.message_id,
+                    kind=record.kind,
+                )
+            except Exception:
+                logger.exception(f"Failed to process {record}")
+        if self.monitor is not None:
+            self.monitor.record_run(
+                self.stats, lag, time.perf_counter() - started,
+            )
+
+        # Row is overwritten if the user has joined again meanwhile
+        if key not in self._index:
+            if record.is_persisted:
+                self._mark_dirty(key, None)
+            else:
+                self._pending.pop(key, None)
+
+    async def _catch_up(self, records: list[PendingVerification]):
+        logger.warning(
+            f"Catching up {len(records)} overdue verifications, the oldest "
+            f"is {time.time() - records[0].deadline:.0f}s late"
+        )
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.catch_up_concurrency)
+        interval = 1 / self.catch_up_rate
+        next_at = time.perf_counter()
+        fired_count = 0
+        for record in records:
+            if record.is_cancelled:
+                continue
+            await semaphore.acquire()
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            next_at = max(next_at, time.perf_counter()) + interval
+            # Confirmed or left while waiting
+            if record.is_cancelled:
+                semaphore.release()
+                continue
+
+            self._unindex(record)
+            fired_count += 1
+            self._spawn(self._fire_limited(record, semaphore))
+
+        logger.info(
+            f"Caught up {fired_count} overdue verifications, "
+            f"{len(records) - fired_count} cancelled, "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+    async def _fire_limited(
+        self,
+        record: PendingVerification,
+        semaphore: asyncio.Semaphore,
+    ):
+        try:
+            await self._fire(record)
+        finally:
+            semaphore.release()
+
+    async def _writer(self):
+        while True:
+            await self._writer_wakeup.wait()
+            await asyncio.sleep(self.flush_interval)
+            self._writer_wakeup.clear()
+            await self.flush()
+
+    def _spawn(self, coro: Awaitable):
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -1,3 +1,9 @@
-__all__ = ("kick_user_job",)
+__all__ = (
+    "decline_join_request_job",
+    "kick_raid_batch_job",
+    "kick_user_job",
+)
 
+from .decline_join_request import decline_join_request_job
+from .kick_raid_batch import kick_raid_batch_job
 from .kick_user import kick_user_job
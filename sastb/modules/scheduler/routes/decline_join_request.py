@@ -0,0 +1,55 @@
+__all__ = ("decline_join_request_job",)
+
+from typing import Optional
+
+from loguru import logger
+
+from sastb.utils.log_sampling import LOG_EVENTS
+
+
+async def decline_join_request_job(
+    chat_id: int,
+    user_id: int,
+    message_id: Optional[int],
+    bot_id: Optional[int] = None,
+):
+    """
+    Decline join request of a user who did not pass the challenge.
+
+    Args:
+        chat_id (int): The ID of the chat.
+        user_id (int): The ID of the user who requested to join.
+        message_id (int | None): The ID of the challenge message in private
+            chat with the user, None if it was not sent.
+        bot_id (int | None): The ID of the bot, None for the main bot.
+
+    """
+    from sastb.modules.bot import BotApp
+
+    bot_app = BotApp()
+    bot = bot_app.get_context(bot_id).bot
+    settings = await bot_app.get_chat_settings(bot.id, chat_id)
+
+    logger.info(f"Declining join request of {user_id} to chat {chat_id}")
+    try:
+        await bot.decline_chat_join_request(chat_id=chat_id, user_id=user_id)
+        LOG_EVENTS.record(chat_id, "declines")
+        logger.info(f"Join request of {user_id} declined")
+    except Exception as decline_exc:
+        # E.g. the request was already handled by an administrator
+        LOG_EVENTS.record(chat_id, "failures")
+        logger.error(f"Failed to decline join request: {decline_exc}")
+        return
+
+    if message_id is None:
+        return
+    try:
+        await bot.edit_message_text(
+            chat_id=user_id,
+            message_id=message_id,
+            text=settings.text_templates.join_request_declined_text(),
+            reply_markup=None,
+        )
+        logger.info(f"Message edited: {message_id}")
+    except Exception as edit_message_exc:
+        logger.error(f"Failed to edit message: {edit_message_exc}")
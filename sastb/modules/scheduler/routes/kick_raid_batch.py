@@ -0,0 +1,86 @@
+__all__ = ("kick_raid_batch_job",)
+
+import asyncio
+from typing import Optional
+
+from loguru import logger
+
+from aiogram.utils.chat_member import NOT_MEMBERS
+
+from sastb.utils.log_sampling import LOG_EVENTS
+
+
+async def kick_raid_batch_job(
+    chat_id: int,
+    message_id: int,
+    user_ids: list[int],
+    bot_id: Optional[int] = None,
+):
+    """
+    Kick unconfirmed users of a raid batch from chat.
+
+    Args:
+        chat_id (int): The ID of the chat.
+        message_id (int): The ID of the shared message to be edited.
+        user_ids (list[int]): The IDs of the users to be kicked.
+        bot_id (int | None): The ID of the bot, None for the main bot.
+
+    """
+    from sastb.modules.bot import BotApp
+
+    bot_app = BotApp()
+    bot = bot_app.get_context(bot_id).bot
+    settings = await bot_app.get_chat_settings(bot.id, chat_id)
+
+    # Raiders who left on their own are not banned, states are taken from
+    # the member cache filled by their joins
+    chat_members = await asyncio.gather(
+        *(
+            bot_app.get_chat_member(bot, chat_id, user_id)
+            for user_id in user_ids
+        ),
+    )
+    left_count = len(user_ids)
+    user_ids = [
+        user_id
+        for user_id, chat_member in zip(user_ids, chat_members)
+        # Users whose state is unknown are still restricted raiders
+        if not isinstance(chat_member, NOT_MEMBERS)
+    ]
+    left_count -= len(user_ids)
+    if left_count:
+        LOG_EVENTS.record(chat_id, "left", left_count)
+        logger.info(f"{left_count} raid users already left chat {chat_id}")
+
+    logger.info(f"Kicking {len(user_ids)} raid users from chat {chat_id}")
+    # Bans are queued and paced by the outbound scheduler
+    results = await asyncio.gather(
+        *(
+            bot.ban_chat_member(chat_id=chat_id, user_id=user_id)
+            for user_id in user_ids
+        ),
+        return_exceptions=True,
+    )
+    kicked_count = 0
+    for user_id, result in zip(user_ids, results):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to kick user {user_id}: {result}")
+            continue
+        kicked_count += 1
+    LOG_EVENTS.record(chat_id, "kicks", kicked_count)
+    if kicked_count < len(user_ids):
+        LOG_EVENTS.record(chat_id, "failures", len(user_ids) - kicked_count)
+    logger.info(f"Kicked {kicked_count} raid users from chat {chat_id}")
+
+    try:
+        await bot.edit_message_text(
+            chat_id=chat_id,
+            message_id=message_id,
+            text=settings.text_templates.raid_kicked_users_text(
+                count=kicked_count,
+            ),
+            reply_markup=None,
+        )
+        logger.info(f"Message edited: {message_id}")
+    except Exception as edit_message_exc:
+        logger.error(f"Failed to edit message: {edit_message_exc}")
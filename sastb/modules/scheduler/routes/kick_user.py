@@ -1,14 +1,19 @@
 __all__ = ("kick_user_job",)
 
+from typing import Optional
+
 from loguru import logger
 
 from aiogram.utils.chat_member import NOT_MEMBERS
 
+from sastb.utils.log_sampling import LOG_EVENTS
+
 
 async def kick_user_job(
     chat_id: int,
     user_id: int,
-    message_id: int,
+    message_id: Optional[int],
+    bot_id: Optional[int] = None,
 ):
     """
     Kick user from chat.
@@ -16,57 +21,48 @@ async def kick_user_job(
     Args:
         chat_id (int): The ID of the chat.
         user_id (int): The ID of the user to be kicked.
-        message_id (int): The ID of the message to be edited.
+        message_id (int | None): The ID of the message to be edited, None
+            if the welcome message was not sent.
+        bot_id (int | None): The ID of the bot, None for the main bot.
 
     """
-    from sastb.config import ApplicationSettings
     from sastb.modules.bot import BotApp
 
-    bot = BotApp().bot
-    settings = ApplicationSettings()  # type: ignore
+    bot_app = BotApp()
+    bot_context = bot_app.get_context(bot_id)
+    bot = bot_context.bot
+    settings = await bot_app.get_chat_settings(bot.id, chat_id)
 
     logger.info(f"Kicking user {user_id} from chat {chat_id}")
-    chat_member = None
-    try:
-        chat_member = await bot.get_chat_member(
-            chat_id=chat_id,
-            user_id=user_id,
-        )
-    except Exception as get_chat_member_exc:
-        logger.warning(
-            f"Error getting chat member {user_id}: {get_chat_member_exc}"
-        )
+    chat_member = await bot_app.get_chat_member(bot, chat_id, user_id)
 
     if chat_member is None or isinstance(chat_member, NOT_MEMBERS):
         logger.info(f"User {user_id} already left the chat")
-        try:
-            await bot.delete_message(
-                chat_id=chat_id,
-                message_id=message_id,
-            )
-            logger.info(f"Message deleted: {message_id}")
-        except Exception as delete_message_exc:
-            logger.error(f"Failed to delete message: {delete_message_exc}")
+        bot_context.message_deleter.add(chat_id=chat_id, message_id=message_id)
         return
 
     try:
         await bot.ban_chat_member(chat_id=chat_id, user_id=user_id)
+        LOG_EVENTS.record(chat_id, "kicks")
         logger.info(f"User {user_id} kicked from chat {chat_id}")
     except Exception as kick_user_exc:
+        LOG_EVENTS.record(chat_id, "failures")
         logger.error(f"Failed to kick user {user_id}: {kick_user_exc}")
         await bot.send_message(
             chat_id=chat_id,
-            text=settings.text_templates.kick_user_error_text.format(
+            text=settings.text_templates.kick_user_error_text(
                 user=chat_member.user.mention_html(),
             ),
         )
         return
 
+    if message_id is None:
+        return
     try:
         await bot.edit_message_text(
             chat_id=chat_id,
             message_id=message_id,
-            text=settings.text_templates.kicked_user_text.format(
+            text=settings.text_templates.kicked_user_text(
                 user=chat_member.user.mention_html(),
             ),
             reply_markup=None,
@@ -1,8 +1,19 @@
 __all__ = ("click_app",)
 
 import asyncio
+import sys
 from functools import wraps
-from click import Group
+from typing import Optional
+
+from click import (
+    Choice,
+    FloatRange,
+    Group,
+    IntRange,
+    UsageError,
+    argument,
+    option,
+)
 
 import uvloop
 
@@ -35,19 +46,236 @@ def awaitable(f):
 
 
 @click_app.command(name="start", help="Start the bot")
+@option(
+    "--workers",
+    type=IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of processes handling updates, sharded by chat",
+)
 @awaitable
-async def start():
+async def start(workers: int):
     """
     Start the bot.
+
+    Args:
+        workers (int): Number of worker processes, updates are processed
+            in this process when 1.
+
     """
+    from sastb.config import ApplicationSettings
+
+    from .bot import start_bot
+    from .scheduler import start_scheduler, stop_scheduler
     from .setup_logging import setup_logging
 
-    setup_logging()
+    settings = ApplicationSettings().snapshot()  # type: ignore
+    setup_logging(settings.logging)
 
-    from .bot import start_bot
-    from .scheduler import start_scheduler
+    if workers > 1:
+        from .shards import start_shards
+
+        if settings.telegram.additional_tokens:
+            raise UsageError("--workers is supported with a single bot only")
+
+        await start_shards(settings, workers)
+        return
+
+    try:
+        await asyncio.gather(
+            start_bot(settings),
+            start_scheduler(settings),
+        )
+    finally:
+        await stop_scheduler()
+
+
+@click_app.command(name="poll", help="Start the bot with long polling")
+@awaitable
+async def poll():
+    """
+    Start the bot with long polling instead of webhook.
+    """
+    from sastb.config import ApplicationSettings
+
+    from .bot import start_bot_polling
+    from .scheduler import start_scheduler, stop_scheduler
+    from .setup_logging import setup_logging
+
+    settings = ApplicationSettings().snapshot()  # type: ignore
+    setup_logging(settings.logging)
+
+    try:
+        await asyncio.gather(
+            start_bot_polling(settings),
+            start_scheduler(settings),
+        )
+    finally:
+        await stop_scheduler()
+
+
+@click_app.command(
+    name="logs",
+    help="Print log records, including rotated and compressed files",
+)
+@argument("name", default="app")
+@option(
+    "--directory",
+    default="logs",
+    show_default=True,
+    help="Directory of log files",
+)
+@option(
+    "--level",
+    type=Choice(["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]),
+    help="Minimum level of records",
+)
+@option("--contains", help="Text the message contains")
+@option("--since", help="Earliest timestamp, e.g. 2025-01-31T12:00")
+def logs(
+    name: str,
+    directory: str,
+    level: Optional[str],
+    contains: Optional[str],
+    since: Optional[str],
+):
+    """
+    Stream log records as JSON lines to stdout.
+
+    Args:
+        name (str): The log file name without extension, e.g. ``app`` or
+            ``errors-shard-1``.
+        directory (str): The directory of log files.
+        level (str | None): The minimum level of records.
+        contains (str | None): Text the message contains.
+        since (str | None): The earliest timestamp.
+
+    """
+    from .log_reader import filter_log_lines, get_log_files, read_log_lines
+
+    files = get_log_files(f"{directory}/{name}.jsonl")
+    lines = filter_log_lines(
+        read_log_lines(files),
+        level=level,
+        contains=contains,
+        since=since,
+    )
+    try:
+        sys.stdout.buffer.writelines(lines)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # Output is piped to a command that stopped reading, e.g. head
+        sys.stderr.close()
+
+
+@click_app.command(
+    name="bench",
+    help="Load test the bot against a local fake Bot API server",
+)
+@option("--chats", type=IntRange(min=1), default=10, show_default=True)
+@option(
+    "--joiners",
+    type=IntRange(min=1),
+    default=100,
+    show_default=True,
+    help="Users joining each chat",
+)
+@option(
+    "--confirm-rate",
+    type=FloatRange(0, 1),
+    default=0.5,
+    show_default=True,
+    help="Share of users clicking the confirm button",
+)
+@option(
+    "--remove-user-after",
+    type=FloatRange(min=0, min_open=True),
+    default=5,
+    show_default=True,
+    help="Seconds after which unconfirmed users are kicked",
+)
+@option(
+    "--concurrency",
+    type=IntRange(min=1),
+    default=100,
+    show_default=True,
+    help="Webhook requests sent at once",
+)
+@option(
+    "--latency",
+    type=FloatRange(min=0),
+    default=0.05,
+    show_default=True,
+    help="Seconds each Bot API call takes",
+)
+@option(
+    "--jitter",
+    type=FloatRange(min=0),
+    default=0.0,
+    show_default=True,
+    help="Maximum random seconds added to the latency",
+)
+@option(
+    "--error-rate",
+    type=FloatRange(0, 1),
+    default=0.0,
+    show_default=True,
+    help="Share of Bot API calls failing with 400",
+)
+@option(
+    "--flood-rate",
+    type=FloatRange(0, 1),
+    default=0.0,
+    show_default=True,
+    help="Share of Bot API calls failing with 429",
+)
+@option(
+    "--rate-limits/--no-rate-limits",
+    default=True,
+    show_default=True,
+    help="Whether outbound Bot API calls are rate limited",
+)
+@option(
+    "--kick-timeout",
+    type=FloatRange(min=0),
+    default=60,
+    show_default=True,
+    help="Seconds to wait for processing and kicks after their deadline",
+)
+@option("--seed", type=int, help="Seed of confirmations and failures")
+@option("--output", help="File for the JSON report, stdout if not set")
+@option(
+    "--log-level",
+    default="WARNING",
+    show_default=True,
+    help="Level of log lines written to stderr",
+)
+@awaitable
+async def bench(output: Optional[str], log_level: str, **options):
+    """
+    Drive join and confirm webhooks through the bot and report
+    throughput, latency, kick punctuality, Bot API calls and peak RSS.
+
+    Args:
+        output (str | None): File for the JSON report.
+        log_level (str): Level of log lines written to stderr.
+        options: Options of ``run_bench``.
+
+    """
+    import orjson
+    from loguru import logger
+
+    from .bench import run_bench
+
+    logger.remove()
+    logger.add(sys.stderr, level=log_level)
 
-    await asyncio.gather(
-        start_bot(),
-        start_scheduler(),
+    report = orjson.dumps(
+        await run_bench(**options),
+        option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE,
     )
+    if output:
+        with open(output, "wb") as file:
+            file.write(report)
+    else:
+        sys.stdout.buffer.write(report)
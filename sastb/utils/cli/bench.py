@@ -0,0 +1,448 @@
+__all__ = ("run_bench",)
+
+import asyncio
+import random
+import resource
+import socket
+import tempfile
+import time
+from typing import Any, Optional
+
+import orjson
+from aiohttp import ClientSession, TCPConnector
+from loguru import logger
+
+from sastb.config.config import Settings
+from sastb.config.models.default_settings import (
+    DefaultSettings,
+    RaidModeSettings,
+)
+from sastb.config.models.scheduler import SchedulerConfig, SchedulerJobStores
+from sastb.config.models.telegram import TelegramConfig, TelegramRateLimits
+from sastb.modules.bot import BotApp
+from sastb.modules.bot.utils.verify_user_callback import VerifyUserCallback
+from sastb.utils.fake_bot_api import BOT_USER, ApiCall, FakeBotApi
+
+from .scheduler import start_scheduler, stop_scheduler
+
+BENCH_TOKEN = "123456:BENCH"
+HOST = "127.0.0.1"
+# IDs of synthetic chats and users start from these
+FIRST_CHAT_ID = -1001000000000
+FIRST_USER_ID = 100000000
+
+
+def get_percentiles(values: list[float]) -> dict[str, Optional[float]]:
+    """
+    Get p50, p99 and maximum in milliseconds.
+
+    Args:
+        values (list[float]): Values in seconds.
+
+    Returns:
+        dict[str, float | None]: The percentiles, None without values.
+
+    """
+    if not values:
+        return {"p50": None, "p99": None, "max": None}
+    values = sorted(values)
+    p99_index = min(len(values) - 1, int(len(values) * 0.99))
+    return {
+        "p50": round(values[len(values) // 2] * 1000, 2),
+        "p99": round(values[p99_index] * 1000, 2),
+        "max": round(values[-1] * 1000, 2),
+    }
+
+
+def get_free_port() -> int:
+    """Get a free TCP port of the loopback interface."""
+    with socket.socket() as probe:
+        probe.bind((HOST, 0))
+        return probe.getsockname()[1]
+
+
+def get_user(user_id: int) -> dict[str, Any]:
+    """Get a synthetic user."""
+    return {"id": user_id, "is_bot": False, "first_name": f"User {user_id}"}
+
+
+class LoadDriver:
+    """
+    Webhook updates of synthetic joiners and their outcomes.
+
+    A join is done when the welcome message is sent or sending it failed,
+    a confirmation when the callback query is answered and the welcome
+    message is edited, a kick when the user is banned. Outcomes are taken
+    from calls to the fake Bot API.
+    """
+
+    def __init__(
+        self,
+        webhook_url: str,
+        secret_token: str,
+        confirm_rate: float,
+        remove_user_after: float,
+        concurrency: int,
+        seed: Optional[int],
+    ):
+        self.webhook_url = webhook_url
+        self.secret_token = secret_token
+        self.confirm_rate = confirm_rate
+        self.remove_user_after = remove_user_after
+        self.concurrency = concurrency
+        self._random = random.Random(seed)
+
+        self.update_id = 0
+        self.webhook_errors = 0
+        self.sent_elapsed = 0.0
+        self.processed_elapsed = 0.0
+        self.join_sent: dict[tuple[int, int], float] = {}
+        self.confirm_sent: dict[tuple[int, int], float] = {}
+        # (chat_id, message_id) -> time of the click
+        self.confirm_edits: dict[tuple[int, int], float] = {}
+        self.welcomed: dict[tuple[int, int], float] = {}
+        self.join_failed: set[tuple[int, int]] = set()
+        self.expected_kicks: set[tuple[int, int]] = set()
+        self.join_latencies: list[float] = []
+        self.confirm_latencies: list[float] = []
+        self.confirm_edit_latencies: list[float] = []
+        self.kick_lateness: list[float] = []
+        self.kicked: set[tuple[int, int]] = set()
+
+        self._session: Optional[ClientSession] = None
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._tasks: set[asyncio.Task] = set()
+
+    def on_api_call(self, call: ApiCall):
+        """
+        Record outcomes of a Bot API call, fake API listener.
+
+        Args:
+            call (ApiCall): The call.
+
+        """
+        method = call.method.lower()
+        if call.error_code is not None:
+            if method == "sendmessage":
+                key = self._get_welcome_key(call)
+                if key is not None and key not in self.welcomed:
+                    self.join_failed.add(key)
+            elif method == "editmessagetext" and call.error_code != 429:
+                # Not retried, the edit is not waited for
+                self.confirm_edits.pop(self._get_message_key(call), None)
+            return
+
+        if method == "sendmessage":
+            self._on_welcome(call)
+        elif method == "answercallbackquery":
+            chat_id, user_id = map(
+                int, call.params["callback_query_id"].split(":"),
+            )
+            sent_at = self.confirm_sent.get((chat_id, user_id))
+            if sent_at is not None:
+                self.confirm_latencies.append(call.received_at - sent_at)
+        elif method == "editmessagetext":
+            sent_at = self.confirm_edits.pop(
+                self._get_message_key(call), None,
+            )
+            if sent_at is not None:
+                self.confirm_edit_latencies.append(
+                    call.received_at - sent_at,
+                )
+        elif method == "banchatmember":
+            key = (int(call.params["chat_id"]), int(call.params["user_id"]))
+            welcomed_at = self.welcomed.get(key)
+            if welcomed_at is not None and key not in self.kicked:
+                self.kicked.add(key)
+                self.kick_lateness.append(
+                    call.received_at - welcomed_at - self.remove_user_after,
+                )
+
+    async def run(self, chats: int, joiners: int, timeout: float):
+        """
+        Send join updates of all users, send confirmations of welcomed
+        users and wait for their processing.
+
+        Args:
+            chats (int): Number of chats.
+            joiners (int): Number of users joining each chat.
+            timeout (float): Time in seconds to wait for processing.
+
+        """
+        connector = TCPConnector(limit=self.concurrency)
+        async with ClientSession(connector=connector) as session:
+            self._session = session
+            started = time.perf_counter()
+            # Chats are interleaved, like joins of many chats arrive
+            await asyncio.gather(*(
+                self._join(
+                    FIRST_CHAT_ID - chat_index,
+                    FIRST_USER_ID + chat_index * joiners + user_index,
+                )
+                for user_index in range(joiners)
+                for chat_index in range(chats)
+            ))
+            self.sent_elapsed = time.perf_counter() - started
+
+            await self.wait(
+                lambda: (
+                    len(self.welcomed) + len(self.join_failed)
+                    >= len(self.join_sent)
+                ),
+                timeout=timeout,
+            )
+            self.processed_elapsed = time.perf_counter() - started
+            while self._tasks:
+                await asyncio.gather(*self._tasks)
+            await self.wait(
+                lambda: (
+                    len(self.confirm_latencies) >= len(self.confirm_sent)
+                    and not self.confirm_edits
+                ),
+                timeout=timeout,
+            )
+
+    async def wait(self, condition, timeout: float):
+        """Wait until the condition is true or the timeout is reached."""
+        deadline = time.perf_counter() + timeout
+        while not condition() and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+
+    def _get_message_key(self, call: ApiCall) -> tuple[int, int]:
+        return int(call.params["chat_id"]), int(call.params["message_id"])
+
+    def _get_welcome_key(self, call: ApiCall) -> Optional[tuple[int, int]]:
+        reply_markup = call.params.get("reply_markup")
+        if not reply_markup:
+            return None
+        callback_data = orjson.loads(reply_markup)["inline_keyboard"][0][0][
+            "callback_data"
+        ]
+        user_id = VerifyUserCallback.unpack(callback_data).user_id
+        return int(call.params["chat_id"]), user_id
+
+    def _on_welcome(self, call: ApiCall):
+        key = self._get_welcome_key(call)
+        sent_at = self.join_sent.get(key)
+        if sent_at is None or key in self.welcomed:
+            return
+
+        # Sent by a retry after flood control error
+        self.join_failed.discard(key)
+        self.welcomed[key] = call.received_at
+        self.join_latencies.append(call.received_at - sent_at)
+        if self._random.random() < self.confirm_rate:
+            task = asyncio.create_task(self._confirm(
+                key, call.result["message_id"],
+            ))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        else:
+            self.expected_kicks.add(key)
+
+    async def _join(self, chat_id: int, user_id: int):
+        self.join_sent[(chat_id, user_id)] = time.time()
+        await self._send({
+            "chat_member": {
+                "chat": {"id": chat_id, "type": "supergroup", "title": "Chat"},
+                "from": get_user(user_id),
+                "date": int(time.time()),
+                "old_chat_member": {
+                    "status": "left", "user": get_user(user_id),
+                },
+                "new_chat_member": {
+                    "status": "member", "user": get_user(user_id),
+                },
+            },
+        })
+
+    async def _confirm(self, key: tuple[int, int], message_id: int):
+        chat_id, user_id = key
+        self.confirm_sent[key] = time.time()
+        self.confirm_edits[(chat_id, message_id)] = self.confirm_sent[key]
+        await self._send({
+            "callback_query": {
+                "id": f"{chat_id}:{user_id}",
+                "from": get_user(user_id),
+                "chat_instance": str(chat_id),
+                "data": VerifyUserCallback(user_id=user_id).pack(),
+                "message": {
+                    "message_id": message_id,
+                    "date": int(time.time()),
+                    "chat": {
+                        "id": chat_id, "type": "supergroup", "title": "Chat",
+                    },
+                    "from": BOT_USER,
+                    "text": "Welcome",
+                },
+            },
+        })
+
+    async def _send(self, update: dict[str, Any]):
+        self.update_id += 1
+        update["update_id"] = self.update_id
+        async with self._semaphore:
+            try:
+                async with self._session.post(
+                    self.webhook_url,
+                    data=orjson.dumps(update),
+                    headers={
+                        "Content-Type": "application/json",
+                        "X-Telegram-Bot-Api-Secret-Token": self.secret_token,
+                    },
+                ) as response:
+                    await response.read()
+                    if response.status != 200:
+                        self.webhook_errors += 1
+            except Exception as send_exc:
+                logger.warning(f"Failed to send update: {send_exc}")
+                self.webhook_errors += 1
+
+
+async def wait_for_port(port: int, timeout: float = 30):
+    """Wait until the webhook server accepts connections."""
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(HOST, port)
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+            continue
+        writer.close()
+        await writer.wait_closed()
+        return
+
+
+async def run_bench(
+    chats: int,
+    joiners: int,
+    confirm_rate: float = 0.5,
+    remove_user_after: float = 5,
+    concurrency: int = 100,
+    latency: float = 0.05,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    flood_rate: float = 0.0,
+    rate_limits: bool = True,
+    kick_timeout: float = 60,
+    seed: Optional[int] = None,
+) -> dict[str, Any]:
+    """
+    Run the bot against a fake Bot API server and drive join and confirm
+    webhooks through it.
+
+    Args:
+        chats (int): Number of chats.
+        joiners (int): Number of users joining each chat.
+        confirm_rate (float): Share of users clicking the confirm button.
+        remove_user_after (float): Time in seconds to kick unconfirmed
+            users after.
+        concurrency (int): Number of webhook requests sent at once.
+        latency (float): Time in seconds each Bot API call takes.
+        jitter (float): Maximum random time added to the latency.
+        error_rate (float): Share of Bot API calls failing with 400.
+        flood_rate (float): Share of Bot API calls failing with 429.
+        rate_limits (bool): Whether outbound rate limits are enabled.
+        kick_timeout (float): Time in seconds to wait for joins to be
+            processed and for kicks after their deadline.
+        seed (int | None): Seed of confirmations and injected failures.
+
+    Returns:
+        dict[str, Any]: The report.
+
+    """
+    api = FakeBotApi(
+        latency=latency,
+        jitter=jitter,
+        error_rate=error_rate,
+        flood_rate=flood_rate,
+        seed=seed,
+    )
+    api_base_url = await api.start(host=HOST)
+    port = get_free_port()
+
+    with tempfile.TemporaryDirectory() as directory:
+        settings = Settings(
+            telegram=TelegramConfig(
+                token=BENCH_TOKEN,
+                host=HOST,
+                port=port,
+                webhook_base_url=f"http://{HOST}:{port}",
+                api_base_url=api_base_url,
+                rate_limits=TelegramRateLimits(enabled=rate_limits),
+            ),
+            scheduler=SchedulerConfig(
+                jobstores=SchedulerJobStores(
+                    file_name=f"{directory}/scheduler.db",
+                ),
+            ),
+            default_settings=DefaultSettings(
+                remove_user_after=remove_user_after / 60,
+                # Joins are verified one by one, not by shared messages
+                raid_mode=RaidModeSettings(enabled=False),
+            ),
+        ).snapshot()  # type: ignore
+
+        driver = LoadDriver(
+            webhook_url=settings.telegram.webhook_url,
+            secret_token=settings.telegram.webhook_secret_token,
+            confirm_rate=confirm_rate,
+            remove_user_after=remove_user_after,
+            concurrency=concurrency,
+            seed=seed,
+        )
+        api.listeners.append(driver.on_api_call)
+
+        await start_scheduler(settings)
+        bot_task = asyncio.create_task(BotApp(settings=settings).start())
+        try:
+            await wait_for_port(port)
+
+            await driver.run(chats, joiners, timeout=kick_timeout)
+            await driver.wait(
+                lambda: driver.expected_kicks <= driver.kicked,
+                timeout=remove_user_after + kick_timeout,
+            )
+        finally:
+            bot_task.cancel()
+            await asyncio.gather(bot_task, return_exceptions=True)
+            await stop_scheduler()
+            await api.close()
+
+    kicks = driver.expected_kicks & driver.kicked
+    return {
+        "chats": chats,
+        "joiners": joiners,
+        "updates_sent": driver.update_id,
+        "webhook_errors": driver.webhook_errors,
+        "webhook_joins_per_s": round(
+            len(driver.join_sent) / driver.sent_elapsed, 1,
+        ),
+        "joins_per_s": round(
+            len(driver.welcomed) / driver.processed_elapsed, 1,
+        ),
+        "joins_welcomed": len(driver.welcomed),
+        "joins_failed": len(driver.join_failed),
+        "join_latency_ms": get_percentiles(driver.join_latencies),
+        "confirms": len(driver.confirm_latencies),
+        "confirm_latency_ms": get_percentiles(driver.confirm_latencies),
+        "confirm_edit_latency_ms": get_percentiles(
+            driver.confirm_edit_latencies,
+        ),
+        "kicks_expected": len(driver.expected_kicks),
+        "kicks_done": len(kicks),
+        # Confirmations processed after the deadline
+        "kicks_of_confirmed": len(driver.kicked - driver.expected_kicks),
+        "kick_lateness_ms": get_percentiles(driver.kick_lateness),
+        "api_calls": dict(api.calls.most_common()),
+        "api_failures": {
+            f"{method}:{error_code}": count
+            for (method, error_code), count in api.failures.items()
+        },
+        # Includes the fake Bot API server and the driver
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1,
+        ),
+    }
@@ -1,25 +1,90 @@
-__all__ = ("start_bot",)
+__all__ = ("start_bot", "start_bot_polling", "start_bot_shard")
+
+from typing import TYPE_CHECKING, Any, Callable, Optional, Sequence
 
 from loguru import logger
 
-from sastb.config.config import ApplicationSettings
 from sastb.modules.bot import BotApp
 
+if TYPE_CHECKING:
+    from sastb.config import SettingsSnapshot
+
 
-async def start_bot():
+async def start_bot(
+    settings: "SettingsSnapshot",
+    shard_paths: Sequence[str] = (),
+    on_reload: Optional[Callable[[], Any]] = None,
+):
     """
     Start the bot.
-    """
-    settings = ApplicationSettings()  # type: ignore
 
+    Args:
+        settings (SettingsSnapshot): The application settings snapshot.
+        shard_paths (Sequence[str]): Unix socket paths of worker processes
+            to route updates to.
+        on_reload (Callable | None): Function called after settings are
+            reloaded.
+
+    """
     with logger.contextualize(
         module="bot",
     ):
         logger.info("Starting bot...")
 
         bot = BotApp(
-            config=settings.telegram,
+            settings=settings,
+            on_reload=on_reload,
+        )
+        logger.info("Bot initialized successfully.")
+
+        await bot.start(shard_paths=shard_paths)
+
+
+async def start_bot_polling(settings: "SettingsSnapshot"):
+    """
+    Start the bot with long polling.
+
+    Args:
+        settings (SettingsSnapshot): The application settings snapshot.
+
+    """
+    with logger.contextualize(
+        module="bot",
+    ):
+        logger.info("Starting bot with long polling...")
+
+        bot = BotApp(
+            settings=settings,
+        )
+        logger.info("Bot initialized successfully.")
+
+        await bot.start_polling()
+
+
+async def start_bot_shard(
+    settings: "SettingsSnapshot",
+    path: str,
+    settings_loader: Callable[[], "SettingsSnapshot"],
+):
+    """
+    Start the bot as a worker process.
+
+    Args:
+        settings (SettingsSnapshot): The application settings snapshot.
+        path (str): The Unix socket path to receive updates on.
+        settings_loader (Callable): Function reading the worker settings
+            on reload.
+
+    """
+    with logger.contextualize(
+        module="bot",
+    ):
+        logger.info("Starting bot worker...")
+
+        bot = BotApp(
+            settings=settings,
+            settings_loader=settings_loader,
         )
         logger.info("Bot initialized successfully.")
 
-        await bot.start()
+        await bot.start_shard(path)
@@ -0,0 +1,100 @@
+__all__ = ("get_log_files", "read_log_lines", "filter_log_lines")
+
+import gzip
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+import orjson
+
+from .log_sink import get_log_archives
+
+# Level numbers of loguru levels
+LEVEL_NUMBERS = {
+    "TRACE": 5,
+    "DEBUG": 10,
+    "INFO": 20,
+    "SUCCESS": 25,
+    "WARNING": 30,
+    "ERROR": 40,
+    "CRITICAL": 50,
+}
+
+
+def get_log_files(file_name: str) -> list[Path]:
+    """
+    Get a log file with its rotated files.
+
+    Args:
+        file_name (str): The log file name.
+
+    Returns:
+        list[Path]: Rotated files, the oldest first, and the log file.
+
+    """
+    files = get_log_archives(file_name)[::-1]
+    if Path(file_name).exists():
+        files.append(Path(file_name))
+    return files
+
+
+def read_log_lines(files: Iterable[Path]) -> Iterator[bytes]:
+    """
+    Stream JSON lines of log files, compressed files are decompressed on
+    the fly.
+
+    Args:
+        files (Iterable[Path]): The log files.
+
+    Yields:
+        bytes: The JSON lines.
+
+    """
+    for file in files:
+        opener = gzip.open if file.suffix == ".gz" else open
+        with opener(file, "rb") as lines:
+            yield from lines
+
+
+def filter_log_lines(
+    lines: Iterable[bytes],
+    level: Optional[str] = None,
+    contains: Optional[str] = None,
+    since: Optional[str] = None,
+) -> Iterator[bytes]:
+    """
+    Filter JSON lines of log records.
+
+    Args:
+        lines (Iterable[bytes]): The JSON lines.
+        level (str | None): The minimum level name.
+        contains (str | None): Text the message contains.
+        since (str | None): The earliest timestamp, ISO format prefix,
+            e.g. ``2025-01-31T12:00``.
+
+    Yields:
+        bytes: The JSON lines of matching records.
+
+    """
+    if level is None and contains is None and since is None:
+        yield from lines
+        return
+
+    level_no = LEVEL_NUMBERS[level.upper()] if level else None
+    for line in lines:
+        try:
+            record = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            continue
+        if (
+            level_no is not None
+            and LEVEL_NUMBERS.get(record.get("level"), 0) < level_no
+        ):
+            continue
+        if (
+            contains is not None
+            and contains not in record.get("message", "")
+        ):
+            continue
+        if since is not None and record.get("timestamp", "") < since:
+            continue
+        yield line
@@ -0,0 +1,357 @@
+__all__ = ("JsonRecordSerializer", "QueuedFileSink", "get_log_archives")
+
+import gzip
+import os
+import re
+import shutil
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Literal, Optional
+
+import orjson
+
+# Level number of ERROR, records at or above it are never dropped
+ERROR_LEVEL_NO = 40
+# Timestamp suffix of rotated files with compression
+ARCHIVE_TIME_FORMAT = "%Y%m%d-%H%M%S-%f"
+# Suffixes of rotated files, numbered or compressed
+ARCHIVE_SUFFIX = re.compile(r"\.(\d+|\d{8}-\d{6}-\d{6}\.gz)")
+# Suffix of rotated files waiting for compression
+UNCOMPRESSED_SUFFIX = re.compile(r"\.\d{8}-\d{6}-\d{6}")
+
+
+def get_log_archives(file_name: str) -> list[Path]:
+    """
+    Get rotated files of a log file, plain numbered and compressed.
+
+    Args:
+        file_name (str): The log file name.
+
+    Returns:
+        list[Path]: Rotated files, the newest first.
+
+    """
+    path = Path(file_name)
+    if not path.parent.is_dir():
+        return []
+
+    archives = []
+    for archive in path.parent.iterdir():
+        name = archive.name
+        if (
+            name.startswith(path.name)
+            and ARCHIVE_SUFFIX.fullmatch(name, len(path.name))
+        ):
+            archives.append((archive.stat().st_mtime, archive))
+    return [archive for _, archive in sorted(archives, reverse=True)]
+
+
+class JsonRecordSerializer:
+    """
+    Serialize loguru records straight to JSON lines.
+
+    Builds the JSON line from the loguru record directly, without
+    creating stdlib ``LogRecord`` objects. The timestamp prefix is cached per
+    second, so an instance must be used from one thread only.
+    """
+
+    def __init__(self):
+        self._second: Optional[int] = None
+        self._prefix = ""
+
+    def __call__(self, record: dict[str, Any]) -> bytes:
+        """
+        Serialize a record.
+
+        Args:
+            record (dict): The loguru record.
+
+        Returns:
+            bytes: The JSON line, ending with a newline.
+
+        """
+        exception = record["exception"]
+        return orjson.dumps(
+            {
+                "timestamp": self._format_time(record["time"].timestamp()),
+                "level": record["level"].name,
+                "logger": record["name"],
+                "message": record["message"],
+                "extra": record["extra"],
+                "exception": (
+                    "".join(traceback.format_exception(
+                        exception.type, exception.value, exception.traceback,
+                    ))
+                    if exception
+                    else None
+                ),
+                "@version_log": 1,
+            },
+            default=str,
+            option=orjson.OPT_APPEND_NEWLINE,
+        )
+
+    def _format_time(self, timestamp: float) -> str:
+        second = int(timestamp)
+        if second != self._second:
+            self._second = second
+            self._prefix = time.strftime(
+                "%Y-%m-%dT%H:%M:%S", time.localtime(second),
+            )
+        return f"{self._prefix}.{int((timestamp - second) * 1000):03d}Z"
+
+
+class QueuedFileSink:
+    """
+    Loguru sink writing JSON lines to a rotating file from a thread.
+
+    Logging calls only append the record to a bounded in-memory queue.
+    A writer thread serializes queued records, writes them with one
+    ``write`` call per batch and rotates the file, so file I/O never runs
+    on the event loop thread.
+
+    When the queue is full, records below ERROR are dropped with the
+    ``drop`` policy and the number of dropped records is logged later;
+    with the ``block`` policy and for errors the caller waits for space.
+
+    With ``gzip`` compression a rotated file is renamed with a timestamp
+    suffix and compressed by another thread, so the writer does not wait
+    for it; otherwise files are numbered like ``RotatingFileHandler``
+    does. Rotated files above ``backup_count``, ``retention_bytes`` in
+    total or older than ``retention_days`` are removed.
+    """
+
+    def __init__(
+        self,
+        file_name: str,
+        max_bytes: int = 100_000_000,
+        backup_count: int = 50,
+        queue_size: int = 10_000,
+        batch_size: int = 1000,
+        flush_interval: float = 0.1,
+        overflow: Literal["drop", "block"] = "drop",
+        compression: Literal["gzip", "none"] = "gzip",
+        compression_level: int = 6,
+        retention_bytes: Optional[int] = None,
+        retention_days: Optional[float] = None,
+    ):
+        """
+        Initialize the sink and start the writer thread.
+
+        Args:
+            file_name (str): The log file name.
+            max_bytes (int): File size after which the file is rotated.
+            backup_count (int): Number of rotated files to keep.
+            queue_size (int): Number of records the queue holds.
+            batch_size (int): Maximum number of records in one write.
+            flush_interval (float): Time in seconds the writer waits for
+                new records when the queue is empty.
+            overflow (str): What to do when the queue is full,
+                ``drop`` or ``block``.
+            compression (str): Compression of rotated files, ``gzip`` or
+                ``none``.
+            compression_level (int): Gzip compression level.
+            retention_bytes (int | None): Total size of rotated files.
+            retention_days (float | None): Age of the oldest rotated file.
+
+        """
+        self.file_name = file_name
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.compression = compression
+        self.compression_level = compression_level
+        self.retention_bytes = retention_bytes
+        self.retention_days = retention_days
+
+        self.dropped = 0
+        self._reported_dropped = 0
+        # Warnings of the archiver, it must not log through loguru while
+        # the sink may be stopping
+        self._warnings: deque[str] = deque()
+        self._records: deque[dict[str, Any]] = deque()
+        self._serialize = JsonRecordSerializer()
+        self._stopping = threading.Event()
+
+        Path(file_name).parent.mkdir(exist_ok=True, parents=True)
+        self._file = open(file_name, "ab")
+        self._size = self._file.tell()
+
+        self._archiver = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix=f"log-archiver-{Path(file_name).name}",
+        )
+        # Compress files left by a stopped process and apply retention
+        for archive in self._get_uncompressed_archives():
+            self._archiver.submit(self._compress, archive)
+        self._archiver.submit(self._apply_retention)
+
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"log-writer-{Path(file_name).name}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def write(self, message):
+        """
+        Queue a record, called by loguru.
+
+        Args:
+            message: The loguru message.
+
+        """
+        record = message.record
+        if len(self._records) >= self.queue_size:
+            if (
+                self.overflow == "drop"
+                and record["level"].no < ERROR_LEVEL_NO
+            ):
+                self.dropped += 1
+                return
+            while (
+                len(self._records) >= self.queue_size
+                and self._thread.is_alive()
+            ):
+                time.sleep(self.flush_interval / 10)
+        self._records.append(record)
+
+    def stop(self):
+        """Write queued records and stop the writer and archiver threads."""
+        self._stopping.set()
+        self._thread.join()
+        self._file.close()
+        self._archiver.shutdown(wait=True)
+
+    def _run(self):
+        while True:
+            if not self._records:
+                if self._stopping.is_set():
+                    return
+                self._stopping.wait(self.flush_interval)
+                continue
+
+            lines = []
+            records = self._records
+            for _ in range(min(self.batch_size, len(records))):
+                lines.append(self._serialize(records.popleft()))
+            if self.dropped != self._reported_dropped:
+                dropped = self.dropped - self._reported_dropped
+                self._reported_dropped = self.dropped
+                lines.append(self._warning_line(
+                    f"{dropped} log records dropped, queue is full",
+                ))
+            while self._warnings:
+                lines.append(self._warning_line(self._warnings.popleft()))
+            self._write(b"".join(lines))
+
+    def _warning_line(self, message: str) -> bytes:
+        return orjson.dumps(
+            {
+                "timestamp": self._serialize._format_time(time.time()),
+                "level": "WARNING",
+                "logger": __name__,
+                "message": message,
+                "extra": {},
+                "exception": None,
+                "@version_log": 1,
+            },
+            option=orjson.OPT_APPEND_NEWLINE,
+        )
+
+    def _write(self, data: bytes):
+        if self._size and self._size + len(data) > self.max_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data)
+
+    def _rotate(self):
+        self._file.close()
+        if self.backup_count <= 0:
+            os.remove(self.file_name)
+        elif self.compression == "gzip":
+            archive = (
+                f"{self.file_name}."
+                f"{datetime.now().strftime(ARCHIVE_TIME_FORMAT)}"
+            )
+            os.replace(self.file_name, archive)
+            self._archiver.submit(self._compress, archive)
+        else:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f"{self.file_name}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.file_name}.{index + 1}")
+            os.replace(self.file_name, f"{self.file_name}.1")
+            self._archiver.submit(self._apply_retention)
+        self._file = open(self.file_name, "ab")
+        self._size = 0
+
+    def _get_uncompressed_archives(self) -> list[str]:
+        path = Path(self.file_name)
+        archives = []
+        for archive in path.parent.iterdir():
+            name = archive.name
+            if not name.startswith(path.name):
+                continue
+            if name.endswith(".gz.tmp"):
+                archive.unlink(missing_ok=True)
+            elif UNCOMPRESSED_SUFFIX.fullmatch(name, len(path.name)):
+                archives.append(str(archive))
+        return sorted(archives)
+
+    def _compress(self, archive: str):
+        try:
+            temporary = f"{archive}.gz.tmp"
+            with (
+                open(archive, "rb") as source,
+                gzip.open(
+                    temporary, "wb", compresslevel=self.compression_level,
+                ) as target,
+            ):
+                shutil.copyfileobj(source, target, 1024 * 1024)
+            # Keep the rotation time for age retention and ordering
+            stat = os.stat(archive)
+            os.utime(temporary, (stat.st_atime, stat.st_mtime))
+            os.replace(temporary, f"{archive}.gz")
+            os.remove(archive)
+        except Exception as compress_exc:
+            self._warnings.append(
+                f"Failed to compress log file {archive}: {compress_exc}",
+            )
+            return
+        self._apply_retention()
+
+    def _apply_retention(self):
+        now = time.time()
+        total_size = 0
+        try:
+            for index, archive in enumerate(get_log_archives(self.file_name)):
+                stat = archive.stat()
+                total_size += stat.st_size
+                if (
+                    index >= self.backup_count
+                    or (
+                        self.retention_bytes is not None
+                        and total_size > self.retention_bytes
+                    )
+                    or (
+                        self.retention_days is not None
+                        and now - stat.st_mtime
+                        > self.retention_days * 86400
+                    )
+                ):
+                    archive.unlink(missing_ok=True)
+        except Exception as retention_exc:
+            self._warnings.append(
+                f"Failed to remove old log files of {self.file_name}: "
+                f"{retention_exc}",
+            )
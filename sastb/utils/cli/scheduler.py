@@ -1,17 +1,24 @@
-__all__ = ("start_scheduler",)
+__all__ = ("start_scheduler", "stop_scheduler")
 
+from typing import TYPE_CHECKING
+
+from aiogram.utils.token import extract_bot_id
 from loguru import logger
 
-from sastb.config.config import ApplicationSettings
 from sastb.modules.scheduler import SchedulerApp
 
+if TYPE_CHECKING:
+    from sastb.config import SettingsSnapshot
+
 
-async def start_scheduler():
+async def start_scheduler(settings: "SettingsSnapshot"):
     """
     Start the scheduler.
-    """
-    settings = ApplicationSettings()  # type: ignore
 
+    Args:
+        settings (SettingsSnapshot): The application settings snapshot.
+
+    """
     with logger.contextualize(
         module="scheduler",
     ):
@@ -19,7 +26,25 @@ async def start_scheduler():
 
         scheduler = SchedulerApp(
             config=settings.scheduler,
+            bot_ids=[
+                extract_bot_id(token) for token in settings.telegram.tokens
+            ],
         )
         logger.info("Scheduler initialized successfully.")
 
-        scheduler.start()
+        await scheduler.start()
+
+
+async def stop_scheduler():
+    """
+    Stop the scheduler.
+    """
+    # Startup may fail before the scheduler is initialized, its error is
+    # raised instead
+    if not SchedulerApp.has_instance():
+        return
+
+    with logger.contextualize(
+        module="scheduler",
+    ):
+        await SchedulerApp().stop()
@@ -1,20 +1,21 @@
 __all__ = ("setup_logging",)
 
+import atexit
 import sys
 from logging import (
-    Formatter,
     Handler,
     LogRecord,
     basicConfig,
 )
-from logging import (
-    handlers as logging_handlers,
-)
-from pathlib import Path
+from typing import Optional
 
-import orjson as json
 from loguru import logger
 
+from sastb.config.models.logging import LoggingConfig
+from sastb.utils.log_sampling import LOG_EVENTS, LogSampler, LogSummaryWriter
+
+from .log_sink import QueuedFileSink
+
 
 class InterceptHandler(Handler):
     """InterceptHandler for loguru logging."""
@@ -38,44 +39,28 @@ class InterceptHandler(Handler):
         )
 
 
-class JsonFormatter(Formatter):
-    """Custom JSON formatter for logging."""
-    fmt_dict = {
-        "timestamp": "asctime",
-        "level": "levelname",
-        "logger": "name",
-        "message": "msg",
-    }
-
-    def __init__(
-        self,
-        time_format: str = "%Y-%m-%dT%H:%M:%S",
-        msec_format: str = "%s.%03dZ",
-    ):
-        self.default_time_format = time_format
-        self.default_msec_format = msec_format
-
-    def formatMessage(self, record) -> dict:
-        if "asctime" in self.fmt_dict.values():
-            record.asctime = self.formatTime(record, self.default_time_format)
-
-        return {
-            fmt_key: record.__dict__[fmt_val]
-            for fmt_key, fmt_val in self.fmt_dict.items()
-        }
-
-    def format(self, record) -> str:
-        """Format the LogRecord into a JSON string."""
-        return json.dumps({
-            **self.formatMessage(record),
-            "extra": record.__dict__.get("extra", {}),
-            "exception": str(record.exc_info),
-            "@version_log": 1,
-        }, default=str).decode()
-
-
-def setup_logging():
-    """Setup logging configuration for the application."""
+def setup_logging(
+    config: Optional[LoggingConfig] = None,
+    process_name: Optional[str] = None,
+):
+    """
+    Setup logging configuration for the application.
+
+    Log files are written by background threads, see ``QueuedFileSink``.
+    INFO records of frequent events are sampled and repeated warnings and
+    errors are deduplicated, see ``LogSampler``; per-chat event counts are
+    logged every ``summary_interval`` seconds.
+
+    Args:
+        config (LoggingConfig | None): The log files settings, defaults
+            are used if not set.
+        process_name (str | None): Name of a worker process, added to log
+            file names so processes do not rotate each other's files.
+
+    """
+    config = config or LoggingConfig()
+    suffix = f"-{process_name}" if process_name else ""
+
     basicConfig(handlers=[InterceptHandler()], level="INFO")
 
     loguru_format = (
@@ -85,35 +70,46 @@ def setup_logging():
         "<level>{message}</level> | "
         "<level>({extra})</level>"
     )
-    logger.remove()
-    logger.configure(handlers=[{"sink": sys.stdout, "format": loguru_format}])
-
-    logs_file = "logs/app.jsonl"
-    Path(logs_file).parent.mkdir(exist_ok=True, parents=True)
-
-    file_handler = logging_handlers.RotatingFileHandler(
-        logs_file,
-        maxBytes=100_000_000,
-        backupCount=50,  # NOTE: 50 files * 100 MB = 5 GB
+    sampler = LogSampler(
+        config.sample_rates,
+        dedup_level_no=logger.level(config.dedup_level).no,
     )
-    file_handler.setFormatter(JsonFormatter())
-    logger.add(
-        file_handler,
-        format="{message}",
-        level="INFO",
+    logger.remove()
+    logger.configure(
+        handlers=[{
+            "sink": sys.stdout,
+            "format": loguru_format,
+            "filter": sampler.filter,
+        }],
+        patcher=sampler.patch,
     )
 
-    errors_file = "logs/errors.jsonl"
-    Path(errors_file).parent.mkdir(exist_ok=True, parents=True)
+    # NOTE: rotated files are compressed and kept up to 1 GB and 30 days
+    # for each file by default
+    for name, level in (("app", "INFO"), ("errors", "ERROR")):
+        logger.add(
+            QueuedFileSink(
+                f"{config.directory}/{name}{suffix}.jsonl",
+                max_bytes=config.max_bytes,
+                backup_count=config.backup_count,
+                queue_size=config.queue_size,
+                batch_size=config.batch_size,
+                flush_interval=config.flush_interval,
+                overflow=config.overflow,
+                compression=config.compression,
+                compression_level=config.compression_level,
+                retention_bytes=config.retention_bytes,
+                retention_days=config.retention_days,
+            ),
+            format="{message}",
+            level=level,
+            filter=sampler.filter,
+        )
 
-    error_file_handler = logging_handlers.RotatingFileHandler(
-        errors_file,
-        maxBytes=100_000_000,
-        backupCount=50,  # NOTE: 50 files * 100 MB = 5 GB
-    )
-    error_file_handler.setFormatter(JsonFormatter())
-    logger.add(
-        error_file_handler,
-        format="{message}",
-        level="ERROR",
+    summary_writer = LogSummaryWriter(
+        sampler, LOG_EVENTS, config.summary_interval,
     )
+    summary_writer.start()
+    # Runs before loguru removes the sinks at exit, so the last summary
+    # is written
+    atexit.register(summary_writer.stop)
@@ -0,0 +1,187 @@
+__all__ = ("get_shard_settings", "run_shard", "start_shards")
+
+import asyncio
+import dataclasses
+import multiprocessing
+import os
+import shutil
+import signal
+import tempfile
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import uvloop
+from loguru import logger
+
+if TYPE_CHECKING:
+    from multiprocessing.context import SpawnProcess
+
+    from sastb.config import SettingsSnapshot
+
+
+# Time in seconds to wait for workers to process queued updates on stop
+WORKER_STOP_TIMEOUT = 15
+
+
+def get_shard_settings(
+    settings: "SettingsSnapshot",
+    shard: int,
+    shards: int,
+) -> "SettingsSnapshot":
+    """
+    Get the settings of a worker process.
+
+    Each worker keeps its scheduled jobs and pending verifications in its
+    own database and gets an equal part of the global rate limit.
+
+    Args:
+        settings (SettingsSnapshot): The application settings snapshot.
+        shard (int): The worker index.
+        shards (int): The number of workers.
+
+    Returns:
+        SettingsSnapshot: The worker settings snapshot.
+
+    """
+    jobstores = settings.scheduler.jobstores
+    file_name = Path(jobstores.file_name)
+    rate_limits = settings.telegram.rate_limits
+
+    return dataclasses.replace(
+        settings,
+        scheduler=settings.scheduler.model_copy(update={
+            "jobstores": jobstores.model_copy(update={
+                "file_name": str(file_name.with_name(
+                    f"{file_name.stem}-{shard}{file_name.suffix}"
+                )),
+            }),
+        }),
+        telegram=settings.telegram.model_copy(update={
+            "rate_limits": rate_limits.model_copy(update={
+                "global_rate": rate_limits.global_rate / shards,
+            }),
+        }),
+    )
+
+
+def run_shard(shard: int, shards: int, path: str):
+    """
+    Run a worker process.
+
+    Args:
+        shard (int): The worker index.
+        shards (int): The number of workers.
+        path (str): The Unix socket path to receive updates on.
+
+    """
+    from sastb.config import ApplicationSettings
+
+    from .bot import start_bot_shard
+    from .scheduler import start_scheduler, stop_scheduler
+    from .setup_logging import setup_logging
+
+    def load_settings() -> "SettingsSnapshot":
+        return get_shard_settings(
+            ApplicationSettings().snapshot(),  # type: ignore
+            shard=shard,
+            shards=shards,
+        )
+
+    settings = load_settings()
+    setup_logging(settings.logging, process_name=f"worker-{shard}")
+
+    async def main():
+        # Stop gracefully on terminate, so stores are flushed
+        asyncio.get_running_loop().add_signal_handler(
+            signal.SIGTERM, asyncio.current_task().cancel,
+        )
+        with logger.contextualize(shard=shard):
+            try:
+                await asyncio.gather(
+                    start_bot_shard(settings, path, load_settings),
+                    start_scheduler(settings),
+                )
+            finally:
+                await stop_scheduler()
+
+    try:
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            runner.run(main())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+
+async def start_shards(settings: "SettingsSnapshot", workers: int):
+    """
+    Start the bot with updates processed by worker processes.
+
+    This process receives webhooks and routes updates to workers by the
+    chat ID, each worker runs its own dispatcher and scheduler.
+
+    Args:
+        settings (SettingsSnapshot): The application settings snapshot.
+        workers (int): The number of worker processes.
+
+    """
+    from .bot import start_bot
+
+    sockets_dir = tempfile.mkdtemp(prefix="sastb-")
+    paths = [f"{sockets_dir}/worker-{shard}.sock" for shard in range(workers)]
+
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(
+            target=run_shard,
+            args=(shard, workers, path),
+            name=f"sastb-worker-{shard}",
+        )
+        for shard, path in enumerate(paths)
+    ]
+    # Inherited by workers, so reloads are ignored until their bot starts
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    for process in processes:
+        process.start()
+    logger.info(f"Started {workers} worker processes")
+
+    try:
+        async with asyncio.TaskGroup() as task_group:
+            task_group.create_task(start_bot(
+                settings,
+                shard_paths=paths,
+                # Workers process updates, so they reload settings too
+                on_reload=partial(_signal_workers, processes, signal.SIGHUP),
+            ))
+            task_group.create_task(_watch_workers(processes))
+    finally:
+        await _stop_workers(processes)
+        shutil.rmtree(sockets_dir, ignore_errors=True)
+
+
+async def _watch_workers(processes: list["SpawnProcess"]):
+    while True:
+        await asyncio.sleep(1)
+        for process in processes:
+            if not process.is_alive():
+                raise RuntimeError(
+                    f"Worker process {process.name} exited "
+                    f"with code {process.exitcode}"
+                )
+
+
+def _signal_workers(processes: list["SpawnProcess"], signum: int):
+    for process in processes:
+        if process.is_alive():
+            os.kill(process.pid, signum)
+
+
+async def _stop_workers(processes: list["SpawnProcess"]):
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+
+    for process in processes:
+        await asyncio.to_thread(process.join, WORKER_STOP_TIMEOUT)
+        if process.is_alive():
+            logger.warning(f"Killing worker process {process.name}")
+            process.kill()
@@ -0,0 +1,257 @@
+__all__ = ("FakeBotApi", "ApiCall")
+
+import asyncio
+import random
+import time
+from collections import Counter
+from typing import Any, Callable, Optional
+
+import orjson
+from aiohttp import web
+from loguru import logger
+
+# Identity of the fake bot returned by getMe and used as message sender
+BOT_USER = {
+    "id": 1000000,
+    "is_bot": True,
+    "first_name": "Fake bot",
+    "username": "fake_bot",
+}
+# Methods answering with True
+TRUE_METHODS = frozenset({
+    "answercallbackquery",
+    "approvechatjoinrequest",
+    "declinechatjoinrequest",
+    "deletemessage",
+    "deletemessages",
+    "deletewebhook",
+    "leavechat",
+    "restrictchatmember",
+    "setmydefaultadministratorrights",
+    "setmydescription",
+    "setmyshortdescription",
+    "setwebhook",
+})
+
+
+class ApiCall:
+    """A Bot API call received by the fake server."""
+
+    __slots__ = ("method", "params", "received_at", "result", "error_code")
+
+    def __init__(
+        self,
+        method: str,
+        params: dict[str, Any],
+        received_at: float,
+        result: Any = None,
+        error_code: Optional[int] = None,
+    ):
+        self.method = method
+        self.params = params
+        self.received_at = received_at
+        self.result = result
+        # Set for failed calls
+        self.error_code = error_code
+
+
+class FakeBotApi:
+    """
+    Local stand-in for the Telegram Bot API server.
+
+    Implements the methods the bot uses with plausible results and keeps
+    chat members and messages in memory. Every call waits ``latency``
+    seconds (plus up to ``jitter``), a ``error_rate`` share of calls fails
+    with 400 Bad Request and a ``flood_rate`` share with 429 Too Many
+    Requests. Listeners get every call, e.g. to measure end-to-end
+    latency.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        flood_rate: float = 0.0,
+        retry_after: int = 1,
+        seed: Optional[int] = None,
+    ):
+        """
+        Initialize the fake server.
+
+        Args:
+            latency (float): Time in seconds each call takes.
+            jitter (float): Maximum random time in seconds added to it.
+            error_rate (float): Share of calls failing with 400.
+            flood_rate (float): Share of calls failing with 429.
+            retry_after (int): Seconds to retry after in 429 responses.
+            seed (int | None): Seed of injected delays and failures.
+
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.flood_rate = flood_rate
+        self.retry_after = retry_after
+
+        self.calls: Counter = Counter()
+        self.failures: Counter = Counter()
+        self.listeners: list[Callable[[ApiCall], None]] = []
+        # Status of kicked members by chat and user ID
+        self.members: dict[tuple[int, int], str] = {}
+        self._message_ids: Counter = Counter()
+        self._random = random.Random(seed)
+        self._runner: Optional[web.AppRunner] = None
+
+        self.app = web.Application()
+        self.app.router.add_post("/bot{token}/{method}", self.handle)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Start serving.
+
+        Args:
+            host (str): The host to listen on.
+            port (int): The port to listen on, any free port if 0.
+
+        Returns:
+            str: The base URL to pass as ``api_base_url``.
+
+        """
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host=host, port=port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        logger.info(f"Fake Bot API server listening on {host}:{port}")
+        return f"http://{host}:{port}"
+
+    async def close(self):
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """
+        Handle a Bot API call.
+
+        Args:
+            request (web.Request): The request.
+
+        Returns:
+            web.Response: The Bot API response.
+
+        """
+        method = request.match_info["method"]
+        params = dict(await request.post())
+
+        delay = self.latency + self._random.uniform(0, self.jitter)
+        if method.lower() == "getupdates":
+            # No updates are ever sent, wait like long polling does
+            delay += float(params.get("timeout", 0))
+        if delay:
+            await asyncio.sleep(delay)
+
+        self.calls[method] += 1
+        roll = self._random.random()
+        if roll < self.flood_rate:
+            response = self._failure(
+                method,
+                429,
+                f"Too Many Requests: retry after {self.retry_after}",
+                parameters={"retry_after": self.retry_after},
+            )
+        elif roll < self.flood_rate + self.error_rate:
+            response = self._failure(
+                method, 400, "Bad Request: injected error",
+            )
+        else:
+            handler = getattr(self, f"_{method.lower()}", None)
+            if handler is not None:
+                response = {"ok": True, "result": handler(params)}
+            elif method.lower() in TRUE_METHODS:
+                response = {"ok": True, "result": True}
+            else:
+                response = self._failure(
+                    method, 404, "Not Found: method not found",
+                )
+
+        call = ApiCall(
+            method,
+            params,
+            time.time(),
+            result=response.get("result"),
+            error_code=response.get("error_code"),
+        )
+        for listener in self.listeners:
+            listener(call)
+        return web.Response(
+            body=orjson.dumps(response),
+            status=response.get("error_code", 200),
+            content_type="application/json",
+        )
+
+    def _failure(
+        self,
+        method: str,
+        error_code: int,
+        description: str,
+        parameters: Optional[dict] = None,
+    ) -> dict[str, Any]:
+        self.failures[(method, error_code)] += 1
+        response = {
+            "ok": False,
+            "error_code": error_code,
+            "description": description,
+        }
+        if parameters:
+            response["parameters"] = parameters
+        return response
+
+    def _message(self, chat_id: int, text: str) -> dict[str, Any]:
+        self._message_ids[chat_id] += 1
+        return {
+            "message_id": self._message_ids[chat_id],
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "supergroup", "title": "Chat"},
+            "from": BOT_USER,
+            "text": text,
+        }
+
+    def _getme(self, params: dict) -> dict:
+        return BOT_USER
+
+
+    def _getupdates(self, params: dict) -> list:
+        return []
+
+    def _sendmessage(self, params: dict) -> dict:
+        return self._message(int(params["chat_id"]), params.get("text", ""))
+
+    def _editmessagetext(self, params: dict) -> dict:
+        message = self._message(
+            int(params["chat_id"]), params.get("text", ""),
+        )
+        message["message_id"] = int(params["message_id"])
+        return message
+
+    def _banchatmember(self, params: dict) -> bool:
+        self.members[
+            (int(params["chat_id"]), int(params["user_id"]))
+        ] = "kicked"
+        return True
+
+    def _getchatmember(self, params: dict) -> dict:
+        # Restrictions are not tracked, restricted users are members
+        user_id = int(params["user_id"])
+        status = self.members.get(
+            (int(params["chat_id"]), user_id), "member",
+        )
+        member = {
+            "status": status,
+            "user": {"id": user_id, "is_bot": False, "first_name": "User"},
+        }
+        if status == "kicked":
+            member["until_date"] = 0
+        return member
@@ -0,0 +1,268 @@
+__all__ = ("LOG_EVENTS", "EventCounter", "LogSampler", "LogSummaryWriter")
+
+import sys
+import threading
+from collections import Counter
+from functools import partial
+from typing import Any, Mapping, Optional
+
+from loguru import logger
+
+
+class EventCounter:
+    """
+    Per-chat counters of handler events, logged as periodic summaries
+    instead of a line per event.
+    """
+
+    def __init__(self):
+        self._counters: dict[int, Counter] = {}
+        self._lock = threading.Lock()
+
+    def record(self, chat_id: int, event: str, count: int = 1):
+        """
+        Count an event.
+
+        Args:
+            chat_id (int): The ID of the chat.
+            event (str): The event name, e.g. ``joins`` or ``kicks``.
+            count (int): The number of events.
+
+        """
+        with self._lock:
+            counter = self._counters.get(chat_id)
+            if counter is None:
+                counter = self._counters[chat_id] = Counter()
+            counter[event] += count
+
+    def pop(self) -> dict[int, Counter]:
+        """
+        Get the counters and start counting from zero.
+
+        Returns:
+            dict[int, Counter]: Event counts by chat ID.
+
+        """
+        with self._lock:
+            counters, self._counters = self._counters, {}
+        return counters
+
+
+class LogSampler:
+    """
+    Sample INFO records and deduplicate warnings and errors.
+
+    Records below WARNING are sampled per source: ``sample_rates`` maps
+    ``module:function``, modules or packages to the share of records that
+    are logged, the most specific match wins. Records at or above
+    ``dedup_level`` are logged in full once per source line, exception
+    type and chat in a summary interval, repeats are only counted. The
+    exception is the one attached to the record or being handled, the
+    chat is the ``chat_id`` of the logger context.
+
+    ``patch`` decides once per record and is installed as loguru patcher,
+    ``filter`` applies the decision in every handler.
+    """
+
+    def __init__(
+        self,
+        sample_rates: Mapping[str, float],
+        dedup_level_no: int = 30,
+    ):
+        """
+        Initialize the sampler.
+
+        Args:
+            sample_rates (Mapping[str, float]): Share of logged records
+                by source.
+            dedup_level_no (int): Level number from which records are
+                deduplicated.
+
+        """
+        self.sample_rates = dict(sample_rates)
+        self.dedup_level_no = dedup_level_no
+        # [period, counter] of each source, every period-th is logged
+        self._sources: dict[tuple[str, str], list[int]] = {}
+        # (name, function, line, exception type, chat ID) -> [level name,
+        # first message, repeats]
+        self._repeated: dict[tuple, list[Any]] = {}
+        self._lock = threading.Lock()
+
+    def patch(self, record: dict[str, Any]):
+        """
+        Decide whether the record is logged, called by loguru.
+
+        Args:
+            record (dict): The loguru record.
+
+        """
+        if record["extra"].get("log_summary"):
+            return
+
+        level_no = record["level"].no
+        if level_no >= self.dedup_level_no:
+            record["sampled"] = self._is_first(record)
+        elif level_no < 30:
+            record["sampled"] = self._is_sampled(record)
+
+    @staticmethod
+    def filter(record: dict[str, Any]) -> bool:
+        """
+        Check the decision made by ``patch``.
+
+        Args:
+            record (dict): The loguru record.
+
+        Returns:
+            bool: True if the record is logged.
+
+        """
+        return record.get("sampled", True)
+
+    def pop_repeated(self) -> list[tuple[tuple, list]]:
+        """
+        Get records repeated since the last call and forget them.
+
+        Returns:
+            list[tuple]: Source name, function, line, exception type and
+                chat ID with level name, first message and number of
+                repeats of each repeated record.
+
+        """
+        with self._lock:
+            repeated, self._repeated = self._repeated, {}
+        return [
+            (source, record)
+            for source, record in repeated.items()
+            if record[2]
+        ]
+
+    def _is_first(self, record: dict[str, Any]) -> bool:
+        exception = record["exception"]
+        # Errors are mostly logged with the message of the handled one
+        exception_type = exception.type if exception else sys.exc_info()[0]
+        key = (
+            record["name"],
+            record["function"],
+            record["line"],
+            exception_type.__name__ if exception_type else None,
+            record["extra"].get("chat_id"),
+        )
+        with self._lock:
+            repeated = self._repeated.get(key)
+            if repeated is None:
+                self._repeated[key] = [
+                    record["level"].name, record["message"], 0,
+                ]
+                return True
+            repeated[2] += 1
+        return False
+
+    def _is_sampled(self, record: dict[str, Any]) -> bool:
+        key = (record["name"], record["function"])
+        source = self._sources.get(key)
+        if source is None:
+            rate = self._get_rate(*key)
+            period = round(1 / rate) if rate > 0 else 0
+            source = self._sources[key] = [period, 0]
+
+        period, counter = source
+        if period == 1:
+            return True
+        if period == 0:
+            return False
+        source[1] = (counter + 1) % period
+        return counter == 0
+
+    def _get_rate(self, name: Optional[str], function: str) -> float:
+        name = name or ""
+        rate = self.sample_rates.get(f"{name}:{function}")
+        if rate is not None:
+            return rate
+        parts = name.split(".")
+        while parts:
+            rate = self.sample_rates.get(".".join(parts))
+            if rate is not None:
+                return rate
+            parts.pop()
+        return 1.0
+
+
+class LogSummaryWriter:
+    """Thread logging event summaries and repeated records periodically."""
+
+    def __init__(
+        self,
+        sampler: LogSampler,
+        events: EventCounter,
+        interval: float,
+    ):
+        """
+        Initialize the summary writer.
+
+        Args:
+            sampler (LogSampler): The sampler with repeated records.
+            events (EventCounter): The event counters.
+            interval (float): Time in seconds between summaries.
+
+        """
+        self.sampler = sampler
+        self.events = events
+        self.interval = interval
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the writer thread."""
+        self._thread = threading.Thread(
+            target=self._run, name="log-summary", daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Log the last summary and stop the writer thread."""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+
+    def write(self):
+        """Log event summaries and repeated records."""
+        summary_logger = logger.bind(log_summary=True)
+
+        counters = self.events.pop()
+        if counters:
+            totals = Counter()
+            for counter in counters.values():
+                totals.update(counter)
+            summary_logger.info(
+                f"Events summary: {dict(totals)} in {len(counters)} chats",
+            )
+            for chat_id, counter in counters.items():
+                summary_logger.bind(chat_id=chat_id).info(
+                    f"Chat {chat_id} events: {dict(counter)}",
+                )
+
+        for source, record in self.sampler.pop_repeated():
+            level, message, count = record
+            chat_id = source[4]
+            repeated_logger = summary_logger.patch(
+                partial(_set_source, source[:3]),
+            )
+            if chat_id is not None:
+                repeated_logger = repeated_logger.bind(chat_id=chat_id)
+            repeated_logger.log(level, f"{message} (repeated {count} times)")
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            self.write()
+        self.write()
+
+
+def _set_source(source: tuple[str, str, int], record: dict[str, Any]):
+    record["name"], record["function"], record["line"] = source
+
+
+# Events of all handlers and jobs
+LOG_EVENTS = EventCounter()
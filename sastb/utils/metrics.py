@@ -0,0 +1,496 @@
+__all__ = (
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "Registry",
+    "REGISTRY",
+    "label_samples",
+    "LATENCY_BUCKETS",
+    "HANDLER_LATENCY",
+    "BOT_API_LATENCY",
+    "BOT_API_ERRORS",
+    "JOB_STORE_LATENCY",
+    "WEBHOOK_REQUESTS",
+    "PENDING_VERIFICATIONS",
+    "SCHEDULED_JOBS",
+    "SCHEDULER_LAG",
+    "SCHEDULER_JOB_DURATION",
+    "SCHEDULER_MISFIRES",
+    "SCHEDULER_COALESCED_RUNS",
+    "MEMBER_CACHE_LOOKUPS",
+    "MEMBER_CACHE_SIZE",
+    "CHAT_SETTINGS_LOOKUPS",
+    "UPDATE_QUEUE_DEPTH",
+    "UPDATE_QUEUE_WAIT",
+    "UPDATES_DROPPED",
+)
+
+from bisect import bisect_left
+from typing import Callable, Mapping, Optional, Sequence
+
+
+class CounterChild:
+    """Counter value of one label set."""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        """
+        Increase the counter.
+
+        Args:
+            amount (float): The amount to add.
+
+        """
+        self.value += amount
+
+
+class GaugeChild:
+    """Gauge value of one label set."""
+
+    __slots__ = ("value", "function")
+
+    def __init__(self):
+        self.value = 0
+        self.function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float):
+        """
+        Set the gauge value.
+
+        Args:
+            value (float): The new value.
+
+        """
+        self.value = value
+
+    def set_function(self, function: Callable[[], float]):
+        """
+        Read the gauge value from a function on collection.
+
+        Args:
+            function (Callable[[], float]): Function returning the value.
+
+        """
+        self.function = function
+
+    def get(self) -> float:
+        """
+        Get the gauge value.
+
+        Returns:
+            float: The current value.
+
+        """
+        if self.function is not None:
+            return self.function()
+        return self.value
+
+
+class HistogramChild:
+    """Histogram buckets of one label set, allocated once."""
+
+    __slots__ = ("upper_bounds", "bucket_counts", "sum", "count")
+
+    def __init__(self, upper_bounds: tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        # The last bucket counts values above all bounds
+        self.bucket_counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """
+        Record an observation.
+
+        Args:
+            value (float): The observed value.
+
+        """
+        self.bucket_counts[bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metric:
+    """
+    Base class of metric families.
+
+    Children of label sets are created on first use, or up front with
+    ``labels``; hot paths keep references to their children.
+    """
+
+    type_name = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional["Registry"] = None,
+    ):
+        """
+        Initialize the metric family.
+
+        Args:
+            name (str): The metric name.
+            documentation (str): The metric help text.
+            labelnames (Sequence[str]): Names of the labels.
+            registry (Registry | None): The registry to add the metric to,
+                the global registry by default.
+
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.children: dict[tuple[str, ...], object] = {}
+        (registry or REGISTRY).register(self)
+
+    def labels(self, *values: object):
+        """
+        Get the child of a label set.
+
+        Args:
+            *values: Label values in order of label names.
+
+        Returns:
+            The child metric.
+
+        Raises:
+            ValueError: If the number of values does not match labels.
+
+        """
+        key = tuple(str(value) for value in values)
+        child = self.children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(
+                    f"Metric {self.name} expects labels {self.labelnames}"
+                )
+            child = self.children[key] = self._create_child()
+        return child
+
+    def collect(self, extra_samples: Sequence[str] = ()) -> list[str]:
+        """
+        Render the metric in Prometheus text format.
+
+        Args:
+            extra_samples (Sequence[str]): Sample lines of the metric
+                collected elsewhere, e.g. in worker processes.
+
+        Returns:
+            list[str]: The lines of the metric.
+
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for key, child in self.children.items():
+            lines.extend(self._collect_child(key, child))
+        lines.extend(extra_samples)
+        return lines
+
+    def _format_labels(
+        self,
+        key: tuple[str, ...],
+        extra: Sequence[tuple[str, str]] = (),
+    ) -> str:
+        pairs = [*zip(self.labelnames, key), *extra]
+        if not pairs:
+            return ""
+        return "{" + ",".join(
+            f'{name}="{_escape(value)}"' for name, value in pairs
+        ) + "}"
+
+    def _create_child(self):
+        raise NotImplementedError
+
+    def _collect_child(self, key: tuple[str, ...], child) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonically increasing counter."""
+
+    type_name = "counter"
+
+    def _create_child(self) -> CounterChild:
+        return CounterChild()
+
+    def _collect_child(
+        self,
+        key: tuple[str, ...],
+        child: CounterChild,
+    ) -> list[str]:
+        labels = self._format_labels(key)
+        return [f"{self.name}{labels} {_format_value(child.value)}"]
+
+
+class Gauge(Metric):
+    """Value that can go up and down or is read on collection."""
+
+    type_name = "gauge"
+
+    def _create_child(self) -> GaugeChild:
+        return GaugeChild()
+
+    def _collect_child(
+        self,
+        key: tuple[str, ...],
+        child: GaugeChild,
+    ) -> list[str]:
+        labels = self._format_labels(key)
+        return [f"{self.name}{labels} {_format_value(child.get())}"]
+
+
+class Histogram(Metric):
+    """Histogram with fixed buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = (),
+        registry: Optional["Registry"] = None,
+    ):
+        """
+        Initialize the histogram family.
+
+        Args:
+            name (str): The metric name.
+            documentation (str): The metric help text.
+            labelnames (Sequence[str]): Names of the labels.
+            buckets (Sequence[float]): Upper bounds of the buckets,
+                ``LATENCY_BUCKETS`` by default.
+            registry (Registry | None): The registry to add the metric to.
+
+        """
+        self.upper_bounds = tuple(sorted(buckets or LATENCY_BUCKETS))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _create_child(self) -> HistogramChild:
+        return HistogramChild(self.upper_bounds)
+
+    def _collect_child(
+        self,
+        key: tuple[str, ...],
+        child: HistogramChild,
+    ) -> list[str]:
+        labels = self._format_labels(key)
+        lines = []
+        cumulative = 0
+        for upper_bound, bucket_count in zip(
+            (*self.upper_bounds, float("inf")), child.bucket_counts,
+        ):
+            cumulative += bucket_count
+            bucket_labels = self._format_labels(
+                key, extra=(("le", _format_value(upper_bound)),),
+            )
+            lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics exposed together."""
+
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric):
+        """
+        Add a metric.
+
+        Args:
+            metric (Metric): The metric to add.
+
+        Raises:
+            ValueError: If a metric with the same name is registered.
+
+        """
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+
+    def render(
+        self,
+        extra_samples: Optional[Mapping[str, Sequence[str]]] = None,
+    ) -> str:
+        """
+        Render all metrics in Prometheus text format.
+
+        Args:
+            extra_samples (Mapping[str, Sequence[str]] | None): Sample lines
+                collected elsewhere by metric name, see ``label_samples``.
+
+        Returns:
+            str: The metrics text.
+
+        """
+        extra_samples = extra_samples or {}
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.collect(extra_samples.get(metric.name, ())))
+        return "\n".join(lines) + "\n"
+
+
+def label_samples(
+    text: str,
+    label_name: str,
+    label_value: str,
+) -> dict[str, list[str]]:
+    """
+    Add a label to all samples of metrics rendered by another registry.
+
+    Args:
+        text (str): Metrics in Prometheus text format.
+        label_name (str): The name of the added label.
+        label_value (str): The value of the added label.
+
+    Returns:
+        dict[str, list[str]]: Labeled sample lines by metric name.
+
+    """
+    label = f'{label_name}="{_escape(label_value)}"'
+    samples: dict[str, list[str]] = {}
+    family: Optional[list[str]] = None
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            family = samples.setdefault(line.split(" ", 3)[2], [])
+            continue
+        if not line or line.startswith("#") or family is None:
+            continue
+
+        # Metric names contain neither braces nor spaces
+        name_end = min(
+            index for index in (line.find("{"), line.find(" ")) if index >= 0
+        )
+        if line[name_end] == "{":
+            labels = label if line[name_end + 1] == "}" else label + ","
+            family.append(
+                f"{line[:name_end + 1]}{labels}{line[name_end + 1:]}",
+            )
+        else:
+            family.append(f"{line[:name_end]}{{{label}}}{line[name_end:]}")
+    return samples
+
+
+def _escape(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    )
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+REGISTRY = Registry()
+
+# Seconds, from fast in-memory operations to slow Bot API calls
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+
+HANDLER_LATENCY = Histogram(
+    "sastb_handler_duration_seconds",
+    "Time spent in update handlers by router",
+    labelnames=("router",),
+)
+BOT_API_LATENCY = Histogram(
+    "sastb_bot_api_request_duration_seconds",
+    "Bot API request latency by method",
+    labelnames=("method",),
+)
+BOT_API_ERRORS = Counter(
+    "sastb_bot_api_errors_total",
+    "Failed Bot API requests by method and error",
+    labelnames=("method", "error"),
+)
+JOB_STORE_LATENCY = Histogram(
+    "sastb_job_store_operation_duration_seconds",
+    "Scheduled jobs and pending verifications storage operation latency",
+    labelnames=("store", "operation"),
+)
+WEBHOOK_REQUESTS = Counter(
+    "sastb_webhook_requests_total",
+    "Webhook requests by response status",
+    labelnames=("status",),
+)
+PENDING_VERIFICATIONS = Gauge(
+    "sastb_pending_verifications",
+    "Users waiting for verification before being kicked",
+)
+SCHEDULED_JOBS = Gauge(
+    "sastb_scheduled_jobs",
+    "Jobs in the scheduler job store",
+)
+
+# Seconds, up to the default misfire grace time
+SCHEDULER_LAG_BUCKETS = (
+    0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 1800, 3600,
+)
+
+SCHEDULER_LAG = Histogram(
+    "sastb_scheduler_lag_seconds",
+    "Delay between scheduled and actual job start by engine",
+    labelnames=("engine",),
+    buckets=SCHEDULER_LAG_BUCKETS,
+)
+SCHEDULER_JOB_DURATION = Histogram(
+    "sastb_scheduler_job_duration_seconds",
+    "Scheduled job runtime by engine",
+    labelnames=("engine",),
+)
+SCHEDULER_MISFIRES = Counter(
+    "sastb_scheduler_misfires_total",
+    "Job runs skipped because they were later than misfire grace time",
+    labelnames=("engine",),
+)
+SCHEDULER_COALESCED_RUNS = Counter(
+    "sastb_scheduler_coalesced_runs_total",
+    "Missed job runs merged into one run",
+    labelnames=("engine",),
+)
+MEMBER_CACHE_LOOKUPS = Counter(
+    "sastb_member_cache_lookups_total",
+    "Chat member lookups of kick jobs by result, misses call getChatMember",
+    labelnames=("result",),
+)
+MEMBER_CACHE_SIZE = Gauge(
+    "sastb_member_cache_size",
+    "Chat members with a known state",
+)
+CHAT_SETTINGS_LOOKUPS = Counter(
+    "sastb_chat_settings_lookups_total",
+    "Chat settings lookups by result, misses read the database",
+    labelnames=("result",),
+)
+UPDATE_QUEUE_DEPTH = Gauge(
+    "sastb_update_queue_depth",
+    "Updates waiting in the update worker pool by bot",
+    labelnames=("bot",),
+)
+UPDATE_QUEUE_WAIT = Histogram(
+    "sastb_update_queue_wait_seconds",
+    "Time updates waited in the update worker pool by bot",
+    labelnames=("bot",),
+)
+UPDATES_DROPPED = Counter(
+    "sastb_updates_dropped_total",
+    "Updates rejected because the update worker pool was full by bot",
+    labelnames=("bot",),
+)
@@ -27,3 +27,12 @@ class Singleton(type):
                 instance = super().__call__(*args, **kwargs)
                 cls._instances[cls] = instance
         return cls._instances[cls]
+
+    def has_instance(cls) -> bool:
+        """
+        Check whether the Singleton instance is created.
+
+        :return: True if the instance exists
+
+        """
+        return cls in cls._instances
@@ -0,0 +1,10 @@
+from typing import Any
+
+from sastb.config import SettingsSnapshot
+from sastb.config.config import Settings
+
+
+def make_settings(**values: Any) -> SettingsSnapshot:
+    """Build a settings snapshot without reading the environment file."""
+    values.setdefault("telegram", {"token": "1:TOKEN"})
+    return Settings(_env_file=None, **values).snapshot()  # type: ignore
@@ -0,0 +1,134 @@
+import os
+import tempfile
+import unittest
+
+import aiosqlite
+
+from sastb.config.models.default_settings import MAX_DELAY
+from sastb.modules.bot.utils.chat_settings import ChatSettings
+
+from .helpers import make_settings
+
+
+class WithOverridesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.settings = make_settings()
+
+    def test_delays_overridden(self):
+        settings = self.settings.with_overrides({
+            "remove_user_after": "10",
+            "additional_delay_for_permissions": "0",
+        })
+
+        self.assertEqual(settings.default_settings.remove_user_after, 10)
+        self.assertEqual(
+            settings.default_settings.additional_delay_for_permissions, 0,
+        )
+        self.assertIs(self.settings.with_overrides({}), self.settings)
+
+    def test_invalid_delays_rejected(self):
+        for name, value in (
+            ("remove_user_after", "inf"),
+            ("remove_user_after", "nan"),
+            ("remove_user_after", "0"),
+            ("remove_user_after", str(MAX_DELAY + 1)),
+            ("additional_delay_for_permissions", "-1"),
+            ("additional_delay_for_permissions", str(MAX_DELAY + 1)),
+        ):
+            with self.subTest(name=name, value=value):
+                with self.assertRaises(ValueError):
+                    self.settings.with_overrides({name: value})
+
+    def test_template_markup_validated(self):
+        settings = self.settings.with_overrides({
+            "welcome_message_text": (
+                '<b>Hi</b> {user}, <a href="https://t.me">rules</a> &lt;3'
+            ),
+            # Sent without parse mode
+            "confirm_button_text": "I'm human <3",
+        })
+
+        self.assertEqual(
+            settings.text_templates.welcome_message_text(user="U"),
+            '<b>Hi</b> U, <a href="https://t.me">rules</a> &lt;3',
+        )
+        for template in (
+            "<b>Hi {user}",
+            "<b><i>Hi</b></i> {user}",
+            "Hi<br>{user}",
+            "Hi {user} <3",
+            "Hi&nbsp;{user}",
+            "<a>Hi</a> {user}",
+        ):
+            with self.subTest(template=template):
+                with self.assertRaises(ValueError):
+                    self.settings.with_overrides({
+                        "welcome_message_text": template,
+                    })
+
+    def test_unknown_setting_rejected(self):
+        with self.assertRaises(ValueError):
+            self.settings.with_overrides({"token": "2:TOKEN"})
+
+
+class ChatSettingsTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.file_name = os.path.join(directory.name, "chat_settings.db")
+        self.settings = make_settings()
+
+    def open(self) -> ChatSettings:
+        chat_settings = ChatSettings(
+            settings=self.settings,
+            file_name=self.file_name,
+            cache_size=10,
+            main_bot_id=1,
+        )
+        self.addAsyncCleanup(chat_settings.close)
+        return chat_settings
+
+    async def test_overrides_kept_per_bot(self):
+        chat_settings = self.open()
+        # Cached before the override is set
+        await chat_settings.get(1, -100)
+
+        await chat_settings.set(1, -100, "remove_user_after", "10")
+
+        main_settings = await chat_settings.get(1, -100)
+        other_settings = await chat_settings.get(2, -100)
+        self.assertEqual(main_settings.default_settings.remove_user_after, 10)
+        self.assertIs(other_settings, self.settings)
+        self.assertEqual(await chat_settings.get_overrides(2, -100), {})
+
+        self.assertTrue(
+            await chat_settings.unset(1, -100, "remove_user_after"),
+        )
+        self.assertIs(await chat_settings.get(1, -100), self.settings)
+
+    async def test_previous_overrides_migrated_to_main_bot(self):
+        async with aiosqlite.connect(self.file_name) as connection:
+            await connection.execute(
+                "CREATE TABLE chat_settings ("
+                "chat_id INTEGER NOT NULL, "
+                "name TEXT NOT NULL, "
+                "value TEXT NOT NULL, "
+                "PRIMARY KEY (chat_id, name))"
+            )
+            await connection.execute(
+                "INSERT INTO chat_settings VALUES "
+                "(-100, 'remove_user_after', '10')",
+            )
+            await connection.commit()
+
+        chat_settings = self.open()
+
+        self.assertEqual(
+            await chat_settings.get_overrides(1, -100),
+            {"remove_user_after": "10"},
+        )
+        self.assertEqual(await chat_settings.get_overrides(2, -100), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
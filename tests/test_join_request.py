@@ -0,0 +1,123 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sastb.modules.bot.routes.join_request import (
+    confirm_join_request_handler,
+    join_request_handler,
+)
+from sastb.modules.bot.utils.verify_join_request_callback import (
+    VerifyJoinRequestCallback,
+)
+from sastb.modules.scheduler.pending_verifications import KIND_JOIN_REQUEST
+
+from .helpers import make_settings
+
+
+class JoinRequestTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.scheduler = MagicMock()
+        patcher = patch(
+            "sastb.modules.bot.routes.join_request.SchedulerApp",
+            return_value=self.scheduler,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.verifications = self.scheduler.get_verifications.return_value
+        self.verifications.persist = AsyncMock()
+        self.bot = AsyncMock()
+        self.bot.send_message.return_value = SimpleNamespace(message_id=10)
+        self.event = MagicMock()
+        self.event.chat.id = -100
+        self.event.from_user.id = 2
+        self.event.from_user.mention_html.return_value = "User"
+        self.event.date.timestamp.return_value = 100.0
+
+    async def handle(self):
+        await join_request_handler(
+            event=self.event,
+            bot=self.bot,
+            settings=make_settings(default_settings={
+                "verify_join_requests": True,
+            }),
+        )
+
+    async def test_verification_persisted_before_challenge(self):
+        self.bot.send_message.side_effect = RuntimeError("Forbidden")
+
+        await self.handle()
+
+        self.verifications.persist.assert_awaited_once_with(
+            self.verifications.add.return_value,
+        )
+        self.assertEqual(
+            self.verifications.add.call_args.kwargs["kind"],
+            KIND_JOIN_REQUEST,
+        )
+
+    async def test_chat_title_escaped(self):
+        self.event.chat.title = "<dev> Tom & Jerry"
+
+        await self.handle()
+
+        text = self.bot.send_message.call_args.kwargs["text"]
+        self.assertIn("&lt;dev&gt; Tom &amp; Jerry", text)
+        self.verifications.set_message_id.assert_called_once_with(
+            chat_id=-100, user_id=2, message_id=10,
+        )
+
+
+class ConfirmJoinRequestTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.scheduler = MagicMock()
+        patcher = patch(
+            "sastb.modules.bot.routes.join_request.SchedulerApp",
+            return_value=self.scheduler,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.verifications = self.scheduler.get_verifications.return_value
+        self.verifications.cancel.return_value = SimpleNamespace(
+            message_id=10, joined_at=100.0, deadline=200.0,
+        )
+        self.bot = AsyncMock()
+        self.event = AsyncMock()
+        self.event.from_user.id = 2
+
+    async def confirm(self):
+        await confirm_join_request_handler(
+            event=self.event,
+            callback_data=VerifyJoinRequestCallback(chat_id=-100),
+            bot=self.bot,
+            settings=make_settings(),
+            chat_settings=None,
+        )
+
+    async def test_approve_failure_keeps_request_pending(self):
+        self.bot.approve_chat_join_request.side_effect = RuntimeError(
+            "Bad Gateway",
+        )
+
+        await self.confirm()
+
+        self.verifications.add.assert_called_once_with(
+            chat_id=-100,
+            user_id=2,
+            message_id=10,
+            joined_at=100.0,
+            deadline=200.0,
+            kind=KIND_JOIN_REQUEST,
+        )
+        self.event.answer.assert_awaited_once()
+
+    async def test_approved(self):
+        await self.confirm()
+
+        self.bot.approve_chat_join_request.assert_awaited_once_with(
+            chat_id=-100, user_id=2,
+        )
+        self.verifications.add.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+from loguru import logger
+
+from sastb.utils.log_sampling import LogSampler
+
+
+class LogSamplerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.sampler = LogSampler({})
+        self.messages: list[str] = []
+        handler_id = logger.add(
+            lambda message: self.messages.append(message.record["message"]),
+            filter=self.sampler.filter,
+            level="WARNING",
+        )
+        self.addCleanup(logger.remove, handler_id)
+        self.logger = logger.patch(self.sampler.patch)
+
+    def log_error(self, chat_id: int, error: Exception):
+        try:
+            raise error
+        except Exception as exc:
+            with logger.contextualize(chat_id=chat_id):
+                self.logger.error(f"Failed in chat {chat_id}: {exc}")
+
+    def test_repeats_counted_per_chat_and_exception_type(self):
+        self.log_error(-100, ValueError("first"))
+        self.log_error(-100, ValueError("second"))
+        self.log_error(-200, ValueError("first"))
+        self.log_error(-100, KeyError("first"))
+
+        self.assertEqual(self.messages, [
+            "Failed in chat -100: first",
+            "Failed in chat -200: first",
+            "Failed in chat -100: 'first'",
+        ])
+        repeated = self.sampler.pop_repeated()
+        self.assertEqual(len(repeated), 1)
+        source, (level, message, count) = repeated[0]
+        self.assertEqual(source[3:], ("ValueError", -100))
+        self.assertEqual(message, "Failed in chat -100: first")
+        self.assertEqual(count, 1)
+
+    def test_logged_again_after_summary(self):
+        self.log_error(-100, ValueError("first"))
+        self.sampler.pop_repeated()
+        self.log_error(-100, ValueError("second"))
+
+        self.assertEqual(len(self.messages), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
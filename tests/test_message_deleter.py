@@ -0,0 +1,53 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import AsyncMock
+
+from sastb.modules.bot.utils.message_deleter import (
+    DELETE_WINDOW,
+    MessageDeleter,
+)
+
+
+class MessageDeleterTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.bot = AsyncMock()
+        self.deleter = MessageDeleter(self.bot, flush_interval=0.01)
+        self.fallback = AsyncMock()
+
+    async def test_messages_deleted_in_one_call(self):
+        self.deleter.add(
+            chat_id=-100, message_id=1, fallback=self.fallback,
+            sent_at=time.time(),
+        )
+        self.deleter.add(chat_id=-100, message_id=2)
+
+        await asyncio.sleep(0.05)
+
+        self.bot.delete_messages.assert_awaited_once_with(
+            chat_id=-100, message_ids=[1, 2],
+        )
+        self.fallback.assert_not_awaited()
+
+    async def test_old_message_falls_back_without_deleting(self):
+        self.deleter.add(
+            chat_id=-100, message_id=1, fallback=self.fallback,
+            sent_at=time.time() - DELETE_WINDOW - 1,
+        )
+
+        await self.deleter.close()
+
+        self.fallback.assert_awaited_once()
+        self.bot.delete_messages.assert_not_awaited()
+
+    async def test_failed_call_falls_back(self):
+        self.bot.delete_messages.side_effect = RuntimeError("Bad Request")
+        self.deleter.add(chat_id=-100, message_id=1, fallback=self.fallback)
+
+        await self.deleter.close()
+
+        self.fallback.assert_awaited_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
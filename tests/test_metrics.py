@@ -0,0 +1,39 @@
+import unittest
+
+from sastb.utils.metrics import Counter, Gauge, Registry, label_samples
+
+
+class LabelSamplesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.registry = Registry()
+        self.requests = Counter(
+            "requests_total", "Requests", ("status",), self.registry,
+        )
+        self.pending = Gauge("pending", "Pending", registry=self.registry)
+
+    def test_worker_samples_merged_into_families(self):
+        self.requests.labels("200").inc(2)
+        self.pending.labels().set(3)
+        worker_samples = label_samples(self.registry.render(), "shard", "0")
+
+        self.assertEqual(worker_samples, {
+            "requests_total": ['requests_total{shard="0",status="200"} 2'],
+            "pending": ['pending{shard="0"} 3'],
+        })
+        self.assertEqual(
+            self.registry.render(worker_samples).splitlines(),
+            [
+                "# HELP requests_total Requests",
+                "# TYPE requests_total counter",
+                'requests_total{status="200"} 2',
+                'requests_total{shard="0",status="200"} 2',
+                "# HELP pending Pending",
+                "# TYPE pending gauge",
+                "pending 3",
+                'pending{shard="0"} 3',
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import asyncio
+import time
+import unittest
+from types import SimpleNamespace
+
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import GetMe, SendMessage
+
+from sastb.config.models.telegram import TelegramRateLimits
+from sastb.modules.bot.utils.outbound_scheduler import (
+    OutboundScheduler,
+    Priority,
+    TokenBucket,
+)
+
+
+def make_retry_after(method, retry_after: float) -> TelegramRetryAfter:
+    exc = TelegramRetryAfter(method=method, message="flood", retry_after=1)
+    # Fractions of a second keep the tests fast
+    exc.retry_after = retry_after
+    return exc
+
+
+class TokenBucketTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_waiters_served_by_priority(self):
+        bucket = TokenBucket(rate=1, period=0.05)
+        await bucket.acquire()
+
+        served = []
+
+        async def acquire(priority: Priority):
+            await bucket.acquire(priority)
+            served.append(priority)
+
+        await asyncio.gather(
+            acquire(Priority.LOW),
+            acquire(Priority.NORMAL),
+            acquire(Priority.HIGH),
+        )
+        self.assertEqual(
+            served, [Priority.HIGH, Priority.NORMAL, Priority.LOW],
+        )
+
+    async def test_pause_delays_tokens(self):
+        bucket = TokenBucket(rate=100, period=1)
+        bucket.pause(0.1)
+
+        started = time.monotonic()
+        await bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
+
+
+class OutboundSchedulerTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.scheduler = OutboundScheduler(
+            TelegramRateLimits(
+                global_rate=100, chat_rate=100, chat_period=1, max_retries=1,
+            ),
+        )
+        self.bot = SimpleNamespace(id=1)
+
+    async def test_retry_after_without_chat_pauses_bot(self):
+        calls = []
+
+        async def make_request(bot, method):
+            calls.append((type(method).__name__, time.monotonic()))
+            if len(calls) == 1:
+                raise make_retry_after(method, 0.1)
+            return True
+
+        started = time.monotonic()
+        first = asyncio.create_task(
+            self.scheduler(make_request, self.bot, GetMe()),
+        )
+        await asyncio.sleep(0.01)
+        # Queued while the bot is under flood control
+        second = await self.scheduler(
+            make_request, self.bot, SendMessage(chat_id=2, text="text"),
+        )
+
+        self.assertTrue(await first)
+        self.assertTrue(second)
+        self.assertEqual(len(calls), 3)
+        for _, called_at in calls[1:]:
+            self.assertGreaterEqual(called_at - started, 0.09)
+
+    async def test_retry_after_with_chat_pauses_chat_only(self):
+        calls = []
+
+        async def make_request(bot, method):
+            calls.append((method.chat_id, time.monotonic()))
+            if len(calls) == 1:
+                raise make_retry_after(method, 0.2)
+            return True
+
+        started = time.monotonic()
+        first = asyncio.create_task(self.scheduler(
+            make_request, self.bot, SendMessage(chat_id=2, text="text"),
+        ))
+        await asyncio.sleep(0.01)
+        await self.scheduler(
+            make_request, self.bot, SendMessage(chat_id=3, text="text"),
+        )
+        await first
+
+        calls_by_chat = {chat_id: called_at for chat_id, called_at in calls}
+        self.assertLess(calls_by_chat[3] - started, 0.15)
+        self.assertGreaterEqual(calls_by_chat[2] - started, 0.19)
+
+    async def test_retries_exhausted(self):
+        async def make_request(bot, method):
+            raise make_retry_after(method, 0.01)
+
+        with self.assertRaises(TelegramRetryAfter):
+            await self.scheduler(make_request, self.bot, GetMe())
+
+
+if __name__ == "__main__":
+    unittest.main()
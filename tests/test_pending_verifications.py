@@ -0,0 +1,148 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+
+import aiosqlite
+
+from sastb.modules.scheduler.pending_verifications import (
+    KIND_JOIN_REQUEST,
+    PendingVerifications,
+)
+
+
+class PendingVerificationsTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.file_name = os.path.join(directory.name, "scheduler.db")
+        self.fired: list[tuple[int, int]] = []
+
+    async def on_deadline(self, chat_id, user_id, message_id, kind):
+        self.fired.append((chat_id, user_id))
+
+    async def open(self, **kwargs) -> PendingVerifications:
+        verifications = PendingVerifications(
+            file_name=self.file_name,
+            on_deadline=self.on_deadline,
+            flush_interval=0.01,
+            **kwargs,
+        )
+        await verifications.open()
+        self.addAsyncCleanup(verifications.close)
+        return verifications
+
+    async def test_deadlines_fire_in_order(self):
+        verifications = await self.open()
+        now = time.time()
+        for user_id, delay in ((1, 0.06), (2, 0.02), (3, 0.04), (4, 0.03)):
+            verifications.add(
+                chat_id=-100, user_id=user_id, message_id=None,
+                deadline=now + delay,
+            )
+        verifications.cancel(chat_id=-100, user_id=4)
+        verifications.start()
+
+        await asyncio.sleep(0.15)
+
+        self.assertEqual(self.fired, [(-100, 2), (-100, 3), (-100, 1)])
+        self.assertEqual(len(verifications), 0)
+
+    async def test_cancel(self):
+        verifications = await self.open()
+        verifications.add(
+            chat_id=-100, user_id=1, message_id=10,
+            deadline=time.time() + 60,
+        )
+
+        cancelled = verifications.cancel(chat_id=-100, user_id=1)
+
+        self.assertEqual(cancelled.message_id, 10)
+        self.assertIsNone(verifications.cancel(chat_id=-100, user_id=1))
+        self.assertIsNone(verifications.get(chat_id=-100, user_id=1))
+
+    async def test_cancel_chat(self):
+        verifications = await self.open()
+        for chat_id, user_id in ((-100, 1), (-100, 2), (-200, 1)):
+            verifications.add(
+                chat_id=chat_id, user_id=user_id, message_id=None,
+                deadline=time.time() + 60,
+            )
+
+        cancelled = verifications.cancel_chat(-100)
+
+        self.assertEqual({record.user_id for record in cancelled}, {1, 2})
+        self.assertEqual(len(verifications), 1)
+
+    async def test_persisted_across_reopen(self):
+        verifications = await self.open()
+        deadline = time.time() + 60
+        verifications.add(
+            chat_id=-100, user_id=1, message_id=10, deadline=deadline,
+            kind=KIND_JOIN_REQUEST,
+        )
+        verifications.add(
+            chat_id=-100, user_id=2, message_id=11, deadline=deadline,
+        )
+        await verifications.flush()
+        verifications.cancel(chat_id=-100, user_id=2)
+        # Cancelled before it was written
+        verifications.add(
+            chat_id=-100, user_id=3, message_id=12, deadline=deadline,
+        )
+        verifications.cancel(chat_id=-100, user_id=3)
+        await verifications.close()
+
+        reopened = await self.open()
+
+        self.assertEqual(len(reopened), 1)
+        record = reopened.get(chat_id=-100, user_id=1)
+        self.assertEqual(record.message_id, 10)
+        self.assertEqual(record.deadline, deadline)
+        self.assertEqual(record.kind, KIND_JOIN_REQUEST)
+
+    async def test_persist_writes_single_row(self):
+        # Not started, so the background writer stays idle
+        verifications = await self.open()
+        deadline = time.time() + 60
+        verifications.add(
+            chat_id=-100, user_id=1, message_id=None, deadline=deadline,
+        )
+        record = verifications.add(
+            chat_id=-100, user_id=2, message_id=None, deadline=deadline,
+        )
+
+        await verifications.persist(record)
+
+        async with aiosqlite.connect(self.file_name) as connection:
+            async with connection.execute(
+                "SELECT user_id FROM pending_verifications",
+            ) as cursor:
+                rows = await cursor.fetchall()
+        self.assertEqual(rows, [(2,)])
+        self.assertTrue(record.is_persisted)
+        self.assertFalse(
+            verifications.get(chat_id=-100, user_id=1).is_persisted,
+        )
+
+    async def test_overdue_caught_up_after_reopen(self):
+        verifications = await self.open()
+        now = time.time()
+        for user_id in (1, 2):
+            verifications.add(
+                chat_id=-100, user_id=user_id, message_id=None,
+                deadline=now + user_id * 0.01,
+            )
+        await verifications.close()
+        await asyncio.sleep(0.05)
+
+        reopened = await self.open(catch_up_rate=100)
+        reopened.start()
+        await asyncio.sleep(0.1)
+
+        self.assertEqual(self.fired, [(-100, 1), (-100, 2)])
+
+
+if __name__ == "__main__":
+    unittest.main()
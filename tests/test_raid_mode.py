@@ -0,0 +1,118 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from aiogram.types import ChatMemberLeft, ChatMemberRestricted, User
+
+from sastb.modules.bot.utils.raid_mode import RaidMode
+from sastb.modules.scheduler.routes import kick_raid_batch_job
+
+from .helpers import make_settings
+
+
+def make_member(member_type, user_id: int):
+    user = User(id=user_id, is_bot=False, first_name="User")
+    if member_type is ChatMemberLeft:
+        return ChatMemberLeft(user=user)
+    return ChatMemberRestricted.model_construct(user=user)
+
+
+class RaidModeTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.settings = make_settings(default_settings={
+            "raid_mode": {"batch_window": 0.05, "edit_interval": 0.01},
+        })
+        self.scheduler = MagicMock()
+        patcher = patch(
+            "sastb.modules.bot.utils.raid_mode.SchedulerApp",
+            return_value=self.scheduler,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.raid_mode = RaidMode(bot_id=1)
+        self.bot = AsyncMock()
+
+    async def run_batch(self, *user_ids: int):
+        for user_id in user_ids:
+            batch = self.raid_mode.add_user(
+                self.bot, self.settings, -100, user_id, f"user {user_id}",
+            )
+        await asyncio.gather(*self.raid_mode._tasks)
+        return batch
+
+    async def test_batch_schedules_one_sweep(self):
+        self.bot.send_message.return_value = SimpleNamespace(message_id=10)
+
+        batch = await self.run_batch(2, 3)
+
+        self.bot.send_message.assert_awaited_once()
+        call_kwargs = self.scheduler.schedule_job.call_args.kwargs
+        self.assertEqual(
+            call_kwargs["misfire_grace_time"],
+            self.scheduler.config.misfire_grace_time,
+        )
+        kwargs = call_kwargs["kwargs"]
+        self.assertEqual(kwargs["message_id"], 10)
+        self.assertEqual(kwargs["user_ids"], [2, 3])
+        self.assertEqual(kwargs["bot_id"], 1)
+        self.assertEqual(batch.message_id, 10)
+
+    async def test_send_failure_falls_back_to_verifications(self):
+        self.bot.send_message.side_effect = RuntimeError("Too Many Requests")
+
+        batch = await self.run_batch(2, 3)
+
+        self.scheduler.schedule_job.assert_not_called()
+        verifications = self.scheduler.get_verifications.return_value
+        self.scheduler.get_verifications.assert_called_with(1)
+        added = {
+            call.kwargs["user_id"]: call.kwargs
+            for call in verifications.add.call_args_list
+        }
+        self.assertEqual(set(added), {2, 3})
+        for kwargs in added.values():
+            self.assertIsNone(kwargs["message_id"])
+            self.assertEqual(kwargs["deadline"], batch.deadline)
+
+
+class KickRaidBatchTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.bot = AsyncMock()
+        self.members = {
+            2: make_member(ChatMemberRestricted, 2),
+            3: make_member(ChatMemberLeft, 3),
+        }
+
+        async def get_chat_member(bot, chat_id, user_id):
+            return self.members.get(user_id)
+
+        self.settings = make_settings()
+        bot_app = SimpleNamespace(
+            get_context=lambda bot_id: SimpleNamespace(bot=self.bot),
+            get_chat_settings=AsyncMock(return_value=self.settings),
+            get_chat_member=get_chat_member,
+        )
+        patcher = patch("sastb.modules.bot.BotApp", return_value=bot_app)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_sweep_skips_users_who_left(self):
+        # User 4 state is unknown, the restricted raider is still kicked
+        await kick_raid_batch_job(
+            chat_id=-100, message_id=10, user_ids=[2, 3, 4], bot_id=1,
+        )
+
+        banned = {
+            call.kwargs["user_id"]
+            for call in self.bot.ban_chat_member.call_args_list
+        }
+        self.assertEqual(banned, {2, 4})
+        self.assertEqual(
+            self.bot.edit_message_text.call_args.kwargs["text"],
+            self.settings.text_templates.raid_kicked_users_text(count=2),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
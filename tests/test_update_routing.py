@@ -0,0 +1,61 @@
+import unittest
+
+from aiogram.types import Update
+
+from sastb.modules.bot.utils.update_shards import get_update_shard
+from sastb.modules.bot.utils.update_worker_pool import get_update_chat_id
+from sastb.modules.bot.utils.verify_join_request_callback import (
+    VerifyJoinRequestCallback,
+)
+
+GROUP_ID = -1001
+USER_ID = 2
+
+
+def make_callback_update(data: str) -> dict:
+    user = {"id": USER_ID, "is_bot": False, "first_name": "User"}
+    return {
+        "update_id": 7,
+        "callback_query": {
+            "id": "1",
+            "from": user,
+            "chat_instance": "1",
+            "data": data,
+            "message": {
+                "message_id": 10,
+                "date": 0,
+                "chat": {"id": USER_ID, "type": "private"},
+                "from": user,
+                "text": "Challenge",
+            },
+        },
+    }
+
+
+class UpdateRoutingTestCase(unittest.TestCase):
+    def test_join_request_callback_routed_by_requested_chat(self):
+        update = make_callback_update(
+            VerifyJoinRequestCallback(chat_id=GROUP_ID).pack(),
+        )
+
+        self.assertEqual(get_update_chat_id(update), GROUP_ID)
+        self.assertEqual(
+            get_update_chat_id(Update.model_validate(update)), GROUP_ID,
+        )
+        for shards in (2, 3, 4):
+            self.assertEqual(
+                get_update_shard(update, shards), GROUP_ID % shards,
+            )
+
+    def test_other_callbacks_routed_by_message_chat(self):
+        for data in ("verify_user:3", "verify_request:broken"):
+            update = make_callback_update(data)
+
+            self.assertEqual(get_update_chat_id(update), USER_ID)
+            self.assertEqual(
+                get_update_chat_id(Update.model_validate(update)), USER_ID,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
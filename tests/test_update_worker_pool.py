@@ -0,0 +1,69 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from sastb.config.models.telegram import TelegramUpdatePool
+from sastb.modules.bot.utils.update_worker_pool import UpdateWorkerPool
+from sastb.utils.metrics import REGISTRY
+
+BOT_ID = 777
+
+
+def make_update(update_id: int, chat_id: int) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": chat_id, "type": "supergroup"},
+            "text": "Hi",
+        },
+    }
+
+
+class UpdateWorkerPoolTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.dispatcher = SimpleNamespace(
+            feed_raw_update=AsyncMock(return_value=None),
+        )
+        self.pool = UpdateWorkerPool(
+            dispatcher=self.dispatcher,
+            bot=SimpleNamespace(id=BOT_ID),
+            config=TelegramUpdatePool(workers=1, max_queue_size=2),
+        )
+
+    def get_samples(self) -> dict[str, str]:
+        return {
+            line.rsplit(" ", 1)[0]: line.rsplit(" ", 1)[1]
+            for line in REGISTRY.render().splitlines()
+            if f'bot="{BOT_ID}"' in line
+        }
+
+    async def test_queue_metrics(self):
+        for update_id in range(3):
+            self.pool.submit(make_update(update_id, -100 - update_id))
+
+        samples = self.get_samples()
+        self.assertEqual(
+            samples[f'sastb_update_queue_depth{{bot="{BOT_ID}"}}'], "2",
+        )
+        self.assertEqual(
+            samples[f'sastb_updates_dropped_total{{bot="{BOT_ID}"}}'], "1",
+        )
+
+        await self.pool.start()
+        await asyncio.sleep(0.05)
+        await self.pool.close()
+
+        samples = self.get_samples()
+        self.assertEqual(
+            samples[f'sastb_update_queue_depth{{bot="{BOT_ID}"}}'], "0",
+        )
+        wait_count = f'sastb_update_queue_wait_seconds_count{{bot="{BOT_ID}"}}'
+        self.assertEqual(samples[wait_count], "2")
+        self.assertEqual(self.dispatcher.feed_raw_update.await_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()